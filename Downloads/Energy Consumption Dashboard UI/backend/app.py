@@ -12,6 +12,16 @@ from datetime import datetime
 import os
 import json
 from typing import Dict, List, Any
+from forest_stats import compile_forest_stats, interval_half_width
+from columnar_store import ColumnarStore, compression_for, ingest_csv
+from lag_store import LagStore, calendar, hour_index
+try:
+    from prefork import request_rolling_reload
+except ImportError:
+    # prefork.py lives in the Instagram backend and is only importable when
+    # it launched this app; a plain `python app.py` has no master to signal
+    def request_rolling_reload():
+        return False
 
 # Import configuration
 try:
@@ -29,6 +39,12 @@ except ImportError:
         RATE_LIMIT_DEFAULT = '200 per day, 50 per hour'
         RATE_LIMIT_PREDICT = '30 per minute'
         VALIDATION_STRICT = False
+        FORECAST_MAX_DAYS = 14
+        FORECAST_MAX_SCENARIOS = 20
+        DATA_STORE_PATH = 'data_store'
+        UPLOAD_CHUNK_ROWS = 100000
+        LAG_STORE_CAPACITY_HOURS = 192
+        LAG_STORE_MAX_METERS = 10000
         VALIDATION_RULES = {
             'temperature': {'min': -50, 'max': 60, 'name': 'Temperature', 'unit': '°C'},
             'humidity': {'min': 0, 'max': 100, 'name': 'Humidity', 'unit': '%'},
@@ -66,6 +82,10 @@ if config.RATE_LIMIT_ENABLED:
 # Global model variable
 MODEL_PATH = config.MODEL_PATH
 model = None
+model_metadata = {}
+forest_stats = None  # flattened trees for single-pass mean/std (see forest_stats.py)
+data_store = ColumnarStore(config.DATA_STORE_PATH)  # uploaded meter data (see columnar_store.py)
+lag_store = LagStore(config.LAG_STORE_CAPACITY_HOURS, config.LAG_STORE_MAX_METERS)  # live readings (see lag_store.py)
 
 # Performance tracking
 performance_metrics = {
@@ -85,18 +105,32 @@ predictions_history = []
 
 def load_model():
     """Load the Random Forest model from pickle file"""
-    global model
+    global model, model_metadata, forest_stats
     try:
         with open(MODEL_PATH, 'rb') as f:
             model_data = pickle.load(f)
         
         # Handle both direct model and metadata dict formats
         if isinstance(model_data, dict) and 'model' in model_data:
-            model = model_data['model']
+            new_model = model_data['model']
+            new_metadata = {k: v for k, v in model_data.items() if k != 'model'}
             print(f"✅ Model loaded successfully from {MODEL_PATH} (with metadata)")
         else:
-            model = model_data
+            new_model = model_data
+            new_metadata = {}
             print(f"✅ Model loaded successfully from {MODEL_PATH}")
+        
+        try:
+            new_stats = compile_forest_stats(new_model)
+            if new_stats is not None:
+                print(f"✅ Forest flattened for confidence bounds: {new_stats.n_trees} trees")
+        except Exception as e:
+            print(f"⚠️  Could not flatten forest, bounds will use per-tree predict: {e}")
+            new_stats = None
+        if new_metadata.get('calibration'):
+            print(f"✅ Calibrated {new_metadata['calibration']['level']:.0%} intervals from held-out residuals")
+        
+        model, model_metadata, forest_stats = new_model, new_metadata, new_stats
         return True
     except FileNotFoundError:
         print(f"❌ Model file not found: {MODEL_PATH}")
@@ -178,37 +212,62 @@ def validate_features(features: Dict[str, Any]) -> Dict[str, Any]:
 # PREDICTION HELPERS
 # ============================================================================
 
-def calculate_confidence_bounds(model, X, prediction):
-    """Calculate confidence intervals for predictions"""
-    try:
-        if hasattr(model, 'estimators_'):
-            # Random Forest: use tree predictions for uncertainty
-            tree_predictions = np.array([tree.predict(X)[0] for tree in model.estimators_])
-            std = np.std(tree_predictions)
-            
-            # 95% confidence interval
-            lower_bound = prediction - 1.96 * std
-            upper_bound = prediction + 1.96 * std
-            
-            # Calculate confidence score based on variance
-            cv = std / prediction if prediction > 0 else 1.0
-            confidence = max(0.5, min(0.99, 1.0 - cv))
-        else:
-            # Default bounds (±10%)
-            lower_bound = prediction * 0.9
-            upper_bound = prediction * 1.1
-            confidence = 0.85
-    except Exception as e:
-        print(f"⚠️  Error calculating bounds: {e}")
-        lower_bound = prediction * 0.9
-        upper_bound = prediction * 1.1
-        confidence = 0.85
+def bounds_from_std(predictions, std):
+    """
+    Bounds from the spread across trees: calibrated from held-out residuals
+    when the model metadata has them, otherwise a 95% normal interval
+    """
+    predictions = np.asarray(predictions, dtype=float)
+    if std is not None:
+        calibration = model_metadata.get('calibration')
+        half_width = interval_half_width(std, calibration)
+        lower_bound = predictions - half_width
+        upper_bound = predictions + half_width
+        
+        # Calculate confidence score based on variance
+        positive = predictions > 0
+        cv = np.where(positive, std / np.where(positive, predictions, 1.0), 1.0)
+        confidence = np.clip(1.0 - cv, 0.5, 0.99)
+        method = 'calibrated' if calibration else 'tree_spread'
+    else:
+        # Default bounds (±10%)
+        lower_bound = predictions * 0.9
+        upper_bound = predictions * 1.1
+        confidence = np.full(len(predictions), 0.85)
+        std = np.full(len(predictions), np.nan)
+        method = 'default'
     
-    return {
-        'lower_bound': float(max(0, lower_bound)),
-        'upper_bound': float(upper_bound),
-        'confidence': float(confidence)
-    }
+    return [
+        {
+            'lower_bound': lower,
+            'upper_bound': upper,
+            'confidence': conf,
+            'std': None if np.isnan(spread) else spread,
+            'interval_method': method
+        }
+        for lower, upper, conf, spread in zip(
+            np.maximum(0, lower_bound).tolist(), upper_bound.tolist(), confidence.tolist(), std.tolist()
+        )
+    ]
+
+def predict_batch(X, include_confidence=True):
+    """
+    Predictions (and bounds) for every row of X. With the flattened forest,
+    one traversal yields both the prediction and the spread across trees
+    """
+    predictions, std = predict_with_spread(X, include_confidence)
+    bounds = bounds_from_std(predictions, std) if include_confidence else []
+    return predictions, bounds
+
+def predict_with_spread(X, include_spread=True):
+    """(predictions, std across trees); std is None when the model can't provide it"""
+    if forest_stats is not None:
+        return forest_stats.predict_with_std(X)
+    predictions = model.predict(X)
+    std = None
+    if include_spread and hasattr(model, 'estimators_'):
+        std = np.stack([tree.predict(X) for tree in model.estimators_]).std(axis=0)
+    return predictions, std
 
 def update_metrics(prediction_value: float, success: bool = True):
     """Update performance metrics"""
@@ -235,6 +294,25 @@ def update_metrics(prediction_value: float, success: bool = True):
     
     performance_metrics['last_updated'] = datetime.now().isoformat()
 
+def update_metrics_batch(prediction_values):
+    """Update performance metrics for many successful predictions at once"""
+    global performance_metrics, predictions_history
+    
+    now = datetime.now().isoformat()
+    performance_metrics['total_predictions'] += len(prediction_values)
+    performance_metrics['successful_predictions'] += len(prediction_values)
+    
+    # Only the last 100 can survive the trim below
+    predictions_history.extend(
+        {'timestamp': now, 'prediction': float(value)} for value in prediction_values[-100:]
+    )
+    predictions_history = predictions_history[-100:]
+    
+    if predictions_history:
+        recent_preds = [p['prediction'] for p in predictions_history]
+        performance_metrics['avg_prediction'] = float(np.mean(recent_preds))
+    performance_metrics['last_updated'] = now
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
@@ -244,69 +322,260 @@ def transform_features_for_prediction(features: Dict[str, Any]) -> List[float]:
     Transform raw input features into the format expected by the model
     Since we don't have historical data, we use approximations and defaults
     """
-    import math
+    return transform_features_batch([features])[0].tolist()
+
+def transform_features_batch(features_list: List[Dict[str, Any]], history=None) -> np.ndarray:
+    """
+    Transform many rows of raw input features into one (N, 16) model matrix,
+    computing each feature for all rows at once. history (see
+    meter_history_features) replaces approximated features with real ones
+    """
+    def column(name, default):
+        return np.array([features.get(name, default) for features in features_list], dtype=float)
     
     # Extract basic features
-    temperature = features.get('temperature', 22.0)
-    humidity = features.get('humidity', 60.0)
-    renewable = features.get('renewable', 0.0)
-    hour = features.get('hour', 12)
-    day_of_week = features.get('day_of_week', 1)
-    month = features.get('month', 6)
-    is_weekend = features.get('is_weekend', 0)
-    is_business_hour = features.get('is_business_hour', 1)
+    temperature = column('temperature', 22.0)
+    humidity = column('humidity', 60.0)
+    renewable = column('renewable', 0.0)
+    hour = column('hour', 12)
+    day_of_week = column('day_of_week', 1)
+    month = column('month', 6)
+    is_weekend = column('is_weekend', 0)
+    is_business_hour = column('is_business_hour', 1)
     
     # For lag features, use reasonable approximations based on typical consumption patterns
     # These are simplified estimates since we don't have actual historical data
+    consumption_lag_1h = typical_consumption(hour, is_weekend, is_business_hour)
+    consumption_lag_24h = consumption_lag_1h * 0.95  # Slightly less than current
+    consumption_lag_168h = consumption_lag_1h * 0.9   # Weekly pattern
     
-    # Base consumption estimate based on time of day and day of week
-    base_consumption = 50.0  # Base consumption in kWh
+    # Historical pattern averages (simplified estimates)
+    avg_consumption_same_hour = BASE_CONSUMPTION * hour_multiplier(hour)
+    avg_consumption_same_day = BASE_CONSUMPTION * np.where(is_weekend != 0, 1.2, 1.0)
     
-    # Time-based multipliers
-    hour_multiplier = 1.0 + 0.3 * math.sin(2 * math.pi * (hour - 6) / 12)  # Peak in afternoon
-    weekend_multiplier = 1.2 if is_weekend else 1.0
-    business_multiplier = 1.1 if is_business_hour else 0.8
+    # Rolling weather averages use the current values as approximation
+    temperature_rolling_24h = temperature.copy()
+    humidity_rolling_24h = humidity.copy()
     
-    # Estimate lag features based on patterns
-    consumption_lag_1h = base_consumption * hour_multiplier * weekend_multiplier * business_multiplier
-    consumption_lag_24h = consumption_lag_1h * 0.95  # Slightly less than current
-    consumption_lag_168h = consumption_lag_1h * 0.9   # Weekly pattern
+    # Rows of meters with ingested readings get their real history
+    approximated = {
+        'consumption_lag_1h': consumption_lag_1h,
+        'consumption_lag_24h': consumption_lag_24h,
+        'consumption_lag_168h': consumption_lag_168h,
+        'temperature_rolling_24h': temperature_rolling_24h,
+        'humidity_rolling_24h': humidity_rolling_24h,
+        'avg_consumption_same_hour': avg_consumption_same_hour,
+        'avg_consumption_same_day': avg_consumption_same_day,
+    }
+    for idx, row_history in enumerate(history or []):
+        for name, value in (row_history or {}).items():
+            approximated[name][idx] = value
     
-    # Rolling weather averages (use current values as approximation)
-    temperature_rolling_24h = temperature
-    humidity_rolling_24h = humidity
+    return assemble_features(
+        consumption_lag_1h, consumption_lag_24h, consumption_lag_168h,
+        temperature_rolling_24h, humidity_rolling_24h, hour, day_of_week, month,
+        avg_consumption_same_hour, avg_consumption_same_day,
+        is_weekend, is_business_hour, renewable
+    ).reshape(len(features_list), 16)
+
+def meter_history_features(features_list: List[Dict[str, Any]]):
+    """
+    For rows naming a "meter_id" with ingested readings: (rows with the time
+    features of the target hour filled in, history features per row, None
+    for other rows). The target hour is the row's timestamp, or the hour
+    after the meter's latest reading.
+    """
+    rows, history = [], []
+    for features in features_list:
+        found = None
+        if isinstance(features, dict) and features.get('meter_id') is not None:
+            try:
+                hour = hour_index(features['timestamp']) if features.get('timestamp') else None
+            except (TypeError, ValueError):
+                hour = None
+            found = lag_store.features(
+                str(features['meter_id']), hour,
+                features.get('temperature', 22.0), features.get('humidity', 60.0)
+            )
+        if found is None:
+            rows.append(features)
+            history.append(None)
+        else:
+            hour, meter_features = found
+            rows.append({**calendar(hour), **features})
+            history.append(meter_features)
+    return rows, history
+
+# Base consumption estimate (kWh) for the lag approximations
+BASE_CONSUMPTION = 50.0
+
+def hour_multiplier(hour):
+    """Time-of-day multiplier, peaking in the afternoon"""
+    return 1.0 + 0.3 * np.sin(2 * np.pi * (hour - 6) / 12)
+
+def typical_consumption(hour, is_weekend, is_business_hour):
+    """Rough consumption for an hour when no history is available"""
+    weekend_multiplier = np.where(is_weekend != 0, 1.2, 1.0)
+    business_multiplier = np.where(is_business_hour != 0, 1.1, 0.8)
+    return BASE_CONSUMPTION * hour_multiplier(hour) * weekend_multiplier * business_multiplier
+
+def assemble_features(consumption_lag_1h, consumption_lag_24h, consumption_lag_168h,
+                      temperature_rolling_24h, humidity_rolling_24h, hour, day_of_week, month,
+                      avg_consumption_same_hour, avg_consumption_same_day,
+                      is_weekend, is_business_hour, renewable) -> np.ndarray:
+    """(N, 16) model matrix from per-row feature arrays, adding the cyclical encodings"""
+    hour = np.asarray(hour, dtype=float)
+    day_of_week = np.asarray(day_of_week, dtype=float)
+    month = np.asarray(month, dtype=float)
     
-    # Cyclical time encodings
-    hour_sin = math.sin(2 * math.pi * hour / 24)
-    hour_cos = math.cos(2 * math.pi * hour / 24)
-    day_sin = math.sin(2 * math.pi * day_of_week / 7)
-    day_cos = math.cos(2 * math.pi * day_of_week / 7)
-    month_sin = math.sin(2 * math.pi * month / 12)
-    month_cos = math.cos(2 * math.pi * month / 12)
+    # Columns in the exact order expected by the model
+    return np.column_stack([
+        consumption_lag_1h,                # consumption_lag_1h
+        consumption_lag_24h,               # consumption_lag_24h
+        consumption_lag_168h,              # consumption_lag_168h
+        temperature_rolling_24h,           # temperature_rolling_24h
+        humidity_rolling_24h,              # humidity_rolling_24h
+        np.sin(2 * np.pi * hour / 24),     # hour_sin
+        np.cos(2 * np.pi * hour / 24),     # hour_cos
+        np.sin(2 * np.pi * day_of_week / 7),  # day_sin
+        np.cos(2 * np.pi * day_of_week / 7),  # day_cos
+        np.sin(2 * np.pi * month / 12),    # month_sin
+        np.cos(2 * np.pi * month / 12),    # month_cos
+        avg_consumption_same_hour,         # avg_consumption_same_hour
+        avg_consumption_same_day,          # avg_consumption_same_day
+        is_weekend,                        # is_weekend
+        is_business_hour,                  # is_business_hour
+        renewable,                         # renewable
+    ])
+
+# ============================================================================
+# FORECASTING
+# ============================================================================
+
+LAG_HOURS = 168  # longest lag the model uses (consumption_lag_168h)
+FORECAST_MAX_DAYS = config.FORECAST_MAX_DAYS
+FORECAST_MAX_SCENARIOS = config.FORECAST_MAX_SCENARIOS
+
+def calendar_features(timestamps: pd.DatetimeIndex) -> Dict[str, np.ndarray]:
+    """Time features for hourly timestamps, defined as in train_model.py"""
+    hour = timestamps.hour.to_numpy()
+    day_of_week = timestamps.dayofweek.to_numpy()
+    return {
+        'hour': hour,
+        'day_of_week': day_of_week,
+        'month': timestamps.month.to_numpy(),
+        'is_weekend': (day_of_week >= 5).astype(float),
+        'is_business_hour': ((hour >= 8) & (hour <= 18)).astype(float),
+    }
+
+def run_forecast(start: datetime, hours: int, scenarios: List[Dict[str, Any]], history=None):
+    """
+    Recursive hourly forecast for every scenario at once.
     
-    # Historical pattern averages (simplified estimates)
-    avg_consumption_same_hour = base_consumption * hour_multiplier
-    avg_consumption_same_day = base_consumption * weekend_multiplier
+    Each step builds one (S, 16) matrix - one row per scenario - and predicts
+    it in a single forest evaluation. The predictions are written into each
+    scenario's consumption series, so the next steps read them back as
+    lag-1h/24h/168h and in the same-hour / same-weekday averages.
     
-    # Return features in the exact order expected by the model
-    return [
-        consumption_lag_1h,      # consumption_lag_1h
-        consumption_lag_24h,     # consumption_lag_24h
-        consumption_lag_168h,    # consumption_lag_168h
-        temperature_rolling_24h, # temperature_rolling_24h
-        humidity_rolling_24h,    # humidity_rolling_24h
-        hour_sin,                # hour_sin
-        hour_cos,                # hour_cos
-        day_sin,                 # day_sin
-        day_cos,                 # day_cos
-        month_sin,               # month_sin
-        month_cos,               # month_cos
-        avg_consumption_same_hour, # avg_consumption_same_hour
-        avg_consumption_same_day,  # avg_consumption_same_day
-        is_weekend,              # is_weekend
-        is_business_hour,        # is_business_hour
-        renewable,               # renewable
-    ]
+    The LAG_HOURS before `start` come from `history` (hourly kWh, oldest
+    first) where given. Without history they are spun up: a week of typical
+    consumption, then a week predicted recursively by the model.
+    Returns (predictions, std) arrays of shape (S, hours); std may be None.
+    """
+    n_scenarios = len(scenarios)
+    def scenario_column(name, default):
+        return np.array([features.get(name, default) for features in scenarios], dtype=float)
+    temperature = scenario_column('temperature', 22.0)
+    humidity = scenario_column('humidity', 60.0)
+    renewable = scenario_column('renewable', 0.0)
+    
+    history = np.asarray(history if history is not None else [], dtype=float)[-LAG_HOURS:]
+    spin_up = LAG_HOURS if len(history) == 0 else 0
+    seeded = 2 * LAG_HOURS if spin_up else LAG_HOURS
+    timestamps = pd.date_range(start=start - pd.Timedelta(hours=seeded), periods=seeded + hours, freq='h')
+    calendar = calendar_features(timestamps)
+    
+    # Consumption series per scenario: seeded hours, then one slot per predicted step
+    first_step = seeded - spin_up
+    consumption = np.empty((n_scenarios, len(timestamps)))
+    consumption[:, :first_step] = typical_consumption(
+        calendar['hour'][:first_step], calendar['is_weekend'][:first_step],
+        calendar['is_business_hour'][:first_step]
+    )
+    if len(history):
+        consumption[:, first_step - len(history):first_step] = history
+    
+    # Running sums behind avg_consumption_same_hour / avg_consumption_same_day
+    hour_sum = np.zeros((n_scenarios, 24))
+    hour_count = np.zeros(24)
+    day_sum = np.zeros((n_scenarios, 7))
+    day_count = np.zeros(7)
+    np.add.at(hour_sum.T, calendar['hour'][:first_step], consumption[:, :first_step].T)
+    np.add.at(hour_count, calendar['hour'][:first_step], 1)
+    np.add.at(day_sum.T, calendar['day_of_week'][:first_step], consumption[:, :first_step].T)
+    np.add.at(day_count, calendar['day_of_week'][:first_step], 1)
+    
+    stds = np.empty((n_scenarios, len(timestamps) - first_step))
+    has_spread = True
+    for t in range(first_step, len(timestamps)):
+        hour = calendar['hour'][t]
+        day_of_week = calendar['day_of_week'][t]
+        X = assemble_features(
+            consumption[:, t - 1], consumption[:, t - 24], consumption[:, t - LAG_HOURS],
+            temperature, humidity,
+            np.full(n_scenarios, hour), np.full(n_scenarios, day_of_week),
+            np.full(n_scenarios, calendar['month'][t]),
+            hour_sum[:, hour] / max(hour_count[hour], 1),
+            day_sum[:, day_of_week] / max(day_count[day_of_week], 1),
+            np.full(n_scenarios, calendar['is_weekend'][t]),
+            np.full(n_scenarios, calendar['is_business_hour'][t]),
+            renewable
+        )
+        predictions, std = predict_with_spread(X, include_spread=t >= seeded)
+        consumption[:, t] = predictions
+        if std is not None:
+            stds[:, t - first_step] = std
+        elif t >= seeded:
+            has_spread = False
+        hour_sum[:, hour] += predictions
+        hour_count[hour] += 1
+        day_sum[:, day_of_week] += predictions
+        day_count[day_of_week] += 1
+    
+    forecast = consumption[:, seeded:]
+    return forecast, stds[:, spin_up:] if has_spread else None
+
+def daily_forecast(start: datetime, predictions, std):
+    """
+    Hourly predictions of one scenario summed per 24-hour day from `start`.
+    A day's interval half-width is the sum of its hourly half-widths: hourly
+    errors of a recursive forecast are strongly correlated, and a root sum
+    of squares (independent errors) gave bounds far too narrow. Returns
+    (days, hourly half-widths).
+    """
+    if std is not None:
+        half_width = interval_half_width(std, model_metadata.get('calibration'))
+    else:
+        half_width = predictions * 0.1  # default ±10% bounds
+    
+    days = []
+    for day, offset in enumerate(range(0, len(predictions), 24)):
+        hourly = predictions[offset:offset + 24]
+        total = float(hourly.sum())
+        spread = float(half_width[offset:offset + 24].sum())
+        date = start + pd.Timedelta(days=day)
+        peak = int(np.argmax(hourly))
+        days.append({
+            'date': date.strftime('%Y-%m-%d'),
+            'day_name': date.strftime('%A'),
+            'predicted': total,
+            'lower_bound': max(0.0, total - spread),
+            'upper_bound': total + spread,
+            'actual': None,
+            'peak_hour': (date + pd.Timedelta(hours=peak)).hour,
+            'peak': float(hourly[peak]),
+        })
+    return days, half_width
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -365,58 +634,68 @@ def predict():
             }), 400
         
         features_list = data['features']
+        if not isinstance(features_list, list):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid request format',
+                'message': '"features" must be an array'
+            }), 400
         include_confidence = data.get('include_confidence', True)
-        predictions = []
+        validation_errors = []
         all_warnings = []
         
+        # VALIDATE INPUT - every row, so all problems are reported at once
         for idx, features in enumerate(features_list):
-            # VALIDATE INPUT
+            if not isinstance(features, dict):
+                validation_errors.append({'index': idx, 'message': 'Each entry must be an object'})
+                continue
             validation = validate_features(features)
-            
-            if not validation['valid']:
-                update_metrics(0, success=False)
-                return jsonify({
-                    'success': False,
-                    'error': 'Invalid input data',
-                    'validation_errors': validation['errors'],
-                    'index': idx
-                }), 400
-            
-            # Collect warnings
-            if validation['warnings']:
-                all_warnings.extend(validation['warnings'])
-            
-            # Transform input features to match model expectations
-            feature_values = transform_features_for_prediction(features)
-            
-            # Make prediction
-            X = np.array([feature_values])
-            prediction = model.predict(X)[0]
-            
-            # Calculate confidence bounds
-            bounds = calculate_confidence_bounds(model, X, prediction) if include_confidence else {}
-            
+            validation_errors.extend(dict(error, index=idx) for error in validation['errors'])
+            all_warnings.extend(dict(warning, index=idx) for warning in validation['warnings'])
+        
+        if validation_errors:
+            update_metrics(0, success=False)
+            return jsonify({
+                'success': False,
+                'error': 'Invalid input data',
+                'validation_errors': validation_errors,
+                'index': validation_errors[0]['index']
+            }), 400
+        
+        # Join meter history only once the rows are validated (and clamped)
+        features_list, history = meter_history_features(features_list)
+        
+        # Transform all rows into one matrix; predictions and confidence
+        # bounds for all rows come from a single forest evaluation
+        X = transform_features_batch(features_list, history)
+        values, bounds = predict_batch(X, include_confidence) if len(X) else (np.empty(0), [])
+        
+        predictions = []
+        for idx, (features, prediction) in enumerate(zip(features_list, values.tolist())):
             # Build result
             result = {
                 'index': idx,
                 'timestamp': features.get('timestamp'),
-                'predicted': float(prediction),
+                'predicted': prediction,
             }
             
             if include_confidence:
-                result.update(bounds)
+                result.update(bounds[idx])
+            if history[idx] is not None:
+                result['meter_id'] = features['meter_id']
+                result['history_features'] = sorted(history[idx])
             
             predictions.append(result)
-            
-            # Update metrics
-            update_metrics(prediction, success=True)
+        
+        # Update metrics
+        update_metrics_batch(values)
         
         response = {
             'success': True,
             'predictions': predictions,
             'model_info': {
                 'type': type(model).__name__,
-                'features_used': len(feature_values)
+                'features_used': X.shape[1]
             }
         }
         
@@ -435,6 +714,158 @@ def predict():
             'message': 'Error during prediction'
         }), 500
 
+@app.route('/api/predict/forecast', methods=['POST'])
+def forecast():
+    """
+    Multi-day recursive forecast, aggregated per day
+    
+    Expected JSON:
+    {
+        "days": 7,
+        "base_features": {
+            "timestamp": "2024-01-15T00:00:00",   # optional, defaults to midnight today
+            "temperature": 22.5,
+            "humidity": 65.0,
+            "renewable": 45.0
+        },
+        "scenarios": [                            # optional what-ifs, overriding base_features
+            {"name": "heatwave", "temperature": 32.0}
+        ],
+        "history": [310.2, 298.7, ...],           # optional hourly kWh before the start, oldest first
+        "include_hourly": false
+    }
+    """
+    if model is None:
+        return jsonify({
+            'success': False,
+            'error': 'Model not loaded',
+            'message': 'Please place random_forest_model.pkl in the backend folder'
+        }), 503
+    
+    try:
+        started = datetime.now()
+        data = request.get_json(silent=True) or {}
+        days = data.get('days', 7)
+        base_features = data.get('base_features') or {}
+        scenario_overrides = data.get('scenarios') or []
+        history = data.get('history')
+        
+        if isinstance(days, bool) or not isinstance(days, int) or not 1 <= days <= FORECAST_MAX_DAYS:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid request format',
+                'message': f'"days" must be an integer from 1 to {FORECAST_MAX_DAYS}'
+            }), 400
+        if not isinstance(base_features, dict) or not isinstance(scenario_overrides, list) \
+                or not all(isinstance(overrides, dict) for overrides in scenario_overrides):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid request format',
+                'message': '"base_features" must be an object and "scenarios" an array of objects'
+            }), 400
+        if len(scenario_overrides) + 1 > FORECAST_MAX_SCENARIOS:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid request format',
+                'message': f'At most {FORECAST_MAX_SCENARIOS - 1} scenarios per forecast'
+            }), 400
+        if history is not None:
+            try:
+                history = np.asarray(history, dtype=float).reshape(-1)
+            except (TypeError, ValueError):
+                history = None
+            if history is None or not np.isfinite(history).all() or (history < 0).any():
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid request format',
+                    'message': '"history" must be an array of non-negative hourly kWh values'
+                }), 400
+        
+        try:
+            start = pd.Timestamp(base_features['timestamp']) if base_features.get('timestamp') else None
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid request format',
+                'message': '"base_features.timestamp" must be an ISO date/time'
+            }), 400
+        if start is None:
+            start = pd.Timestamp(datetime.now()).normalize()
+        start = start.tz_localize(None).floor('h')
+        
+        # The base features are scenario 0; every scenario overrides some of them
+        scenarios = [{**base_features, 'name': 'base'}]
+        scenarios += [
+            {**base_features, **overrides, 'name': str(overrides.get('name') or f'scenario_{i}')}
+            for i, overrides in enumerate(scenario_overrides, start=1)
+        ]
+        validation_errors = []
+        all_warnings = []
+        for idx, features in enumerate(scenarios):
+            validation = validate_features(features)
+            validation_errors.extend(dict(error, scenario=idx) for error in validation['errors'])
+            all_warnings.extend(dict(warning, scenario=idx) for warning in validation['warnings'])
+        if validation_errors:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid input data',
+                'validation_errors': validation_errors
+            }), 400
+        
+        predictions, std = run_forecast(start, days * 24, scenarios, history)
+        
+        results = []
+        for idx, features in enumerate(scenarios):
+            daily, half_width = daily_forecast(start, predictions[idx], None if std is None else std[idx])
+            result = {
+                'name': features['name'],
+                'forecast': daily,
+                'total': float(predictions[idx].sum()),
+            }
+            if data.get('include_hourly'):
+                timestamps = pd.date_range(start=start, periods=predictions.shape[1], freq='h')
+                result['hourly'] = [
+                    {
+                        'timestamp': timestamp.isoformat(),
+                        'predicted': value,
+                        'lower_bound': max(0.0, value - spread),
+                        'upper_bound': value + spread,
+                    }
+                    for timestamp, value, spread in zip(
+                        timestamps, predictions[idx].tolist(), half_width.tolist()
+                    )
+                ]
+            results.append(result)
+        
+        response = {
+            'success': True,
+            'forecast': results[0]['forecast'],
+            'model_type': type(model).__name__,
+            'start': start.isoformat(),
+            'days': days,
+            # Hourly bounds use the first part; daily bounds sum them
+            'interval_method': ('default' if std is None else
+                ('calibrated' if model_metadata.get('calibration') else 'tree_spread')) + '_hourly_sum',
+            'history_hours': 0 if history is None else int(min(len(history), LAG_HOURS)),
+            'elapsed_ms': round((datetime.now() - started).total_seconds() * 1000, 1),
+        }
+        if data.get('include_hourly'):
+            response['hourly'] = results[0]['hourly']
+        if scenario_overrides:
+            response['scenarios'] = results
+        if all_warnings:
+            response['warnings'] = all_warnings
+        
+        return jsonify(response)
+        
+    except Exception as e:
+        print(f"❌ Forecast error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Error during forecast'
+        }), 500
+
 @app.route('/api/model-info', methods=['GET'])
 def model_info():
     """Get detailed information about the loaded model"""
@@ -473,6 +904,9 @@ def model_info():
             # Sort by importance
             sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)
             info['top_features'] = dict(sorted_features[:10])
+        if model_metadata.get('calibration'):
+            info['calibration'] = model_metadata['calibration']
+        info['single_pass_bounds'] = forest_stats is not None
     except Exception as e:
         print(f"⚠️  Error extracting model info: {e}")
     
@@ -515,7 +949,13 @@ def validate_input():
 
 @app.route('/api/reload-model', methods=['POST'])
 def reload_model():
-    """Reload the model from disk"""
+    """Reload the model from disk (in every worker, under prefork.py --on-reload)"""
+    if request_rolling_reload():
+        return jsonify({
+            'success': True,
+            'message': 'Rolling reload of all workers started',
+            'model_type': type(model).__name__ if model else None
+        }), 202
     success = load_model()
     return jsonify({
         'success': success,
@@ -523,6 +963,131 @@ def reload_model():
         'model_type': type(model).__name__ if model else None
     })
 
+@app.route('/api/upload', methods=['POST'])
+def upload_data():
+    """
+    Append a CSV of meter readings to the columnar data store
+    
+    Accepts multipart form data with a "file" field (what the dashboard
+    sends) or the CSV itself as the request body (Content-Type: text/csv).
+    A raw body is parsed straight off the socket, without a temporary copy.
+    Files ending in .gz are decompressed on the fly.
+    """
+    try:
+        started = datetime.now()
+        if request.files:
+            upload = request.files.get('file')
+            if upload is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid request format',
+                    'message': 'Expected a "file" field'
+                }), 400
+            stream, filename = upload.stream, upload.filename
+        else:
+            stream, filename = request.stream, request.args.get('filename')
+        
+        summary = ingest_csv(
+            stream, data_store, config.UPLOAD_CHUNK_ROWS, compression_for(filename), filename
+        )
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"✅ Upload ingested: {summary.rows} rows ({summary.rejected_rows} rejected) in {elapsed:.1f}s")
+        
+        return jsonify({
+            'success': True,
+            'message': f'{summary.rows} rows stored ({summary.rejected_rows} rejected)',
+            'statistics': summary.describe(),
+            'store': data_store.stats(),
+            'elapsed_ms': round(elapsed * 1000, 1)
+        })
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Could not read the CSV file'
+        }), 400
+    except Exception as e:
+        print(f"❌ Upload error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Error during upload'
+        }), 500
+
+@app.route('/api/upload', methods=['GET'])
+def upload_summary():
+    """Running statistics of everything uploaded so far"""
+    return jsonify({
+        'success': True,
+        'statistics': data_store.summary(),
+        'store': data_store.stats()
+    })
+
+@app.route('/api/meters/<meter_id>/readings', methods=['POST'])
+def ingest_readings(meter_id):
+    """
+    Ingest actual hourly readings of a meter into the lag store
+    
+    Expected JSON (or a single reading object):
+    {
+        "readings": [
+            {"timestamp": "2024-01-15T13:00:00", "consumption": 312.4,
+             "temperature": 22.5, "humidity": 65.0},
+            ...
+        ]
+    }
+    Predictions with "meter_id" then use these readings for their lag,
+    rolling weather and same-hour/same-day features.
+    """
+    data = request.get_json(silent=True)
+    readings = data.get('readings', [data]) if isinstance(data, dict) else data
+    if not isinstance(readings, list) or not all(isinstance(reading, dict) for reading in readings):
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format',
+            'message': 'Expected a reading object or {"readings": [...]}'
+        }), 400
+    
+    try:
+        result = lag_store.ingest(meter_id, readings)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid input data',
+            'message': str(e)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'meter_id': meter_id,
+        **result,
+        'meter': lag_store.meter_stats(meter_id)
+    })
+
+@app.route('/api/meters', methods=['GET'])
+def list_meters():
+    """Lag store size"""
+    return jsonify({'success': True, **lag_store.stats()})
+
+@app.route('/api/meters/<meter_id>', methods=['GET'])
+def meter_info(meter_id):
+    """A meter's buffered history and the features it gives the next hour"""
+    found = lag_store.features(meter_id)
+    if found is None:
+        return jsonify({
+            'success': False,
+            'error': f'No readings for meter {meter_id}'
+        }), 404
+    hour, features = found
+    return jsonify({
+        'success': True,
+        'meter_id': meter_id,
+        'meter': lag_store.meter_stats(meter_id),
+        'next_hour': calendar(hour)['timestamp'],
+        'history_features': features
+    })
+
 # ============================================================================
 # STARTUP
 # ============================================================================
@@ -564,12 +1129,11 @@ def get_current_consumption():
         # Transform features
         feature_values = transform_features_for_prediction(current_features)
         
-        # Make prediction
+        # Make prediction and calculate confidence bounds
         X = np.array([feature_values])
-        prediction = model.predict(X)[0]
-        
-        # Calculate confidence bounds
-        bounds = calculate_confidence_bounds(model, X, prediction)
+        predictions, bounds = predict_batch(X)
+        prediction = predictions[0]
+        bounds = bounds[0]
         
         return jsonify({
             'success': True,
@@ -0,0 +1,475 @@
+"""
+Streaming CSV ingestion into a local columnar store
+
+Meter exports in the notebook schema (Timestamp, Temperature, Humidity,
+SquareFootage, Occupancy, HVACUsage On/Off, LightingUsage On/Off,
+RenewableEnergy, DayOfWeek, Holiday Yes/No, EnergyConsumption) are read
+with pandas in fixed-size chunks, so memory stays bounded whatever the
+file size. Each chunk is coerced to compact dtypes: epoch seconds as
+int64, measurements as float32, Occupancy as int32 and the flags and
+weekday as int8, with -1 for missing. The chunk is then appended to one
+raw binary file per column, and summary statistics are merged in chunk
+by chunk. A 1 GB CSV becomes roughly 300 MB on disk and is never held in
+memory at once.
+
+Store layout (see ColumnarStore):
+    data_store/manifest.json     committed row count, uploads, running statistics
+    data_store/<Column>.bin      raw values in the column's dtype, one per committed row
+An upload is all-or-nothing: the manifest is rewritten only after every
+chunk has been appended, and bytes past the committed row count are
+truncated by the next writer. Readers never see a partial upload.
+
+    python columnar_store.py ingest meter_history.csv.gz
+    python columnar_store.py summary
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Store column -> dtype, in the notebook's column order
+COLUMNS = {
+    'Timestamp': 'int64',          # epoch seconds (UTC for offset-aware inputs)
+    'Temperature': 'float32',
+    'Humidity': 'float32',
+    'SquareFootage': 'float32',
+    'Occupancy': 'int32',
+    'HVACUsage': 'int8',           # 1 On, 0 Off, -1 missing
+    'LightingUsage': 'int8',
+    'RenewableEnergy': 'float32',
+    'DayOfWeek': 'int8',           # 0 Monday .. 6 Sunday, -1 missing
+    'Holiday': 'int8',
+    'EnergyConsumption': 'float32',
+}
+REQUIRED = ('Timestamp', 'EnergyConsumption')
+FLAGS = ('HVACUsage', 'LightingUsage', 'Holiday')
+MEASUREMENTS = ('Temperature', 'Humidity', 'SquareFootage', 'Occupancy', 'RenewableEnergy', 'EnergyConsumption')
+
+# Header spellings accepted for each column, compared lowercase without punctuation
+ALIASES = {
+    'timestamp': 'Timestamp', 'datetime': 'Timestamp', 'time': 'Timestamp',
+    'temperature': 'Temperature',
+    'humidity': 'Humidity',
+    'squarefootage': 'SquareFootage',
+    'occupancy': 'Occupancy',
+    'hvacusage': 'HVACUsage', 'hvacstatus': 'HVACUsage',
+    'lightingusage': 'LightingUsage', 'lightingstatus': 'LightingUsage',
+    'renewableenergy': 'RenewableEnergy', 'renewable': 'RenewableEnergy',
+    'dayofweek': 'DayOfWeek',
+    'holiday': 'Holiday', 'isholiday': 'Holiday',
+    'energyconsumption': 'EnergyConsumption', 'consumption': 'EnergyConsumption',
+}
+FLAG_VALUES = {'on': 1, 'yes': 1, 'true': 1, '1': 1, '1.0': 1,
+               'off': 0, 'no': 0, 'false': 0, '0': 0, '0.0': 0}
+WEEKDAYS = {name: i for i, name in enumerate(
+    ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'])}
+WEEKDAYS.update({name[:3]: i for name, i in list(WEEKDAYS.items())})
+WEEKDAYS.update({str(i): i for i in range(7)})
+
+
+def canonical_name(header: str) -> Optional[str]:
+    return ALIASES.get(re.sub(r'[^a-z0-9]', '', str(header).lower()))
+
+
+# ============================================================================
+# RUNNING STATISTICS
+# ============================================================================
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream, merged chunk by chunk (Chan et al.)"""
+
+    def __init__(self, count=0, missing=0, mean=0.0, m2=0.0, minimum=None, maximum=None):
+        self.count = count
+        self.missing = missing
+        self.mean = mean
+        self.m2 = m2
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        finite = values[~np.isnan(values)]
+        self.missing += len(values) - len(finite)
+        if len(finite):
+            chunk_mean = float(finite.mean())
+            self.merge(RunningStats(
+                len(finite), 0, chunk_mean, float(np.square(finite - chunk_mean).sum()),
+                float(finite.min()), float(finite.max())
+            ))
+
+    def merge(self, other: 'RunningStats'):
+        self.missing += other.missing
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+
+    def state(self) -> Dict[str, Any]:
+        return {'count': self.count, 'missing': self.missing, 'mean': self.mean, 'm2': self.m2,
+                'minimum': self.minimum, 'maximum': self.maximum}
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'missing': self.missing,
+            'mean': self.mean if self.count else None,
+            'std': float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else None,
+            'min': self.minimum,
+            'max': self.maximum,
+        }
+
+
+class IngestSummary:
+    """Statistics of everything ingested so far, built from per-chunk updates"""
+
+    def __init__(self):
+        self.rows = 0
+        self.rejected_rows = 0
+        self.columns = {name: RunningStats() for name in MEASUREMENTS + FLAGS}
+        self.first_timestamp = None
+        self.last_timestamp = None
+        # EnergyConsumption totals per hour of day / weekday (from the timestamp)
+        self.hour_sum = np.zeros(24)
+        self.hour_count = np.zeros(24)
+        self.day_sum = np.zeros(7)
+        self.day_count = np.zeros(7)
+
+    def update(self, columns: Dict[str, np.ndarray], rejected_rows=0):
+        self.rejected_rows += rejected_rows
+        timestamps = columns['Timestamp']
+        if not len(timestamps):
+            return
+        self.rows += len(timestamps)
+        for name, stats in self.columns.items():
+            values = columns[name]
+            if values.dtype.kind == 'i':
+                values = np.where(values < 0, np.nan, values)
+            stats.update(values)
+
+        first, last = int(timestamps.min()), int(timestamps.max())
+        self.first_timestamp = first if self.first_timestamp is None else min(self.first_timestamp, first)
+        self.last_timestamp = last if self.last_timestamp is None else max(self.last_timestamp, last)
+
+        consumption = columns['EnergyConsumption'].astype(np.float64)
+        known = ~np.isnan(consumption)
+        hour = (timestamps[known] // 3600) % 24
+        day_of_week = (timestamps[known] // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+        self.hour_sum += np.bincount(hour, weights=consumption[known], minlength=24)
+        self.hour_count += np.bincount(hour, minlength=24)
+        self.day_sum += np.bincount(day_of_week, weights=consumption[known], minlength=7)
+        self.day_count += np.bincount(day_of_week, minlength=7)
+
+    def merge(self, other: 'IngestSummary'):
+        self.rows += other.rows
+        self.rejected_rows += other.rejected_rows
+        for name, stats in self.columns.items():
+            stats.merge(other.columns[name])
+        for attribute, pick in (('first_timestamp', min), ('last_timestamp', max)):
+            mine, theirs = getattr(self, attribute), getattr(other, attribute)
+            setattr(self, attribute, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        for attribute in ('hour_sum', 'hour_count', 'day_sum', 'day_count'):
+            setattr(self, attribute, getattr(self, attribute) + getattr(other, attribute))
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'rejected_rows': self.rejected_rows,
+            'columns': {name: stats.state() for name, stats in self.columns.items()},
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'hour_sum': self.hour_sum.tolist(),
+            'hour_count': self.hour_count.tolist(),
+            'day_sum': self.day_sum.tolist(),
+            'day_count': self.day_count.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Any]]) -> 'IngestSummary':
+        summary = cls()
+        if not state:
+            return summary
+        summary.rows = state['rows']
+        summary.rejected_rows = state['rejected_rows']
+        for name, stats in state['columns'].items():
+            summary.columns[name] = RunningStats(**stats)
+        summary.first_timestamp = state['first_timestamp']
+        summary.last_timestamp = state['last_timestamp']
+        for attribute in ('hour_sum', 'hour_count', 'day_sum', 'day_count'):
+            setattr(summary, attribute, np.asarray(state[attribute], dtype=np.float64))
+        return summary
+
+    def describe(self) -> Dict[str, Any]:
+        def means(sums, counts):
+            return [float(s / c) if c else None for s, c in zip(sums, counts)]
+
+        def iso(timestamp):
+            return None if timestamp is None else pd.Timestamp(timestamp, unit='s').isoformat()
+
+        return {
+            'rows': self.rows,
+            'rejected_rows': self.rejected_rows,
+            'time_range': {'start': iso(self.first_timestamp), 'end': iso(self.last_timestamp)},
+            'columns': {name: stats.describe() for name, stats in self.columns.items()},
+            'consumption_by_hour': means(self.hour_sum, self.hour_count),
+            'consumption_by_day_of_week': means(self.day_sum, self.day_count),
+        }
+
+
+# ============================================================================
+# CSV COERCION
+# ============================================================================
+
+def coerce_chunk(chunk: pd.DataFrame, mapping: Dict[str, str]):
+    """
+    Store-dtype arrays for one CSV chunk, keyed by store column, and the
+    number of rows dropped for an unreadable Timestamp or EnergyConsumption.
+    mapping is store column -> CSV header.
+    """
+    def source(name):
+        return chunk[mapping[name]] if name in mapping else None
+
+    timestamps = pd.to_datetime(source('Timestamp'), errors='coerce', utc=True)
+    consumption = pd.to_numeric(source('EnergyConsumption'), errors='coerce')
+    keep = (timestamps.notna() & consumption.notna()).to_numpy()
+    rejected = int(len(keep) - keep.sum())
+
+    epoch = timestamps[keep].dt.tz_localize(None).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    columns = {'Timestamp': epoch}
+    for name, dtype in COLUMNS.items():
+        if name == 'Timestamp':
+            continue
+        values = source(name)
+        if values is None:
+            if name == 'DayOfWeek':
+                columns[name] = ((epoch // 86400 + 3) % 7).astype(np.int8)
+            else:
+                columns[name] = np.full(len(epoch), np.nan if dtype.startswith('float') else -1, dtype=dtype)
+            continue
+        values = values[keep]
+        if name in FLAGS:
+            coded = values.astype(str).str.strip().str.lower().map(FLAG_VALUES)
+        elif name == 'DayOfWeek':
+            coded = values.astype(str).str.strip().str.lower().map(WEEKDAYS)
+        else:
+            coded = pd.to_numeric(values, errors='coerce')
+            if dtype.startswith('float'):
+                columns[name] = coded.to_numpy(dtype=dtype)
+                continue
+            coded = coded.round()
+        columns[name] = coded.fillna(-1).to_numpy(dtype=dtype)
+    return columns, rejected
+
+
+def ingest_csv(stream, store: 'ColumnarStore', chunk_rows=100000, compression=None,
+               source_name=None) -> IngestSummary:
+    """
+    Parse a CSV stream chunk by chunk into the store; returns the statistics
+    of this upload. Raises ValueError for a file without the required columns.
+    """
+    try:
+        reader = pd.read_csv(
+            stream, chunksize=chunk_rows, compression=compression, skipinitialspace=True,
+            usecols=lambda header: canonical_name(header) is not None
+        )
+        chunks = iter(reader)
+        first = next(chunks, None)
+    except pd.errors.EmptyDataError:
+        raise ValueError('The file is empty')
+    if first is None or first.empty:
+        raise ValueError('The file has no data rows')
+
+    mapping = {}
+    for header in first.columns:
+        mapping.setdefault(canonical_name(header), header)
+    missing = [name for name in REQUIRED if name not in mapping]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    summary = IngestSummary()
+    with store.writer(source_name) as writer:
+        for chunk in _chain(first, chunks):
+            columns, rejected = coerce_chunk(chunk, mapping)
+            summary.update(columns, rejected)
+            writer.append(columns)
+        writer.summary = summary
+    return summary
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+# ============================================================================
+# COLUMNAR STORE
+# ============================================================================
+
+@contextmanager
+def _exclusive_lock(path):
+    """
+    Hold an exclusive lock on the file at `path` for the with-block,
+    waiting until it is free. fcntl only exists on POSIX, so it is imported
+    here and Windows falls back to an msvcrt byte lock.
+    """
+    with open(path, 'w') as f:
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+            yield
+            return
+
+        import msvcrt
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                pass  # LK_LOCK gives up after about 10 seconds; keep waiting like flock
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ColumnarStore:
+    """Directory of append-only per-column binary files plus a JSON manifest"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _file(self, name):
+        return os.path.join(self.path, f'{name}.bin')
+
+    def manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, 'manifest.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'columns': COLUMNS, 'rows': 0, 'uploads': [], 'summary': None}
+
+    def _save_manifest(self, manifest):
+        path = os.path.join(self.path, 'manifest.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
+
+    @contextmanager
+    def writer(self, source_name=None):
+        """
+        Exclusive append session. Column bytes past the committed row count
+        (left by a crashed or failed upload) are cut off first; the manifest
+        is only rewritten once the whole session has succeeded.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with _exclusive_lock(os.path.join(self.path, '.lock')):
+            manifest = self.manifest()
+            committed = manifest['rows']
+            files = {}
+            try:
+                for name, dtype in COLUMNS.items():
+                    f = open(self._file(name), 'ab')
+                    f.truncate(committed * np.dtype(dtype).itemsize)
+                    files[name] = f
+                writer = _Writer(files)
+                yield writer
+                for f in files.values():
+                    f.flush()
+                    os.fsync(f.fileno())
+            except BaseException:
+                for name, f in files.items():
+                    f.truncate(committed * np.dtype(COLUMNS[name]).itemsize)
+                raise
+            finally:
+                for f in files.values():
+                    f.close()
+
+            summary = IngestSummary.from_state(manifest['summary'])
+            if writer.summary is not None:
+                summary.merge(writer.summary)
+            manifest['rows'] = committed + writer.rows
+            manifest['summary'] = summary.state()
+            manifest['uploads'].append({
+                'source': source_name,
+                'received_at': datetime.now().isoformat(timespec='seconds'),
+                'first_row': committed,
+                'rows': writer.rows,
+            })
+            self._save_manifest(manifest)
+
+    def column(self, name) -> np.ndarray:
+        """Read-only memory map of one committed column"""
+        rows = self.manifest()['rows']
+        if not rows:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(self._file(name), dtype=COLUMNS[name], mode='r', shape=(rows,))
+
+    def stats(self) -> Dict[str, Any]:
+        manifest = self.manifest()
+        return {
+            'path': self.path,
+            'rows': manifest['rows'],
+            'uploads': len(manifest['uploads']),
+            'bytes': manifest['rows'] * sum(np.dtype(dtype).itemsize for dtype in COLUMNS.values()),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return IngestSummary.from_state(self.manifest()['summary']).describe()
+
+
+class _Writer:
+    def __init__(self, files):
+        self.files = files
+        self.rows = 0
+        self.summary = None
+
+    def append(self, columns: Dict[str, np.ndarray]):
+        for name, dtype in COLUMNS.items():
+            self.files[name].write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        self.rows += len(columns['Timestamp'])
+
+
+def compression_for(filename: Optional[str]) -> Optional[str]:
+    return 'gzip' if filename and filename.lower().endswith('.gz') else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Columnar store of uploaded meter data')
+    parser.add_argument('--store', default=os.environ.get('DATA_STORE_PATH', 'data_store'))
+    commands = parser.add_subparsers(dest='command', required=True)
+    sub = commands.add_parser('ingest', help='Append a CSV (or .csv.gz) file')
+    sub.add_argument('csv')
+    sub.add_argument('--chunk-rows', type=int, default=100000)
+    commands.add_parser('summary', help='Print the running statistics')
+    args = parser.parse_args(argv)
+
+    store = ColumnarStore(args.store)
+    if args.command == 'ingest':
+        started = datetime.now()
+        with open(args.csv, 'rb') as f:
+            summary = ingest_csv(f, store, args.chunk_rows, compression_for(args.csv),
+                                 os.path.basename(args.csv))
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"✅ {summary.rows} rows ingested ({summary.rejected_rows} rejected) in {elapsed:.1f}s")
+    print(json.dumps(store.summary(), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
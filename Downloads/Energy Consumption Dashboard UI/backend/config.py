@@ -28,6 +28,18 @@ class Config:
     RATE_LIMIT_DEFAULT: str = os.environ.get('RATE_LIMIT_DEFAULT', '200 per day, 50 per hour')
     RATE_LIMIT_PREDICT: str = os.environ.get('RATE_LIMIT_PREDICT', '30 per minute')
     
+    # Forecasting
+    FORECAST_MAX_DAYS: int = int(os.environ.get('FORECAST_MAX_DAYS', 14))
+    FORECAST_MAX_SCENARIOS: int = int(os.environ.get('FORECAST_MAX_SCENARIOS', 20))
+    
+    # Uploaded meter data (see columnar_store.py)
+    DATA_STORE_PATH: str = os.environ.get('DATA_STORE_PATH', 'data_store')
+    UPLOAD_CHUNK_ROWS: int = int(os.environ.get('UPLOAD_CHUNK_ROWS', 100000))
+    
+    # Live meter readings for real lag features (see lag_store.py)
+    LAG_STORE_CAPACITY_HOURS: int = int(os.environ.get('LAG_STORE_CAPACITY_HOURS', 192))
+    LAG_STORE_MAX_METERS: int = int(os.environ.get('LAG_STORE_MAX_METERS', 10000))
+    
     # Data Validation
     VALIDATION_STRICT: bool = os.environ.get('VALIDATION_STRICT', 'True').lower() == 'true'
     
@@ -0,0 +1,251 @@
+"""
+In-memory per-meter history for real lag features
+
+Without history, app.py approximates the lag and rolling features with a
+time-of-day heuristic. When a meter sends its actual hourly readings, this
+store keeps them in one ring buffer per meter. The buffer is indexed by
+absolute hour (slot = hour % capacity), and every window the model reads
+is maintained incrementally as readings arrive:
+  - consumption_lag_1h/24h/168h   ring buffer lookups
+  - temperature/humidity_rolling_24h
+                                  running sums over the last 23 stored hours,
+                                  plus the request's current value
+  - avg_consumption_same_hour/day running sums per hour of day / weekday over
+                                  every reading ever ingested (train_model.py's
+                                  expanding means)
+Ingesting a reading and building a prediction's features are O(1). A jump
+forward of many hours clears at most `capacity` slots. A late reading for
+an hour still in the buffer replaces the earlier value and corrects every
+sum. Readings older than the buffer are counted as stale and dropped.
+
+Hours are counted on the wall clock of the given timestamps, so hour of
+day and weekday match the ones the model was trained on. The store lives
+in the process: every worker keeps its own.
+"""
+
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+LAG_HOURS = (1, 24, 168)
+ROLLING_HOURS = 24
+EPOCH = datetime(1970, 1, 1)
+
+
+def hour_index(timestamp) -> int:
+    """Hours since 1970-01-01 on the timestamp's own wall clock"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.strip().replace('Z', '+00:00'))
+    return int((timestamp.replace(tzinfo=None) - EPOCH).total_seconds() // 3600)
+
+
+def hour_of_day(hour: int) -> int:
+    return hour % 24
+
+
+def day_of_week(hour: int) -> int:
+    """0 Monday .. 6 Sunday; 1970-01-01 was a Thursday"""
+    return (hour // 24 + 3) % 7
+
+
+def calendar(hour: int) -> Dict[str, Any]:
+    """Time features of an hour index, defined as in train_model.py"""
+    timestamp = EPOCH + timedelta(hours=hour)
+    hod, dow = hour_of_day(hour), day_of_week(hour)
+    return {
+        'timestamp': timestamp.isoformat(),
+        'hour': hod,
+        'day_of_week': dow,
+        'month': timestamp.month,
+        'is_weekend': 1 if dow >= 5 else 0,
+        'is_business_hour': 1 if 8 <= hod <= 18 else 0,
+    }
+
+
+class MeterHistory:
+    """Ring buffer of one meter's hourly readings with incrementally kept windows"""
+
+    def __init__(self, capacity=192):
+        if capacity <= max(LAG_HOURS):
+            raise ValueError(f"capacity must exceed {max(LAG_HOURS)} hours")
+        self.capacity = capacity
+        self.consumption = [math.nan] * capacity
+        self.temperature = [math.nan] * capacity
+        self.humidity = [math.nan] * capacity
+        self.last_hour = None
+        self.readings = 0
+        # Rolling window: the ROLLING_HOURS - 1 hours up to last_hour; the
+        # hour being predicted supplies the last value
+        self.window = ROLLING_HOURS - 1
+        self.temperature_sum = self.temperature_count = 0.0
+        self.humidity_sum = self.humidity_count = 0.0
+        self.hour_sum = [0.0] * 24
+        self.hour_count = [0] * 24
+        self.day_sum = [0.0] * 7
+        self.day_count = [0] * 7
+
+    def _window_add(self, hour, sign):
+        slot = hour % self.capacity
+        if not math.isnan(self.temperature[slot]):
+            self.temperature_sum += sign * self.temperature[slot]
+            self.temperature_count += sign
+        if not math.isnan(self.humidity[slot]):
+            self.humidity_sum += sign * self.humidity[slot]
+            self.humidity_count += sign
+
+    def _advance(self, hour):
+        """Move last_hour forward, retiring hours that leave the window or the buffer"""
+        if self.last_hour is not None and hour - self.last_hour < self.capacity:
+            for h in range(self.last_hour + 1, hour + 1):
+                self._window_add(h - self.window, -1)
+                slot = h % self.capacity
+                self.consumption[slot] = self.temperature[slot] = self.humidity[slot] = math.nan
+        else:
+            self.consumption = [math.nan] * self.capacity
+            self.temperature = [math.nan] * self.capacity
+            self.humidity = [math.nan] * self.capacity
+            self.temperature_sum = self.temperature_count = 0.0
+            self.humidity_sum = self.humidity_count = 0.0
+        self.last_hour = hour
+
+    def add(self, hour: int, consumption: float, temperature=None, humidity=None) -> bool:
+        """
+        Record the reading for `hour` (replacing an earlier one for the same
+        hour); False if it is older than the buffer
+        """
+        if self.last_hour is None or hour > self.last_hour:
+            self._advance(hour)
+        elif hour <= self.last_hour - self.capacity:
+            return False
+
+        slot = hour % self.capacity
+        hod, dow = hour_of_day(hour), day_of_week(hour)
+        previous = self.consumption[slot]
+        if not math.isnan(previous):
+            self.hour_sum[hod] -= previous
+            self.hour_count[hod] -= 1
+            self.day_sum[dow] -= previous
+            self.day_count[dow] -= 1
+        self.consumption[slot] = consumption
+        self.hour_sum[hod] += consumption
+        self.hour_count[hod] += 1
+        self.day_sum[dow] += consumption
+        self.day_count[dow] += 1
+
+        in_window = hour > self.last_hour - self.window
+        if in_window:
+            self._window_add(hour, -1)
+        if temperature is not None:
+            self.temperature[slot] = temperature
+        if humidity is not None:
+            self.humidity[slot] = humidity
+        if in_window:
+            self._window_add(hour, +1)
+        self.readings += 1
+        return True
+
+    def features(self, hour: int, temperature=None, humidity=None) -> Dict[str, float]:
+        """
+        The history-based model features for a prediction at `hour`. Features
+        the buffer can't provide (gaps, hours outside it) are left out.
+        """
+        features = {}
+        for lag in LAG_HOURS:
+            h = hour - lag
+            if self.last_hour - self.capacity < h <= self.last_hour:
+                value = self.consumption[h % self.capacity]
+                if not math.isnan(value):
+                    features[f'consumption_lag_{lag}h'] = value
+
+        # The kept window ends right before the next hour; other hours use the request's values
+        if hour == self.last_hour + 1:
+            if temperature is not None and self.temperature_count:
+                features['temperature_rolling_24h'] = \
+                    (self.temperature_sum + temperature) / (self.temperature_count + 1)
+            if humidity is not None and self.humidity_count:
+                features['humidity_rolling_24h'] = \
+                    (self.humidity_sum + humidity) / (self.humidity_count + 1)
+
+        hod, dow = hour_of_day(hour), day_of_week(hour)
+        if self.hour_count[hod]:
+            features['avg_consumption_same_hour'] = self.hour_sum[hod] / self.hour_count[hod]
+        if self.day_count[dow]:
+            features['avg_consumption_same_day'] = self.day_sum[dow] / self.day_count[dow]
+        return features
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'readings': self.readings,
+            'buffered_hours': sum(not math.isnan(value) for value in self.consumption),
+            'last_hour': None if self.last_hour is None else
+                (EPOCH + timedelta(hours=self.last_hour)).isoformat(),
+        }
+
+
+class LagStore:
+    """MeterHistory per meter id, shared by request threads"""
+
+    def __init__(self, capacity=192, max_meters=10000):
+        self.capacity = capacity
+        self.max_meters = max_meters
+        self.meters: Dict[str, MeterHistory] = {}
+        self._lock = threading.Lock()
+
+    def ingest(self, meter_id: str, readings) -> Dict[str, int]:
+        """
+        Add readings ({'timestamp', 'consumption', 'temperature'?, 'humidity'?})
+        in any order. Raises ValueError on a malformed reading, before any of
+        the batch is stored, or when the store is full.
+        """
+        parsed = []
+        for idx, reading in enumerate(readings):
+            try:
+                hour = hour_index(reading['timestamp'])
+                consumption = float(reading['consumption'])
+                temperature = reading.get('temperature')
+                humidity = reading.get('humidity')
+                temperature = None if temperature is None else float(temperature)
+                humidity = None if humidity is None else float(humidity)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                raise ValueError(f"Reading {idx}: needs an ISO 'timestamp' and a numeric 'consumption' ({e})")
+            if not math.isfinite(consumption) or consumption < 0:
+                raise ValueError(f"Reading {idx}: consumption must be a non-negative number")
+            parsed.append((hour, consumption, temperature, humidity))
+        # Oldest first, so a batch never drops its own earlier hours as stale
+        parsed.sort(key=lambda reading: reading[0])
+
+        with self._lock:
+            meter = self.meters.get(meter_id)
+            if meter is None:
+                if len(self.meters) >= self.max_meters:
+                    raise ValueError(f"Lag store is full ({self.max_meters} meters)")
+                meter = self.meters[meter_id] = MeterHistory(self.capacity)
+            accepted = sum(meter.add(*reading) for reading in parsed)
+        return {'accepted': accepted, 'stale': len(parsed) - accepted}
+
+    def features(self, meter_id: str, hour: Optional[int] = None, temperature=None, humidity=None):
+        """
+        (target hour, history features) for a meter, or None if it has no
+        readings. hour defaults to the hour after the latest reading.
+        """
+        with self._lock:
+            meter = self.meters.get(meter_id)
+            if meter is None or meter.last_hour is None:
+                return None
+            if hour is None:
+                hour = meter.last_hour + 1
+            return hour, meter.features(hour, temperature, humidity)
+
+    def meter_stats(self, meter_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            meter = self.meters.get(meter_id)
+            return None if meter is None else meter.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'meters': len(self.meters),
+                'readings': sum(meter.readings for meter in self.meters.values()),
+                'capacity_hours': self.capacity,
+            }
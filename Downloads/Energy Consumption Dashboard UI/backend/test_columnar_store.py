@@ -0,0 +1,128 @@
+"""
+Behaviour check for the columnar store
+Chunked ingestion must store the same values and statistics as reading the
+whole CSV at once, and a failed upload must leave no trace: the manifest is
+unchanged and the column files are cut back to the committed rows
+"""
+
+import io
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from columnar_store import COLUMNS, ColumnarStore, ingest_csv
+
+
+def meter_csv(n_rows, seed=0, start='2024-01-01'):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'Timestamp': pd.date_range(start, periods=n_rows, freq='h').astype(str),
+        'Temperature': rng.normal(20, 5, n_rows).round(2),
+        'Humidity': rng.uniform(30, 70, n_rows).round(2),
+        'Occupancy': rng.integers(0, 50, n_rows),
+        'HVACUsage': rng.choice(['On', 'Off'], n_rows),
+        'Holiday': rng.choice(['Yes', 'No'], n_rows),
+        'EnergyConsumption': rng.uniform(50, 90, n_rows).round(3),
+    })
+    return frame.to_csv(index=False).encode()
+
+
+class FailingStream:
+    """A client that disconnects after sending `limit` bytes"""
+
+    def __init__(self, data, limit):
+        self.buffer = io.BytesIO(data[:limit])
+
+    def read(self, size=-1):
+        chunk = self.buffer.read(size)
+        if not chunk:
+            raise ConnectionError('client went away')
+        return chunk
+
+
+def column_sizes(store):
+    return {name: os.path.getsize(store._file(name)) // np.dtype(dtype).itemsize for name, dtype in COLUMNS.items()}
+
+
+def test_chunked_matches_whole_file():
+    """Values and statistics do not depend on the chunk size"""
+    data = meter_csv(2500)
+    reference = pd.read_csv(io.BytesIO(data))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ColumnarStore(os.path.join(tmp, 'small'))
+        ingest_csv(io.BytesIO(data), store, chunk_rows=97)
+        whole = ColumnarStore(os.path.join(tmp, 'whole'))
+        ingest_csv(io.BytesIO(data), whole, chunk_rows=10000)
+
+        assert store.stats()['rows'] == 2500
+        energy = store.column('EnergyConsumption')
+        assert np.allclose(energy, reference['EnergyConsumption'], atol=1e-4)
+        assert store.column('HVACUsage').tolist() == (reference['HVACUsage'] == 'On').astype(int).tolist()
+        assert (store.column('LightingUsage') == -1).all()  # column absent from the CSV
+        assert (np.diff(store.column('Timestamp')) == 3600).all()
+        # 2024-01-01 was a Monday
+        assert store.column('DayOfWeek')[:25].tolist() == [0] * 24 + [1]
+
+        summary, expected = store.summary(), whole.summary()
+        for name in ('EnergyConsumption', 'Temperature', 'Occupancy', 'Holiday'):
+            got, want = summary['columns'][name], expected['columns'][name]
+            assert got['count'] == want['count'] == 2500
+            assert abs(got['mean'] - want['mean']) < 1e-6 and abs(got['std'] - want['std']) < 1e-6
+            assert got['min'] == want['min'] and got['max'] == want['max']
+        stored = np.asarray(energy, dtype=np.float64)
+        assert abs(summary['columns']['EnergyConsumption']['std'] - stored.std(ddof=1)) < 1e-6
+        hours = (store.column('Timestamp') // 3600) % 24
+        assert abs(summary['consumption_by_hour'][5] - stored[hours == 5].mean()) < 1e-6
+
+
+def test_failed_upload_rolls_back():
+    """A dropped connection mid-upload commits nothing and the next upload appends cleanly"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ColumnarStore(os.path.join(tmp, 'store'))
+        ingest_csv(io.BytesIO(meter_csv(300)), store, chunk_rows=100, source_name='first.csv')
+        before = store.manifest()
+
+        data = meter_csv(20000, seed=1, start='2024-02-01')
+        try:
+            ingest_csv(FailingStream(data, len(data) // 2), store, chunk_rows=500)
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError('the upload should have failed')
+        assert store.manifest() == before
+        assert set(column_sizes(store).values()) == {300}
+
+        # Bytes left behind by a crashed writer are cut off by the next one
+        with open(store._file('Temperature'), 'ab') as f:
+            f.write(b'\0' * 64)
+        ingest_csv(io.BytesIO(meter_csv(50, seed=2, start='2024-03-01')), store)
+        assert store.stats()['rows'] == 350 and store.stats()['uploads'] == 2
+        assert set(column_sizes(store).values()) == {350}
+        assert [upload['first_row'] for upload in store.manifest()['uploads']] == [0, 300]
+        assert store.summary()['columns']['EnergyConsumption']['count'] == 350
+
+
+def test_rejected_rows_and_bad_files():
+    """Unreadable rows are counted, files without required columns are refused"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ColumnarStore(os.path.join(tmp, 'store'))
+        csv = b'time,consumption,hvac status\n2024-01-01 00:00,10,on\nsoon,11,off\n2024-01-01 02:00,,on\n'
+        summary = ingest_csv(io.BytesIO(csv), store)
+        assert summary.rows == 1 and summary.rejected_rows == 2
+        for bad in (b'', b'Timestamp,Temperature\n2024-01-01,20\n', b'Timestamp,EnergyConsumption\n'):
+            try:
+                ingest_csv(io.BytesIO(bad), store)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(bad)
+        assert store.stats()['rows'] == 1 and store.stats()['uploads'] == 1
+
+
+if __name__ == '__main__':
+    test_chunked_matches_whole_file()
+    print("✓ Ingest check passed: chunked uploads store the same values and statistics")
+    test_failed_upload_rolls_back()
+    print("✓ Rollback check passed: failed uploads leave the store untouched")
+    test_rejected_rows_and_bad_files()
+    print("✓ Input check passed: bad rows are counted, bad files refused")
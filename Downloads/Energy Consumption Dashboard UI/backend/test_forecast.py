@@ -0,0 +1,117 @@
+"""
+Behaviour check for the recursive forecast
+Scenarios forecast together must match each one forecast alone, daily
+values and bounds must be sums of the hourly ones, and only the last week
+of history may influence the result
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+import app
+from forest_stats import compile_forest_stats, fit_calibration
+
+START = '2024-03-04T00:00:00'
+
+
+def install_model(seed=0):
+    """Fit a small forest on synthetic hourly data and load it into the app"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(1500, 16))
+    X[:, :3] = rng.uniform(20, 80, size=(1500, 3))  # lags
+    X[:, 3] = rng.uniform(-5, 35, size=1500)        # temperature
+    y = 0.6 * X[:, 0] + 0.3 * X[:, 2] + 0.8 * np.abs(X[:, 3] - 18) + rng.normal(scale=2, size=1500)
+    model = RandomForestRegressor(n_estimators=15, max_depth=8, random_state=seed).fit(X, y)
+    app.model = model
+    app.forest_stats = compile_forest_stats(model)
+    app.model_metadata = {}
+    return model, X, y
+
+
+def post(payload):
+    return app.app.test_client().post('/api/predict/forecast', json=payload)
+
+
+def test_scenarios_are_independent():
+    """Each scenario's forecast is unchanged by the other scenarios in the request"""
+    install_model()
+    history = np.random.default_rng(1).uniform(30, 70, size=200)
+    scenarios = [{'temperature': 20.0}, {'temperature': 32.0, 'renewable': 10.0}, {'temperature': 5.0}]
+    start = pd.Timestamp(START)
+    together, std = app.run_forecast(start, 48, scenarios, history)
+    assert together.shape == std.shape == (3, 48)
+    for idx, scenario in enumerate(scenarios):
+        alone, alone_std = app.run_forecast(start, 48, [scenario], history)
+        assert np.allclose(together[idx], alone[0], rtol=0, atol=1e-9)
+        assert np.allclose(std[idx], alone_std[0], rtol=0, atol=1e-9)
+
+    # Only the last week of history is used
+    trimmed, _ = app.run_forecast(start, 48, scenarios, history[-app.LAG_HOURS:])
+    assert np.array_equal(together, trimmed)
+    changed = history.copy()
+    changed[:-app.LAG_HOURS] = 0.0
+    assert np.array_equal(app.run_forecast(start, 48, scenarios, changed)[0], together)
+
+
+def test_daily_sums():
+    """Daily predicted and bounds are the sums of the hourly values and half-widths"""
+    install_model()
+    response = post({
+        'days': 3,
+        'base_features': {'timestamp': START, 'temperature': 24.0},
+        'scenarios': [{'name': 'cold', 'temperature': 2.0}],
+        'include_hourly': True,
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['interval_method'] == 'tree_spread_hourly_sum' and body['history_hours'] == 0
+    assert [s['name'] for s in body['scenarios']] == ['base', 'cold']
+    hourly = body['hourly']
+    assert len(hourly) == 72 and hourly[0]['timestamp'] == START
+    for day, daily in enumerate(body['forecast']):
+        hours = hourly[day * 24:(day + 1) * 24]
+        predicted = sum(h['predicted'] for h in hours)
+        spread = sum(h['upper_bound'] - h['predicted'] for h in hours)
+        assert abs(daily['predicted'] - predicted) < 1e-6
+        assert abs(daily['upper_bound'] - (predicted + spread)) < 1e-6
+        assert abs(daily['lower_bound'] - max(0.0, predicted - spread)) < 1e-6
+    assert [d['date'] for d in body['forecast']] == ['2024-03-04', '2024-03-05', '2024-03-06']
+
+
+def test_calibrated_and_history():
+    """Calibrated intervals are labelled as such; history length is reported"""
+    _, X, y = install_model()
+    mean, std = app.forest_stats.predict_with_std(X)
+    app.model_metadata = {'calibration': fit_calibration(y, mean, std, level=0.9)}
+    try:
+        body = post({
+            'days': 1,
+            'base_features': {'timestamp': START},
+            'history': [45.0] * 300,
+        }).get_json()
+    finally:
+        app.model_metadata = {}
+    assert body['interval_method'] == 'calibrated_hourly_sum'
+    assert body['history_hours'] == app.LAG_HOURS
+
+
+def test_request_validation():
+    """Bad days, history, timestamps and scenario values are 400s"""
+    install_model()
+    for payload in (
+        {'days': 0}, {'days': True}, {'days': 'seven'}, {'days': app.FORECAST_MAX_DAYS + 1},
+        {'history': [1.0, -2.0]}, {'history': ['a']}, {'history': [float('nan')]},
+        {'base_features': {'timestamp': 'not a date'}},
+        {'scenarios': ['hot']}, {'scenarios': [{'temperature': 'hot'}]},
+    ):
+        assert post(payload).status_code == 400, payload
+
+
+if __name__ == '__main__':
+    test_scenarios_are_independent()
+    print("✓ Scenario check passed: scenarios forecast together match each one alone")
+    test_daily_sums()
+    test_calibrated_and_history()
+    print("✓ Aggregation check passed: daily values and bounds sum the hourly ones")
+    test_request_validation()
+    print("✓ Validation check passed: malformed forecasts are rejected")
@@ -0,0 +1,90 @@
+"""
+Parity check for the flattened forest
+ForestStats must reproduce sklearn's per-tree predictions, mean and spread,
+and calibrated intervals must cover held-out data at their stated level
+"""
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from forest_stats import compile_forest_stats, fit_calibration, interval_half_width
+
+
+def make_data(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 16))
+    X[:, 13:] = rng.integers(0, 2, size=(n_rows, 3))  # flag-like columns
+    y = 50 + 10 * X[:, 0] - 5 * X[:, 3] * X[:, 13] + 3 * np.sin(X[:, 5]) + rng.normal(scale=2, size=n_rows)
+    return X, y
+
+
+def fit_model(seed=0):
+    X, y = make_data(2000, seed)
+    return RandomForestRegressor(n_estimators=30, max_depth=10, random_state=seed).fit(X, y)
+
+
+def test_parity_with_sklearn():
+    """Every tree's prediction, the mean and the std match sklearn's per-tree predict"""
+    model = fit_model()
+    stats = compile_forest_stats(model)
+    X, _ = make_data(500, 1)
+    # Rows sitting exactly on split thresholds exercise the <= comparison
+    tree = model.estimators_[0].tree_
+    on_split = np.repeat(X[:1], 20, axis=0)
+    internal = np.flatnonzero(tree.children_left != -1)[:20]
+    on_split[np.arange(len(internal)), tree.feature[internal]] = tree.threshold[internal]
+    X = np.vstack([X, on_split])
+
+    expected = np.stack([estimator.predict(X) for estimator in model.estimators_], axis=1)
+    per_tree = stats.tree_predictions(X)
+    assert np.array_equal(per_tree, expected), np.abs(per_tree - expected).max()
+
+    mean, std = stats.predict_with_std(X)
+    assert np.allclose(mean, model.predict(X), rtol=0, atol=1e-9)
+    assert np.allclose(std, expected.std(axis=1), rtol=0, atol=1e-9)
+    assert stats.n_trees == 30
+
+    single_mean, _ = stats.predict_with_std(X[0])
+    assert np.allclose(single_mean, model.predict(X[:1]), rtol=0, atol=1e-9)
+
+
+def test_shape_errors_and_other_models():
+    """Wrong feature counts raise; models without trees get no ForestStats"""
+    stats = compile_forest_stats(fit_model())
+    try:
+        stats.tree_predictions(np.zeros((2, 15)))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('expected a feature count error')
+    X, y = make_data(50, 2)
+    assert compile_forest_stats(LinearRegression().fit(X, y)) is None
+
+
+def test_calibrated_coverage():
+    """Intervals calibrated on one held-out set cover a fresh set at about the stated level"""
+    model = fit_model()
+    stats = compile_forest_stats(model)
+    X_cal, y_cal = make_data(1500, 3)
+    mean, std = stats.predict_with_std(X_cal)
+    calibration = fit_calibration(y_cal, mean, std, level=0.9)
+    assert calibration['n_residuals'] == 1500
+
+    X_new, y_new = make_data(3000, 4)
+    mean, std = stats.predict_with_std(X_new)
+    half_width = interval_half_width(std, calibration)
+    coverage = (np.abs(y_new - mean) <= half_width).mean()
+    assert 0.86 <= coverage <= 0.94, coverage
+
+    # Without calibration the interval is the normal approximation
+    assert np.allclose(interval_half_width(std), 1.96 * std)
+    # Rows where every tree agrees still get a non-zero interval
+    assert (interval_half_width(np.zeros(3), calibration) > 0).all()
+
+
+if __name__ == '__main__':
+    test_parity_with_sklearn()
+    test_shape_errors_and_other_models()
+    print("✓ Parity check passed: flattened forest matches sklearn tree by tree")
+    test_calibrated_coverage()
+    print("✓ Calibration check passed: held-out coverage matches the stated level")
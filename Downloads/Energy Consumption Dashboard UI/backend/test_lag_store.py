@@ -0,0 +1,168 @@
+"""
+Behaviour check for the per-meter lag store
+The incrementally kept sums must equal a brute-force recount after the ring
+buffer wraps, after late readings replace earlier ones and after jumps
+past the whole buffer; predictions naming a meter must still be validated
+"""
+
+import math
+import random
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+import app
+from forest_stats import compile_forest_stats
+from lag_store import LAG_HOURS, ROLLING_HOURS, LagStore, MeterHistory, day_of_week, hour_index
+
+
+class BruteForce:
+    """Every accepted reading by hour, recounted from scratch for each check"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.readings = {}
+        self.last_hour = None
+
+    def add(self, hour, consumption, temperature, humidity):
+        if self.last_hour is not None and hour <= self.last_hour - self.capacity:
+            return False
+        if self.last_hour is None or hour > self.last_hour:
+            self.last_hour = hour
+        _, old_temperature, old_humidity = self.readings.get(hour, (None, None, None))
+        self.readings[hour] = (
+            consumption,
+            old_temperature if temperature is None else temperature,
+            old_humidity if humidity is None else humidity,
+        )
+        return True
+
+    def features(self, hour, temperature, humidity):
+        buffered = {h: r for h, r in self.readings.items() if h > self.last_hour - self.capacity}
+        features = {}
+        for lag in LAG_HOURS:
+            if hour - lag in buffered:
+                features[f'consumption_lag_{lag}h'] = buffered[hour - lag][0]
+        if hour == self.last_hour + 1:
+            window = [r for h, r in buffered.items() if h > self.last_hour - (ROLLING_HOURS - 1)]
+            for name, index, current in (('temperature', 1, temperature), ('humidity', 2, humidity)):
+                values = [r[index] for r in window if r[index] is not None]
+                if values:
+                    features[f'{name}_rolling_24h'] = (sum(values) + current) / (len(values) + 1)
+        same_hour = [r[0] for h, r in self.readings.items() if h % 24 == hour % 24]
+        same_day = [r[0] for h, r in self.readings.items() if day_of_week(h) == day_of_week(hour)]
+        if same_hour:
+            features['avg_consumption_same_hour'] = sum(same_hour) / len(same_hour)
+        if same_day:
+            features['avg_consumption_same_day'] = sum(same_day) / len(same_day)
+        return features
+
+
+def assert_same(got, expected):
+    assert set(got) == set(expected), (sorted(got), sorted(expected))
+    for name, value in expected.items():
+        assert math.isclose(got[name], value, rel_tol=1e-9, abs_tol=1e-6), (name, got[name], value)
+
+
+def test_matches_brute_force():
+    """Wrap-around, late readings, missing weather and big jumps all keep the sums exact"""
+    rng = random.Random(0)
+    capacity = 192
+    meter, reference = MeterHistory(capacity), BruteForce(capacity)
+    hour = 500000
+    stale = 0
+    for step in range(6000):
+        roll = rng.random()
+        if roll < 0.75:
+            hour += 1
+            target = hour
+        elif roll < 0.93:
+            target = hour - rng.randint(0, capacity + 40)  # late, sometimes stale
+        else:
+            hour += rng.choice([rng.randint(2, 100), rng.randint(capacity, 3 * capacity)])
+            target = hour
+        reading = (
+            target,
+            round(rng.uniform(10, 500), 3),
+            None if rng.random() < 0.2 else round(rng.uniform(-5, 35), 2),
+            None if rng.random() < 0.2 else round(rng.uniform(20, 90), 2),
+        )
+        accepted = meter.add(*reading)
+        assert accepted == reference.add(*reading)
+        stale += not accepted
+
+        if step % 7 == 0:
+            for target_hour in (reference.last_hour + 1, reference.last_hour + 30, reference.last_hour - 5):
+                assert_same(meter.features(target_hour, 21.0, 55.0), reference.features(target_hour, 21.0, 55.0))
+    assert stale > 0 and meter.readings == 6000 - stale
+    buffered = sum(h > reference.last_hour - capacity for h in reference.readings)
+    assert meter.stats()['buffered_hours'] == buffered
+
+
+def test_store_ingest():
+    """Batches are sorted before ingestion, stale readings counted, bad ones refuse the batch"""
+    store = LagStore(capacity=192, max_meters=2)
+    start = hour_index('2024-01-01T00:00:00')
+    readings = [{'timestamp': f'2024-01-{1 + h // 24:02d}T{h % 24:02d}:00:00', 'consumption': float(h)}
+                for h in range(200)]
+    result = store.ingest('m1', list(reversed(readings)))
+    assert result == {'accepted': 200, 'stale': 0}
+    assert store.ingest('m1', [{'timestamp': '2023-12-01T00:00:00', 'consumption': 1}])['stale'] == 1
+
+    hour, features = store.features('m1')
+    assert hour == start + 200
+    assert features['consumption_lag_1h'] == 199.0 and features['consumption_lag_168h'] == 32.0
+
+    for bad in ([{'timestamp': '2024-01-09T08:00:00', 'consumption': -1}],
+                [{'timestamp': 'yesterday', 'consumption': 1}],
+                [{'consumption': 1}]):
+        try:
+            store.ingest('m1', [{'timestamp': '2024-01-09T09:00:00', 'consumption': 5}] + bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(bad)
+    assert store.features('m1')[0] == start + 200  # nothing of the rejected batches was stored
+
+    store.ingest('m2', readings[:1])
+    try:
+        store.ingest('m3', readings[:1])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('the store should be full')
+    assert store.features('unknown') is None
+
+
+def test_predict_with_meter():
+    """Meter rows get history features, and are validated before the history is joined"""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(500, 16))
+    model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, X[:, 0])
+    app.model, app.forest_stats, app.model_metadata = model, compile_forest_stats(model), {}
+    app.lag_store = LagStore()
+    client = app.app.test_client()
+
+    readings = [{'timestamp': f'2024-01-01T{h:02d}:00:00', 'consumption': 100.0 + h, 'temperature': 20.0}
+                for h in range(24)]
+    assert client.post('/api/meters/m1/readings', json={'readings': readings}).status_code == 200
+
+    response = client.post('/api/predict', json={'features': [{'meter_id': 'm1', 'temperature': 'abc'}]})
+    assert response.status_code == 400
+    assert response.get_json()['validation_errors'][0]['field'] == 'temperature'
+
+    body = client.post('/api/predict', json={'features': [{'meter_id': 'm1', 'temperature': 20.0}, {}]}).get_json()
+    with_history, without = body['predictions']
+    assert 'consumption_lag_1h' in with_history['history_features']
+    assert with_history['timestamp'] == '2024-01-02T00:00:00' and 'history_features' not in without
+
+    info = client.get('/api/meters/m1').get_json()
+    assert info['history_features']['consumption_lag_1h'] == 123.0
+    assert client.get('/api/meters/nobody').status_code == 404
+
+
+if __name__ == '__main__':
+    test_matches_brute_force()
+    print("✓ Window check passed: incremental sums match a brute-force recount")
+    test_store_ingest()
+    print("✓ Ingest check passed: batches are ordered, stale readings counted, bad batches refused")
+    test_predict_with_meter()
+    print("✓ API check passed: meter rows are validated and get their history")
@@ -0,0 +1,118 @@
+"""
+Behaviour check for batch prediction
+A multi-row /api/predict must give exactly what scoring each row on its own
+gives, bounds must follow the spread across trees, and validation must
+report every bad row at once
+"""
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+import app
+from forest_stats import compile_forest_stats
+
+
+def random_rows(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'temperature': float(rng.uniform(-5, 35)),
+            'humidity': float(rng.uniform(20, 90)),
+            'renewable': float(rng.uniform(0, 100)),
+            'hour': int(rng.integers(0, 24)),
+            'day_of_week': int(rng.integers(0, 7)),
+            'month': int(rng.integers(1, 13)),
+            'is_weekend': int(rng.integers(0, 2)),
+            'is_business_hour': int(rng.integers(0, 2)),
+        }
+        for _ in range(n_rows)
+    ]
+
+
+def install_model(seed=0):
+    """Fit a small forest on transformed rows and load it into the app"""
+    X = app.transform_features_batch(random_rows(1500, seed))
+    rng = np.random.default_rng(seed)
+    y = X[:, 0] + 0.5 * X[:, 3] - 0.1 * X[:, 15] + rng.normal(scale=2, size=len(X))
+    model = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=seed).fit(X, y)
+    app.model = model
+    app.forest_stats = compile_forest_stats(model)
+    app.model_metadata = {}
+    return model
+
+
+def post(payload):
+    return app.app.test_client().post('/api/predict', json=payload)
+
+
+def test_batch_matches_single_rows():
+    """Each row of a batch equals that row transformed and predicted alone"""
+    model = install_model()
+    rows = random_rows(40, 1)
+    response = post({'features': rows})
+    assert response.status_code == 200
+    predictions = response.get_json()['predictions']
+    assert [p['index'] for p in predictions] == list(range(40))
+    for row, result in zip(rows, predictions):
+        X_row = np.array([app.transform_features_for_prediction(row)])
+        assert abs(result['predicted'] - model.predict(X_row)[0]) < 1e-9
+
+    # The vectorized transform matches the row-at-a-time one
+    X = app.transform_features_batch(rows)
+    assert np.allclose(X, [app.transform_features_for_prediction(row) for row in rows])
+
+
+def test_bounds_follow_tree_spread():
+    """Uncalibrated bounds are prediction ± 1.96 std across trees, clipped at zero"""
+    model = install_model()
+    rows = random_rows(25, 2)
+    predictions = post({'features': rows}).get_json()['predictions']
+    X = app.transform_features_batch(rows)
+    per_tree = np.stack([tree.predict(X) for tree in model.estimators_], axis=1)
+    std = per_tree.std(axis=1)
+    for result, mean, spread in zip(predictions, per_tree.mean(axis=1), std):
+        assert result['interval_method'] == 'tree_spread'
+        assert abs(result['std'] - spread) < 1e-9
+        assert abs(result['upper_bound'] - (mean + 1.96 * spread)) < 1e-9
+        assert abs(result['lower_bound'] - max(0.0, mean - 1.96 * spread)) < 1e-9
+
+    # Without the flattened forest the per-tree fallback gives the same bounds
+    app.forest_stats = None
+    fallback = post({'features': rows}).get_json()['predictions']
+    assert all(abs(a['upper_bound'] - b['upper_bound']) < 1e-9 for a, b in zip(predictions, fallback))
+
+    without = post({'features': rows[:3], 'include_confidence': False}).get_json()['predictions']
+    assert all('upper_bound' not in result for result in without)
+
+
+def test_validation_reports_every_row():
+    """Every bad row is reported with its index; nothing is scored"""
+    install_model()
+    rows = random_rows(5, 3)
+    rows[1]['temperature'] = 'warm'
+    rows[3] = 'not an object'
+    rows[4]['humidity'] = None
+    response = post({'features': rows})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert sorted({error['index'] for error in body['validation_errors']}) == [1, 3, 4]
+    assert body['index'] == 1
+
+    assert post({'features': {'temperature': 20}}).status_code == 400
+    assert post({'rows': []}).status_code == 400
+
+
+def test_empty_batch():
+    """An empty list is a valid request with no predictions"""
+    install_model()
+    response = post({'features': []})
+    assert response.status_code == 200 and response.get_json()['predictions'] == []
+
+
+if __name__ == '__main__':
+    test_batch_matches_single_rows()
+    print("✓ Batch check passed: every row matches its single-row prediction")
+    test_bounds_follow_tree_spread()
+    print("✓ Bounds check passed: intervals follow the spread across trees")
+    test_validation_reports_every_row()
+    test_empty_batch()
+    print("✓ Validation check passed: every bad row is reported, empty batches work")
@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+"""
+ASGI entry point for Fake Instagram Account Detector
+
+Serves the unchanged Flask app behind an asyncio front end that sheds load
+instead of queueing without limit:
+  - scoring requests run on a fixed pool of ASGI_WORKERS threads
+  - at most ASGI_QUEUE_DEPTH more may wait; beyond that the request is
+    rejected immediately with 429 and a Retry-After estimate
+  - every request has a deadline (ASGI_DEADLINE_MS, or a shorter
+    X-Deadline-Ms header); a request still queued or still scoring when it
+    expires gets 503 with Retry-After, and one that expired in the queue
+    is never run
+Health, metrics and other cheap routes bypass the queue so probes keep
+answering under overload.
+
+Request bodies are not buffered. wsgi.input pulls each body chunk from the
+ASGI server only when the app reads it, so /api/batch-analyze/stream
+scores a multi-GB upload with bounded memory here too. A queued request
+holds no body in memory. The deadline bounds the time to the first
+response byte, which for the streaming route comes after its first chunk.
+
+Run with:
+    python asgi.py
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import io
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend_api import app as flask_app
+from metrics import metrics
+
+ASGI_WORKERS = int(os.environ.get('ASGI_WORKERS', 4))
+ASGI_QUEUE_DEPTH = int(os.environ.get('ASGI_QUEUE_DEPTH', 32))
+ASGI_DEADLINE_MS = float(os.environ.get('ASGI_DEADLINE_MS', 2000))
+UNQUEUED_PATHS = frozenset(('/', '/api/health', '/api/features', '/metrics'))
+
+metrics.describe('shed_total', 'Requests rejected by the ASGI front end, by reason')
+metrics.describe('queue_wait_seconds', 'Time scoring requests waited for an ASGI worker')
+
+
+class _Exchange:
+    """Hand-off between a worker thread and the event loop for one request"""
+
+    def __init__(self, deadline, enqueued=None):
+        self.deadline = deadline
+        self.enqueued = enqueued
+        self.lock = threading.Lock()
+        self.started = False
+        self.abandoned = False
+
+    def claim(self):
+        """Worker side: True if the response is still ours to send"""
+        with self.lock:
+            if self.abandoned:
+                return False
+            self.started = True
+            return True
+
+    def abandon(self):
+        """Loop side: True if the worker hasn't started responding yet"""
+        with self.lock:
+            if self.started:
+                return False
+            self.abandoned = True
+            return True
+
+
+class _BodyStream(io.RawIOBase):
+    """wsgi.input for a worker thread, receiving the ASGI body from the loop as it is read"""
+
+    def __init__(self, receive, loop, exchange):
+        self._receive = receive
+        self._loop = loop
+        self._exchange = exchange
+        self._chunk = memoryview(b'')
+        self._more = True
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._chunk and self._more:
+            if self._exchange.abandoned:
+                # The client already has its 503; stop reading a body nobody will answer
+                raise OSError('Request deadline exceeded')
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                self._more = False
+                break
+            self._chunk = memoryview(message.get('body', b''))
+            self._more = message.get('more_body', False)
+        n = min(len(buffer), len(self._chunk))
+        buffer[:n] = self._chunk[:n]
+        self._chunk = self._chunk[n:]
+        return n
+
+
+class BackpressureApp:
+    """ASGI wrapper running a WSGI app on a bounded pool with deadlines"""
+
+    def __init__(self, wsgi_app, workers=4, queue_depth=32, deadline_ms=2000.0,
+                 unqueued_paths=UNQUEUED_PATHS):
+        self.wsgi_app = wsgi_app
+        self.workers = workers
+        self.capacity = workers + queue_depth
+        self.deadline = deadline_ms / 1000
+        self.unqueued_paths = unqueued_paths
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='scoring')
+        self.pending = 0  # only touched on the event loop thread
+        self.service_seconds = 0.01  # moving average, feeds Retry-After
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        loop = asyncio.get_running_loop()
+        if scope['path'] in self.unqueued_paths:
+            exchange = _Exchange(deadline=math.inf)
+            await loop.run_in_executor(
+                None, self._run, self._environ(scope, receive, loop, exchange), exchange, loop, send
+            )
+            return
+
+        if self.pending >= self.capacity:
+            metrics.inc('shed_total', {'reason': 'queue_full'})
+            await self._reject(send, 429, 'Server is at capacity, retry later')
+            return
+
+        self.pending += 1
+        enqueued = time.monotonic()
+        deadline = enqueued + self._deadline_for(scope)
+        exchange = _Exchange(deadline, enqueued)
+        future = loop.run_in_executor(
+            self.executor, self._run, self._environ(scope, receive, loop, exchange), exchange, loop, send
+        )
+        # The slot is held until the worker is really done, even if the client
+        # was already answered, so capacity reflects busy threads
+        future.add_done_callback(self._release)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            if not exchange.abandon():
+                # Already streaming; the deadline only bounds time to first byte
+                await future
+                return
+        else:
+            # The worker may have seen the deadline pass before our timer fired
+            if not exchange.abandon():
+                return
+        metrics.inc('shed_total', {'reason': 'deadline'})
+        await self._reject(send, 503, 'Request deadline exceeded')
+
+    def _release(self, future):
+        self.pending -= 1
+
+    def _deadline_for(self, scope):
+        for name, value in scope.get('headers', []):
+            if name == b'x-deadline-ms':
+                try:
+                    return min(float(value) / 1000, self.deadline)
+                except ValueError:
+                    break
+        return self.deadline
+
+    def retry_after(self):
+        """Seconds until the current backlog should have drained"""
+        return max(1, math.ceil(self.pending * self.service_seconds / self.workers))
+
+    async def _reject(self, send, status, message):
+        body = ('{"error": "%s", "success": false}' % message).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(self.retry_after()).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    @staticmethod
+    def _environ(scope, receive, loop, exchange):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BufferedReader(_BodyStream(receive, loop, exchange), 1 << 16),
+            # Read to the end of the body even without a Content-Length (chunked uploads)
+            'wsgi.input_terminated': True,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                environ[name] = value
+            else:
+                key = f'HTTP_{name}'
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def _run(self, environ, exchange, loop, send):
+        """Worker thread: run the WSGI app and forward its response to the loop"""
+        dequeued = time.monotonic()
+        if dequeued >= exchange.deadline:
+            # Expired while queued; the loop has answered (or will) with 503
+            return
+        if exchange.enqueued is not None:
+            metrics.observe('queue_wait_seconds', {}, dequeued - exchange.enqueued)
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+
+        def forward(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            started = False
+            for chunk in result:
+                if not chunk:
+                    continue
+                if not started:
+                    if not exchange.claim():
+                        return
+                    forward({'type': 'http.response.start', 'status': response['status'],
+                             'headers': response['headers']})
+                    started = True
+                forward({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                if not exchange.claim():
+                    return
+                forward({'type': 'http.response.start', 'status': response['status'],
+                         'headers': response['headers']})
+            forward({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+            elapsed = time.monotonic() - dequeued
+            self.service_seconds = 0.9 * self.service_seconds + 0.1 * elapsed
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = BackpressureApp(
+    flask_app,
+    workers=ASGI_WORKERS,
+    queue_depth=ASGI_QUEUE_DEPTH,
+    deadline_ms=ASGI_DEADLINE_MS,
+)
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 5000))
+    import uvicorn
+
+    print(f"Starting ASGI server on port {port} "
+          f"({ASGI_WORKERS} scoring workers, queue depth {ASGI_QUEUE_DEPTH}, deadline {ASGI_DEADLINE_MS:.0f}ms)...")
+    print("=" * 60)
+
+    uvicorn.run(app, host='0.0.0.0', port=port, log_level='warning')
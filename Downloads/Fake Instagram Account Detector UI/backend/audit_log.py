@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+"""
+Audit log of scoring decisions
+
+Request threads hand each scored batch to AuditLog.record(): one append of
+(feature matrix, verdicts, model version, latency) to a bounded
+in-memory buffer, with no disk I/O and no per-row work. A background writer
+wakes every flush interval (or sooner once enough rows are waiting),
+expands the buffered batches into one row per verdict and inserts them in
+a single transaction into SQLite in WAL mode. Several prefork workers can
+share the database. If the writer falls behind and the buffer fills up,
+the oldest batches are dropped and counted. Scoring is never made to wait.
+
+Query it from the command line:
+    python audit_log.py query --since 2026-10-01 --fake --limit 20
+    python audit_log.py query --request-id 3f2a... --format json
+    python audit_log.py stats --since 2026-10-01
+"""
+
+import argparse
+import atexit
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    request_id TEXT,
+    endpoint TEXT,
+    row_index INTEGER,
+    model_version TEXT,
+    features TEXT,
+    fake_probability REAL,
+    is_fake INTEGER,
+    latency_ms REAL
+);
+CREATE INDEX IF NOT EXISTS verdicts_ts ON verdicts (ts);
+CREATE INDEX IF NOT EXISTS verdicts_request ON verdicts (request_id);
+"""
+COLUMNS = ('ts', 'request_id', 'endpoint', 'row_index', 'model_version', 'features',
+           'fake_probability', 'is_fake', 'latency_ms')
+
+metrics.describe('audit_rows_total', 'Verdict rows written to the audit log, or dropped on overflow')
+metrics.describe('audit_flush_seconds', 'Time the audit writer spent per flush')
+
+
+def connect(path):
+    db = sqlite3.connect(path, timeout=30)
+    db.execute('PRAGMA journal_mode=WAL')
+    # WAL keeps the database consistent at NORMAL; a crash can only lose
+    # the last few commits, which the in-memory buffer risks anyway
+    db.execute('PRAGMA synchronous=NORMAL')
+    db.executescript(SCHEMA)
+    return db
+
+
+class AuditLog:
+    """Bounded buffer of scored batches drained to SQLite by one thread"""
+
+    def __init__(self, path, max_rows=100000, flush_interval=1.0, flush_rows=5000):
+        self.path = path
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.last_error = None
+        connect(path).close()
+        self._start()
+        # A forked worker (prefork.py) inherits this object but not its thread.
+        # Windows has no fork (nor os.register_at_fork)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._start)
+        atexit.register(self.flush)
+
+    def _start(self):
+        self._buffer = deque()
+        self._buffered_rows = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, endpoint, model_version, X, fake_probability, is_fake, latency_s, request_id=None):
+        """Queue one scored batch: rows of X with the fake_probability (%) and is_fake returned for them"""
+        entry = (time.time(), request_id, endpoint, model_version, X, fake_probability, is_fake, latency_s * 1000)
+        rows = len(X)
+        with self._lock:
+            self._buffer.append(entry)
+            self._buffered_rows += rows
+            while self._buffered_rows > self.max_rows and len(self._buffer) > 1:
+                dropped = self._buffer.popleft()
+                self._buffered_rows -= len(dropped[4])
+                self.dropped += len(dropped[4])
+                metrics.inc('audit_rows_total', {'outcome': 'dropped'}, len(dropped[4]))
+            full = self._buffered_rows >= self.flush_rows
+        if full:
+            self._wake.set()
+
+    def _take(self):
+        with self._lock:
+            entries = list(self._buffer)
+            self._buffer.clear()
+            self._buffered_rows = 0
+        return entries
+
+    @staticmethod
+    def _rows(entries):
+        for ts, request_id, endpoint, version, X, fake_probability, is_fake, latency_ms in entries:
+            rows = zip(
+                np.asarray(X, dtype=np.float64).tolist(),
+                np.asarray(fake_probability, dtype=np.float64).tolist(),
+                np.asarray(is_fake, dtype=np.int64).tolist()
+            )
+            for i, (features, p, fake) in enumerate(rows):
+                yield (ts, request_id, endpoint, i, version, json.dumps(features), p, fake, latency_ms)
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of rows written"""
+        with self._flush_lock:
+            entries = self._take()
+            if not entries:
+                return 0
+            started = time.perf_counter()
+            try:
+                db = connect(self.path)
+                try:
+                    with db:
+                        cursor = db.executemany(
+                            f"INSERT INTO verdicts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                            self._rows(entries)
+                        )
+                finally:
+                    db.close()
+            except Exception as e:
+                rows = sum(len(entry[4]) for entry in entries)
+                self.dropped += rows
+                self.last_error = str(e)
+                metrics.inc('audit_rows_total', {'outcome': 'failed'}, rows)
+                print(f"✗ Audit flush failed, {rows} rows lost: {e}")
+                return 0
+            self.written += cursor.rowcount
+            self.flushes += 1
+            metrics.inc('audit_rows_total', {'outcome': 'written'}, cursor.rowcount)
+            metrics.observe('audit_flush_seconds', {}, time.perf_counter() - started)
+            return cursor.rowcount
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'buffered_rows': self._buffered_rows,
+            'written': self.written,
+            'dropped': self.dropped,
+            'flushes': self.flushes,
+            'last_error': self.last_error,
+        }
+
+
+# -- query CLI ----------------------------------------------------------------
+
+def parse_time(value):
+    """Epoch seconds from an ISO date/time or a number"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def build_filters(args):
+    clauses, params = [], []
+    if args.since:
+        clauses.append('ts >= ?')
+        params.append(parse_time(args.since))
+    if args.until:
+        clauses.append('ts < ?')
+        params.append(parse_time(args.until))
+    if args.model_version:
+        clauses.append('model_version = ?')
+        params.append(args.model_version)
+    if args.endpoint:
+        clauses.append('endpoint = ?')
+        params.append(args.endpoint)
+    if getattr(args, 'request_id', None):
+        clauses.append('request_id = ?')
+        params.append(args.request_id)
+    if getattr(args, 'fake', False):
+        clauses.append('is_fake = 1')
+    if getattr(args, 'min_probability', None) is not None:
+        clauses.append('fake_probability >= ?')
+        params.append(args.min_probability)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def query(db, args):
+    where, params = build_filters(args)
+    cursor = db.execute(
+        f"SELECT {', '.join(COLUMNS)} FROM verdicts{where} ORDER BY ts DESC, id DESC LIMIT ?",
+        params + [args.limit]
+    )
+    rows = [dict(zip(COLUMNS, row)) for row in cursor]
+    for row in rows:
+        row['time'] = datetime.fromtimestamp(row.pop('ts')).isoformat(timespec='milliseconds')
+        row['features'] = json.loads(row['features'])
+        row['latency_ms'] = round(row['latency_ms'], 3)
+
+    if args.format == 'json':
+        for row in rows:
+            print(json.dumps(row))
+    elif args.format == 'csv':
+        writer = csv.writer(sys.stdout)
+        header = ['time'] + [name for name in COLUMNS if name != 'ts']
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow([json.dumps(row[name]) if name == 'features' else row[name] for name in header])
+    else:
+        print(f"{'time':23s} {'request':12s} {'endpoint':20s} {'row':>5s} {'fake %':>7s} "
+              f"{'verdict':8s} {'latency':>9s}  model")
+        for row in rows:
+            print(f"{row['time']:23s} {(row['request_id'] or '')[:12]:12s} {row['endpoint'] or '':20s} "
+                  f"{row['row_index']:5d} {row['fake_probability']:7.2f} "
+                  f"{'fake' if row['is_fake'] else 'real':8s} {row['latency_ms']:7.2f}ms  {row['model_version']}")
+    return rows
+
+
+def summarize(db, args):
+    where, params = build_filters(args)
+    cursor = db.execute(
+        f"SELECT model_version, endpoint, COUNT(*), SUM(is_fake), AVG(fake_probability), "
+        f"MIN(ts), MAX(ts) FROM verdicts{where} GROUP BY model_version, endpoint ORDER BY MIN(ts)",
+        params
+    )
+    print(f"{'model':24s} {'endpoint':20s} {'verdicts':>9s} {'fake %':>7s} {'avg p':>7s}  first / last")
+    for version, endpoint, count, fakes, mean_p, first, last in cursor:
+        print(f"{version or '':24s} {endpoint or '':20s} {count:9d} {fakes / count * 100:7.2f} "
+              f"{mean_p:7.2f}  {datetime.fromtimestamp(first):%Y-%m-%d %H:%M} / "
+              f"{datetime.fromtimestamp(last):%Y-%m-%d %H:%M}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Query the scoring audit log')
+    parser.add_argument('--db', default=os.environ.get('AUDIT_LOG_PATH', 'audit.db'))
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_filters(sub):
+        sub.add_argument('--since', help='ISO time or epoch seconds')
+        sub.add_argument('--until', help='ISO time or epoch seconds')
+        sub.add_argument('--model-version')
+        sub.add_argument('--endpoint', help="e.g. 'analyze', 'batch_analyze'")
+
+    sub = commands.add_parser('query', help='List verdicts, newest first')
+    add_filters(sub)
+    sub.add_argument('--request-id')
+    sub.add_argument('--fake', action='store_true', help='Only verdicts classed as fake')
+    sub.add_argument('--min-probability', type=float, help='Minimum fake probability (%%)')
+    sub.add_argument('--limit', type=int, default=50)
+    sub.add_argument('--format', choices=('table', 'json', 'csv'), default='table')
+
+    sub = commands.add_parser('stats', help='Verdict counts and fake rate per model version and endpoint')
+    add_filters(sub)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"✗ No audit log at {args.db}")
+        return 1
+    db = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        if args.command == 'query':
+            query(db, args)
+        else:
+            summarize(db, args)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
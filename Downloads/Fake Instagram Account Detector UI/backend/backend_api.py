@@ -1,81 +1,367 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
-import pickle
+import csv
+import threading
 import numpy as np
+import pandas as pd
 from datetime import datetime
 import json
+import os
+import sys
+import time
+import uuid
+from serving_model import load_serving_model
+from feature_extraction import extract_features
+from coalescer import RequestCoalescer
+from result_cache import ResultCache
+from duplicate_clusters import find_clusters
+from feedback_store import FeedbackStore, parse_label, LABEL_COLUMN
+from audit_log import AuditLog
+from batch_formats import (
+    PayloadError, input_format, output_format, read_npy, read_arrow, read_columns,
+    columns_to_accounts, result_columns, write_columns, write_npy, write_arrow
+)
+from metrics import metrics
+from prefork import request_rolling_reload
 
 app = Flask(__name__)
 CORS(app)
 
+# A versioned, memory-mapped bundle (see model_bundle.py) is preferred when
+# present; otherwise fall back to the three pickles
+MODEL_BUNDLE_PATH = os.environ.get('MODEL_BUNDLE_PATH', 'model_bundle.bin')
+# Large batches are scored in chunks of this many rows to bound peak memory
+BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', 4096))
+# Chunks up to this size use the compiled forest, larger ones sklearn
+COMPILED_MAX_ROWS = int(os.environ.get('COMPILED_MAX_ROWS', 256))
+# Candidate models must reach this accuracy on OldDataSet.csv before being swapped in
+MODEL_MIN_ACCURACY = float(os.environ.get('MODEL_MIN_ACCURACY', 0.8))
+# Poll the model files every N seconds and hot-reload on change (0 disables)
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+
+def load_model(min_accuracy=0.0):
+    """Load, validate and warm up the current model artifacts"""
+    candidate = load_serving_model(
+        MODEL_BUNDLE_PATH, chunk_size=BATCH_CHUNK_SIZE, compiled_max_rows=COMPILED_MAX_ROWS
+    )
+    X_check, y_check = validation_sample(candidate.feature_names)
+    candidate.validate(X_check, y_check, min_accuracy=min_accuracy)
+    candidate.warm_up(X_check)
+    return candidate
+
+def validation_sample(names, n_rows=200):
+    """Evenly spaced labelled rows from the training CSV, if it is available"""
+    try:
+        df = pd.read_csv('OldDataSet.csv')
+        df = df.iloc[::max(1, len(df) // n_rows)]
+        return df[names].fillna(0).to_numpy(dtype=np.float64), df['Fake'].to_numpy()
+    except Exception:
+        return None, None
+
 # Load models
 print("Loading models...")
 try:
-    with open('classifier_model.pkl', 'rb') as f:
-        clf = pickle.load(f)
-    print("✓ Classifier model loaded")
+    model = load_model()
 except Exception as e:
-    print(f"✗ Error loading classifier: {e}")
-    clf = None
+    print(f"✗ Error loading models: {e}")
+    model = None
 
-try:
-    with open('scaler_model.pkl', 'rb') as f:
-        scaler = pickle.load(f)
-    print("✓ Scaler model loaded")
-except Exception as e:
-    print(f"✗ Error loading scaler: {e}")
-    scaler = None
+def process_rss_mb():
+    """Resident set size of this process in MB, or None where it can't be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource  # POSIX only; Windows gets None
+    except ImportError:
+        return None
+    # Peak rather than current RSS; ru_maxrss is in bytes on macOS, KB elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
 
-try:
-    with open('feature_names.pkl', 'rb') as f:
-        feature_names = pickle.load(f)
-    print(f"✓ Feature names loaded: {len(feature_names)} features")
-except Exception as e:
-    print(f"✗ Error loading feature names: {e}")
-    feature_names = None
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+reload_lock = threading.Lock()
+reload_status = {
+    'state': 'idle',
+    'reloads': 0,
+    'failures': 0,
+    'last_error': None,
+    'last_reload': None
+}
+
+def reload_model():
+    """Load and validate new artifacts off to the side, then swap atomically"""
+    global model
+    if not reload_lock.acquire(blocking=False):
+        return False
+    try:
+        reload_status['state'] = 'loading'
+        candidate = load_model(min_accuracy=MODEL_MIN_ACCURACY)
+        previous = model
+        # A single reference assignment: requests already holding `previous` finish on it
+        model = candidate
+        reload_status['reloads'] += 1
+        reload_status['last_error'] = None
+        reload_status['last_reload'] = datetime.now().isoformat()
+        print(f"✓ Model swapped: {previous.version if previous else None} -> {candidate.version}")
+        return True
+    except Exception as e:
+        reload_status['failures'] += 1
+        reload_status['last_error'] = str(e)
+        print(f"✗ Model reload failed, keeping current version: {e}")
+        return False
+    finally:
+        reload_status['state'] = 'idle'
+        reload_lock.release()
+
+def model_files_signature():
+    """mtimes of every artifact that can change the served model"""
+    paths = [MODEL_BUNDLE_PATH, 'classifier_model.pkl', 'scaler_model.pkl', 'feature_names.pkl']
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+def watch_model_files(interval):
+    """Reload once the model files have changed and then stayed unchanged for one interval"""
+    seen = model_files_signature()
+    while True:
+        time.sleep(interval)
+        current = model_files_signature()
+        if current == seen:
+            continue
+        # Wait for the writer (e.g. train_model.py) to finish
+        time.sleep(interval)
+        if model_files_signature() == current:
+            reload_model()
+            seen = current
+
+def start_model_watcher():
+    threading.Thread(
+        target=watch_model_files, args=(MODEL_WATCH_INTERVAL,), name='model-watcher', daemon=True
+    ).start()
+
+if MODEL_WATCH_INTERVAL > 0:
+    start_model_watcher()
+    # Threads don't survive fork; prefork.py workers each need their own watcher
+    if hasattr(os, 'register_at_fork'):  # not on Windows
+        os.register_at_fork(after_in_child=start_model_watcher)
+    print(f"✓ Watching model files every {MODEL_WATCH_INTERVAL}s")
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+# Opt-in micro-batching of concurrent /api/analyze calls (0 disables it)
+COALESCE_WINDOW_MS = float(os.environ.get('COALESCE_WINDOW_MS', 0))
+COALESCE_MAX_BATCH = int(os.environ.get('COALESCE_MAX_BATCH', 64))
+def score_coalesced(X, m):
+    """Runs on the coalescer thread, so its stages are labelled 'coalescer'"""
+    metrics.endpoint = 'coalescer'
+    metrics.observe_batch_size(len(X))
+    return m.predict_proba(X)
+
+coalescer = None
+if COALESCE_WINDOW_MS > 0:
+    coalescer = RequestCoalescer(
+        score_coalesced, window_ms=COALESCE_WINDOW_MS, max_batch=COALESCE_MAX_BATCH
+    )
+    print(f"✓ Request coalescing enabled: {COALESCE_WINDOW_MS}ms window, max batch {COALESCE_MAX_BATCH}")
+
+# Cache of scored feature vectors (RESULT_CACHE_SIZE=0 disables it)
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 10000))
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 3600))
+result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL) if RESULT_CACHE_SIZE > 0 else None
+
+def score_matrix(X, m):
+    """m.predict_proba with the result cache in front; only misses are scored"""
+    if result_cache is None:
+        return m.predict_proba(X)
+    with metrics.stage('cache'):
+        probabilities, misses = result_cache.lookup(X, m.version)
+    if probabilities is None:
+        probabilities = m.predict_proba(X)
+        result_cache.store(X, probabilities, m.version)
+    elif misses.any():
+        fresh = m.predict_proba(X[misses])
+        probabilities[misses] = fresh
+        result_cache.store(X[misses], fresh, m.version)
+    return probabilities
+
+def score_row(x, m):
+    """Score one feature vector via the cache, then the coalescer if enabled"""
+    if coalescer is None:
+        return score_matrix(x.reshape(1, -1), m)[0]
+    if result_cache is None:
+        return coalescer.score(x, m)
+    with metrics.stage('cache'):
+        probabilities, _ = result_cache.lookup(x, m.version)
+    if probabilities is not None:
+        return probabilities[0]
+    probs = coalescer.score(x, m)
+    result_cache.store(x, probs, m.version)
+    return probs
+
+def records_from_columns(columns, m):
+    """One result dict per row of score_columns() output"""
+    names = list(columns)
+    is_fake = names.index('is_fake')
+    records = [
+        {'status': "Likely Fake" if values[is_fake] else "Likely Real", **dict(zip(names, values))}
+        for values in zip(*(columns[name].tolist() for name in names))
+    ]
+    if 'contributions' in columns:
+        for record in records:
+            record['contributions'] = dict(zip(m.feature_names, record['contributions']))
+    return records
+
+# Relative tolerance for grouping near-duplicate rows in batch requests.
+# The default 0 groups exact duplicates only; a positive value (e.g. 0.01)
+# opts in to approximate grouping, see duplicate_clusters.py
+DUPLICATE_TOLERANCE = float(os.environ.get('DUPLICATE_TOLERANCE', 0))
+metrics.describe('duplicate_rows_total', 'Batch rows answered from their cluster representative')
+
+def cluster_batch(X):
+    with metrics.stage('cluster'):
+        clusters = find_clusters(X, DUPLICATE_TOLERANCE)
+    if clusters.duplicates:
+        metrics.inc('duplicate_rows_total', {}, clusters.duplicates)
+    return clusters
+
+def score_columns(X, m, clusters=None, explain=False):
+    """
+    Result columns for X. Given clusters, only one representative row per
+    cluster is scored; its result is copied to the other rows and each row
+    gets cluster_id and cluster_size. With explain, an (N, F) contributions
+    column holds each feature's share of fake_probability
+    """
+    rows = X if clusters is None else X[clusters.representatives]
+    if explain:
+        # Explanations come with their own probabilities; the cache is skipped
+        probabilities, contributions = m.explain(rows)
+    else:
+        probabilities = score_matrix(rows, m)
+    scored = result_columns(probabilities, m.classes_)
+    if explain:
+        scored['contributions'] = np.round(contributions * 100, 2)
+    if clusters is None:
+        return scored
+    columns = {name: values[clusters.labels] for name, values in scored.items()}
+    columns['cluster_id'] = clusters.labels
+    columns['cluster_size'] = clusters.row_sizes()
+    return columns
+
+# Every verdict is buffered in memory and written to SQLite off the request
+# path (see audit_log.py); an empty AUDIT_LOG_PATH disables it
+AUDIT_LOG_PATH = os.environ.get('AUDIT_LOG_PATH', 'audit.db')
+AUDIT_BUFFER_ROWS = int(os.environ.get('AUDIT_BUFFER_ROWS', 100000))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0))
+
+_audit_log = None
+_audit_lock = threading.Lock()
+_audit_failed = False
+
+def audit_log():
+    """
+    The process's audit log, opened by the first scored request so that
+    importing the app (tests, tools, the prefork master) creates no files
+    """
+    global _audit_log, _audit_failed
+    if _audit_log is None and AUDIT_LOG_PATH and not _audit_failed:
+        with _audit_lock:
+            if _audit_log is None and not _audit_failed:
+                try:
+                    _audit_log = AuditLog(AUDIT_LOG_PATH, max_rows=AUDIT_BUFFER_ROWS,
+                                          flush_interval=AUDIT_FLUSH_INTERVAL)
+                    print(f"✓ Audit log: {AUDIT_LOG_PATH}")
+                except Exception as e:
+                    _audit_failed = True
+                    print(f"✗ Error opening audit log, verdicts won't be recorded: {e}")
+    return _audit_log
+
+def audit(m, X, fake_probability, is_fake, started):
+    """Buffer one scored batch for the audit log; never touches disk after the first"""
+    log = audit_log()
+    if log is not None:
+        log.record(metrics.endpoint, m.version, X, fake_probability, is_fake,
+                   time.perf_counter() - started, g.get('request_id'))
+
+@app.before_request
+def start_request_timer():
+    metrics.endpoint = request.endpoint or 'unknown'
+    g.request_started = time.perf_counter()
+    g.request_id = request.headers.get('X-Request-Id') or uuid.uuid4().hex
+
+@app.after_request
+def add_model_version_header(response):
+    """Report which model version served the request (the one it started with)"""
+    version = g.get('model_version') or (model.version if model is not None else None)
+    if version:
+        response.headers['X-Model-Version'] = version
+    if 'request_id' in g:
+        response.headers['X-Request-Id'] = g.request_id
+    return response
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or 'unknown'
+    if 'request_started' in g:
+        metrics.observe('request_latency_seconds', {'endpoint': endpoint},
+                        time.perf_counter() - g.request_started)
+    metrics.inc('requests_total', {'endpoint': endpoint, 'status': str(response.status_code)})
+    return response
+
+def record_error(endpoint, e):
+    print(f"Error in {endpoint}: {e}")
+    metrics.inc('errors_total', {'endpoint': request.endpoint or 'unknown'})
 
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
+    rss_mb = process_rss_mb()
     return jsonify({
         'status': 'ok',
         'message': 'Backend is running',
-        'models_loaded': clf is not None and scaler is not None
+        'models_loaded': model is not None,
+        'model': model.info() if model is not None else None,
+        'reload': reload_status,
+        'memory_rss_mb': rss_mb and round(rss_mb, 1),
+        'coalescing': coalescer.stats() if coalescer is not None else None,
+        'result_cache': result_cache.stats() if result_cache is not None else None,
+        'audit_log': _audit_log.stats() if _audit_log is not None else None
     })
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
     """Analyze Instagram account and predict if it's fake or real"""
     try:
-        data = request.get_json()
+        with metrics.stage('parse'):
+            data = request.get_json()
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
+        explain = request.args.get('explain', '').lower() == 'true'
         
-        if clf is None or scaler is None:
+        # Snapshot the active model; a concurrent reload won't affect this request
+        m = model
+        if m is None:
             return jsonify({'error': 'Models not loaded'}), 500
+        g.model_version = m.version
         
-        # Extract features in the correct order
-        features = []
-        for fname in feature_names:
-            # Try to get the value from request data
-            value = data.get(fname, 0)
-            # Convert to float, default to 0 if conversion fails
-            try:
-                value = float(value)
-            except:
-                value = 0.0
-            features.append(value)
-        
-        # Convert to numpy array
-        X = np.array([features])
+        # Extract features in the correct order, deriving them from raw
+        # profile fields (username, bio, followers, ...) when not sent directly
+        with metrics.stage('coerce'):
+            X, derived = extract_features([data], m.feature_names)
         
-        # Scale features
-        X_scaled = scaler.transform(X)
-        
-        # Make prediction
-        prediction = clf.predict(X_scaled)[0]
-        probabilities = clf.predict_proba(X_scaled)[0]
+        # Scale features and make prediction
+        if explain:
+            probabilities, contributions = m.explain(X)
+            probabilities = probabilities[0]
+        else:
+            probabilities = score_row(X[0], m)
+        prediction = m.classes_[np.argmax(probabilities)]
         
         # Determine status
         status = "Likely Fake" if prediction == 1 else "Likely Real"
@@ -83,6 +369,8 @@ def analyze():
         fake_probability = float(probabilities[1]) * 100
         real_probability = float(probabilities[0]) * 100
         
+        audit(m, X, [round(fake_probability, 2)], [bool(prediction)], g.request_started)
+        
         # Determine risk level
         if fake_probability > 70:
             risk_level = "High Risk"
@@ -99,82 +387,297 @@ def analyze():
             'real_probability': round(real_probability, 2),
             'risk_level': risk_level,
             'timestamp': datetime.now().isoformat(),
-            'features_received': len(features),
-            'features_expected': len(feature_names)
+            'features_received': sum(data.get(fname) is not None for fname in m.feature_names),
+            'features_derived': int(derived.sum()),
+            'features_expected': len(m.feature_names),
+            'model_version': m.version
         }
+        if explain:
+            # base_value + sum(contributions) = fake_probability (before rounding)
+            response['base_value'] = round(m.base_value() * 100, 2)
+            response['contributions'] = dict(
+                zip(m.feature_names, np.round(contributions[0] * 100, 2).tolist())
+            )
         
-        return jsonify(response), 200
+        with metrics.stage('serialize'):
+            body = jsonify(response)
+        return body, 200
     
     except Exception as e:
-        print(f"Error in /api/analyze: {e}")
+        record_error('/api/analyze', e)
         return jsonify({'error': str(e), 'status': 'error'}), 500
 
 @app.route('/api/batch-analyze', methods=['POST'])
 def batch_analyze():
-    """Analyze multiple accounts at once"""
+    """
+    Analyze multiple accounts at once. Accepts a JSON list of accounts,
+    column-oriented JSON, .npy or Arrow IPC; ?format= (records, columns,
+    npy, arrow) or the Accept header picks the response format.
+    """
     try:
-        data = request.get_json()
-        
-        if not isinstance(data, list):
-            return jsonify({'error': 'Expected list of accounts'}), 400
-        
-        if clf is None or scaler is None:
+        m = model
+        if m is None:
             return jsonify({'error': 'Models not loaded'}), 500
+        g.model_version = m.version
         
-        results = []
-        for account in data:
-            features = []
-            for fname in feature_names:
-                value = account.get(fname, 0)
-                try:
-                    value = float(value)
-                except:
-                    value = 0.0
-                features.append(value)
-            
-            X = np.array([features])
-            X_scaled = scaler.transform(X)
-            prediction = clf.predict(X_scaled)[0]
-            probabilities = clf.predict_proba(X_scaled)[0]
-            
-            status = "Likely Fake" if prediction == 1 else "Likely Real"
-            confidence = float(max(probabilities)) * 100
-            fake_probability = float(probabilities[1]) * 100
-            
-            if fake_probability > 70:
-                risk_level = "High Risk"
-            elif fake_probability > 40:
-                risk_level = "Medium Risk"
+        X = None
+        with metrics.stage('parse'):
+            fmt = output_format(request.args.get('format'), request.headers.get('Accept'))
+            explain = request.args.get('explain', '').lower() == 'true'
+            if explain and fmt not in ('records', 'columns'):
+                raise PayloadError('explain=true needs records or columns output')
+            body = request.get_data()
+            fmt_in = input_format(request.mimetype, body)
+            if fmt_in == 'npy':
+                X = read_npy(body, m.feature_names)
+            elif fmt_in == 'arrow':
+                X = read_arrow(body, m.feature_names)
             else:
-                risk_level = "Low Risk"
-            
-            results.append({
-                'status': status,
-                'is_fake': bool(prediction),
-                'confidence': round(confidence, 2),
-                'fake_probability': round(fake_probability, 2),
-                'risk_level': risk_level
-            })
+                data = request.get_json()
+                if isinstance(data, dict):
+                    # Column-oriented: model features go straight into the matrix
+                    X = read_columns(data, m.feature_names)
+                    if X is None:
+                        data = columns_to_accounts(data)
+                elif not isinstance(data, list):
+                    return jsonify({'error': 'Expected list of accounts'}), 400
         
-        return jsonify({
-            'count': len(results),
-            'results': results,
+        if X is None:
+            with metrics.stage('coerce'):
+                X, _ = extract_features(data, m.feature_names)
+        
+        clusters = cluster_batch(X)
+        meta = {
+            'count': len(X),
+            'clusters': clusters.count,
+            'duplicates': clusters.duplicates,
+            'model_version': m.version,
             'timestamp': datetime.now().isoformat()
-        }), 200
+        }
+        if explain:
+            meta['base_value'] = round(m.base_value() * 100, 2)
+            meta['features'] = m.feature_names
+        metrics.observe_batch_size(len(X))
+        columns = score_columns(X, m, clusters, explain)
+        audit(m, X, columns['fake_probability'], columns['is_fake'], g.request_started)
+        with metrics.stage('serialize'):
+            if fmt == 'records':
+                return jsonify(dict(meta, results=records_from_columns(columns, m))), 200
+            if fmt == 'columns':
+                payload, mimetype = write_columns(columns, meta)
+            elif fmt == 'npy':
+                payload, mimetype = write_npy(columns)
+            else:
+                payload, mimetype = write_arrow(columns, meta)
+        return Response(payload, mimetype=mimetype), 200
     
+    except PayloadError as e:
+        return jsonify({'error': str(e)}), e.status_code
     except Exception as e:
-        print(f"Error in /api/batch-analyze: {e}")
+        record_error('/api/batch-analyze', e)
         return jsonify({'error': str(e)}), 500
 
+# Rows scored per chunk by the streaming endpoint; bounds its memory use
+STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', 1024))
+
+def iter_stream_lines(stream):
+    """Yield decoded, non-empty lines from a (possibly chunked) request body"""
+    for raw in stream:
+        line = raw.decode('utf-8-sig').strip()
+        if line:
+            yield line
+
+def iter_ndjson_accounts(lines):
+    """Yield (account, error) pairs, one per NDJSON line"""
+    for line in lines:
+        try:
+            account = json.loads(line)
+        except ValueError as e:
+            yield None, f"Invalid JSON: {e}"
+            continue
+        if isinstance(account, dict):
+            yield account, None
+        else:
+            yield None, 'Expected a JSON object per line'
+
+def iter_csv_accounts(lines):
+    """Yield (account, error) pairs for CSV rows with an OldDataSet.csv style header"""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    for row in reader:
+        if len(row) != len(header):
+            yield None, f"Expected {len(header)} columns, got {len(row)}"
+        else:
+            yield dict(zip(header, row)), None
+
+def score_stream_chunk(accounts, m):
+    """Score one chunk of account dicts and return one result dict per account"""
+    started = time.perf_counter()
+    with metrics.stage('coerce'):
+        X, _ = extract_features(accounts, m.feature_names)
+    metrics.observe_batch_size(len(X))
+    columns = score_columns(X, m)
+    audit(m, X, columns['fake_probability'], columns['is_fake'], started)
+    return records_from_columns(columns, m)
+
+def stream_scores(entries, m):
+    """Score (account, error) pairs in fixed-size chunks and yield NDJSON lines"""
+    # The body is generated after the view returns, possibly on another thread
+    metrics.endpoint = 'batch_analyze_stream'
+    chunk = []
+
+    def flush():
+        accounts = [account for _, account, error in chunk if error is None]
+        results = iter(score_stream_chunk(accounts, m) if accounts else [])
+        with metrics.stage('serialize'):
+            lines = []
+            for index, _, error in chunk:
+                record = {'index': index, 'error': error} if error else dict(next(results), index=index)
+                lines.append(json.dumps(record) + '\n')
+        yield ''.join(lines)
+
+    for index, (account, error) in enumerate(entries):
+        chunk.append((index, account, error))
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield from flush()
+            chunk = []
+    if chunk:
+        yield from flush()
+
+@app.route('/api/batch-analyze/stream', methods=['POST'])
+def batch_analyze_stream():
+    """Score NDJSON or CSV rows in chunks and stream NDJSON results back"""
+    # The whole stream is scored by the model that was active when it started
+    m = model
+    if m is None:
+        return jsonify({'error': 'Models not loaded'}), 500
+    g.model_version = m.version
+
+    lines = iter_stream_lines(request.stream)
+    if request.mimetype == 'text/csv':
+        entries = iter_csv_accounts(lines)
+    else:
+        entries = iter_ndjson_accounts(lines)
+
+    return Response(stream_with_context(stream_scores(entries, m)), mimetype='application/x-ndjson')
+
+# Moderator-confirmed labels for incremental_trainer.py
+FEEDBACK_PATH = os.environ.get('FEEDBACK_PATH', 'feedback.csv')
+FEEDBACK_STATE_PATH = os.environ.get('FEEDBACK_STATE_PATH', 'feedback_state.json')
+metrics.describe('feedback_rows_total', 'Labelled rows stored for incremental retraining')
+
+_feedback_store = None
+
+def feedback_store(feature_names):
+    """One store per process, so stats() keeps its line counts between requests"""
+    global _feedback_store
+    if _feedback_store is None or _feedback_store.feature_names != list(feature_names):
+        _feedback_store = FeedbackStore(FEEDBACK_PATH, feature_names)
+    return _feedback_store
+
+def feedback_trainer_state():
+    try:
+        with open(FEEDBACK_STATE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+@app.route('/api/feedback', methods=['GET', 'POST'])
+def feedback():
+    """
+    POST: store confirmed labels. Accepts one account or a list, each with its
+    features (or raw profile fields) and a 'label' (or 'Fake') of 1/0,
+    'fake'/'real' or true/false.
+    GET: stored and pending row counts and the trainer's last round.
+    """
+    m = model
+    if m is None:
+        return jsonify({'error': 'Models not loaded'}), 500
+    store = feedback_store(m.feature_names)
+    state = feedback_trainer_state()
+
+    if request.method == 'GET':
+        return jsonify({
+            'store': store.stats(state.get('offset', 0)),
+            'generation': state.get('generation', 0),
+            'last_round': (state.get('history') or [None])[-1]
+        }), 200
+
+    data = request.get_json(silent=True)
+    accounts = [data] if isinstance(data, dict) else data
+    if not isinstance(accounts, list) or not accounts:
+        return jsonify({'error': 'Expected an account or a list of accounts'}), 400
+    labels = []
+    for index, account in enumerate(accounts):
+        label = parse_label(account.get('label', account.get(LABEL_COLUMN))) if isinstance(account, dict) else None
+        if label is None:
+            return jsonify({'error': f"Account {index} needs a label of 1/0, 'fake'/'real' or true/false"}), 400
+        labels.append(label)
+
+    with metrics.stage('coerce'):
+        X, _ = extract_features(accounts, m.feature_names)
+    store.append(X, labels)
+    metrics.inc('feedback_rows_total', {}, len(labels))
+    return jsonify({
+        'success': True,
+        'accepted': len(labels),
+        'store': store.stats(state.get('offset', 0))
+    }), 201
+
+@app.route('/api/reload-model', methods=['GET', 'POST'])
+def reload_model_endpoint():
+    """
+    POST: load, validate and warm up the artifacts on disk in the background,
+    then swap them in. Pass ?wait=true to block until the swap is done.
+    Under prefork.py with --on-reload, the master reloads and replaces every
+    worker instead, and the request returns 202 right away.
+    GET: reload status (of the worker that answers).
+    """
+    if request.method == 'POST':
+        if request_rolling_reload():
+            return jsonify({
+                'success': True,
+                'message': 'Rolling reload of all workers started',
+                'current_version': model.version if model is not None else None
+            }), 202
+        if request.args.get('wait', '').lower() == 'true':
+            swapped = reload_model()
+            status_code = 200 if swapped else 409 if reload_status['state'] != 'idle' else 500
+            return jsonify({
+                'success': swapped,
+                'model': model.info() if model is not None else None,
+                'reload': reload_status
+            }), status_code
+        if reload_status['state'] == 'idle':
+            threading.Thread(target=reload_model, name='model-reload', daemon=True).start()
+        return jsonify({
+            'success': True,
+            'message': 'Reload started',
+            'current_version': model.version if model is not None else None
+        }), 202
+
+    return jsonify({
+        'model': model.info() if model is not None else None,
+        'reload': reload_status
+    }), 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Per-stage latency histograms and counters in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/features', methods=['GET'])
 def get_features():
     """Get list of required features"""
-    if feature_names is None:
+    m = model
+    if m is None:
         return jsonify({'error': 'Feature names not loaded'}), 500
     
     return jsonify({
-        'features': feature_names,
-        'count': len(feature_names)
+        'features': m.feature_names,
+        'count': len(m.feature_names)
     }), 200
 
 @app.route('/', methods=['GET'])
@@ -187,7 +690,11 @@ def index():
             'GET /api/health': 'Health check',
             'POST /api/analyze': 'Analyze single account',
             'POST /api/batch-analyze': 'Analyze multiple accounts',
-            'GET /api/features': 'Get required features'
+            'POST /api/batch-analyze/stream': 'Stream NDJSON/CSV accounts, get NDJSON results',
+            'GET /api/features': 'Get required features',
+            'POST /api/reload-model': 'Hot-swap the model from disk (GET for status)',
+            'POST /api/feedback': 'Store moderator-confirmed labels for retraining (GET for status)',
+            'GET /metrics': 'Prometheus metrics (per-stage latency histograms, counters)'
         }
     }), 200
 
@@ -0,0 +1,242 @@
+"""
+Batch payload formats for the scoring endpoints
+
+Besides the original JSON list of account dicts, /api/batch-analyze reads:
+  - column-oriented JSON: {"#Posts": [...], "#Followers": [...], ...}
+  - NumPy .npy (application/x-npy): an (N, F) numeric array in
+    /api/features order, or a structured array with one field per feature
+  - Arrow IPC (application/vnd.apache.arrow.stream or .file), one column
+    per feature; needs pyarrow, which is optional
+Numeric payloads go straight into the feature matrix. A float64 .npy body
+is used in place without copying, and Arrow columns are copied at most
+once each. No per-cell Python work is done.
+
+Results can be written back as JSON records (the default), JSON columns,
+.npy (a structured array) or Arrow.
+"""
+
+import io
+import json
+
+import numpy as np
+
+from feature_extraction import to_float_column
+
+NPY_TYPES = ('application/x-npy', 'application/npy')
+ARROW_STREAM_TYPE = 'application/vnd.apache.arrow.stream'
+ARROW_FILE_TYPE = 'application/vnd.apache.arrow.file'
+OUTPUT_FORMATS = ('records', 'columns', 'npy', 'arrow')
+# Booleans, integers and floats; the dtype kinds a feature column may have
+NUMERIC_KINDS = 'biuf'
+RESULT_DTYPE = np.dtype([
+    ('is_fake', '?'),
+    ('confidence', '<f8'),
+    ('fake_probability', '<f8'),
+    ('risk_level', '<U11'),
+    ('cluster_id', '<i8'),
+    ('cluster_size', '<i8'),
+])
+
+
+class PayloadError(ValueError):
+    """The request body could not be read as a batch (HTTP 400)"""
+    status_code = 400
+
+
+class UnsupportedFormat(PayloadError):
+    """The format is known but can't be handled here (HTTP 415)"""
+    status_code = 415
+
+
+def input_format(mimetype, body):
+    """'npy', 'arrow' or 'json' for a request's content type (sniffing octet-stream)"""
+    if mimetype in NPY_TYPES:
+        return 'npy'
+    if mimetype in (ARROW_STREAM_TYPE, ARROW_FILE_TYPE):
+        return 'arrow'
+    if mimetype == 'application/octet-stream':
+        if body[:6] == b'\x93NUMPY':
+            return 'npy'
+        if body[:6] == b'ARROW1' or body[:4] == b'\xff\xff\xff\xff':
+            return 'arrow'
+        raise PayloadError('Unrecognised binary payload; send .npy or Arrow IPC')
+    return 'json'
+
+
+def output_format(requested, accept):
+    """Pick the response format from ?format= or, failing that, the Accept header"""
+    if requested:
+        if requested not in OUTPUT_FORMATS:
+            raise PayloadError(f"Unknown format '{requested}', expected one of {', '.join(OUTPUT_FORMATS)}")
+        return requested
+    accept = accept or ''
+    if any(t in accept for t in NPY_TYPES):
+        return 'npy'
+    if ARROW_STREAM_TYPE in accept or ARROW_FILE_TYPE in accept:
+        return 'arrow'
+    return 'records'
+
+
+# -- reading ------------------------------------------------------------------
+
+def _finite(X):
+    """Same rule as the JSON path: NaN and infinities count as 0"""
+    if np.isfinite(X).all():
+        return X
+    return np.where(np.isfinite(X), X, 0.0)
+
+
+def read_npy(body, feature_names):
+    """(N, F) float matrix from a .npy body, without copying when it is float64"""
+    buffer = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(buffer)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(buffer)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(buffer)
+        else:
+            raise ValueError(f"unsupported .npy version {version}")
+    except ValueError as e:
+        raise PayloadError(f"Invalid .npy payload: {e}")
+    if dtype.hasobject:
+        raise PayloadError('Object arrays are not accepted')
+    count = int(np.prod(shape)) if shape else 1
+    if len(body) - buffer.tell() < count * dtype.itemsize:
+        raise PayloadError('Truncated .npy payload')
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=buffer.tell())
+    array = array.reshape(shape, order='F' if fortran_order else 'C')
+    if not dtype.names and dtype.kind not in NUMERIC_KINDS:
+        raise PayloadError(f"Expected a numeric array, got {dtype}")
+
+    if dtype.names:
+        if array.ndim != 1:
+            raise PayloadError(f"Expected a 1-D structured array, got shape {array.shape}")
+        X = np.zeros((len(array), len(feature_names)), dtype=np.float64)
+        for j, fname in enumerate(feature_names):
+            if fname in dtype.names:
+                field = dtype.fields[fname][0]
+                if field.kind not in NUMERIC_KINDS or field.shape:
+                    raise PayloadError(f"Field '{fname}' must be a numeric scalar, got {field}")
+                X[:, j] = array[fname]
+        return _finite(X)
+
+    if array.ndim != 2 or array.shape[1] != len(feature_names):
+        raise PayloadError(
+            f"Expected an (N, {len(feature_names)}) array in /api/features order, got shape {array.shape}"
+        )
+    return _finite(np.ascontiguousarray(array, dtype=np.float64))
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise UnsupportedFormat('Arrow payloads need pyarrow installed on the server')
+    return pyarrow
+
+
+def read_arrow(body, feature_names):
+    """(N, F) float matrix from an Arrow IPC stream or file"""
+    pa = _arrow()
+    try:
+        source = pa.py_buffer(body)
+        reader = pa.ipc.open_file(source) if body[:6] == b'ARROW1' else pa.ipc.open_stream(source)
+        table = reader.read_all()
+    except pa.ArrowInvalid as e:
+        raise PayloadError(f"Invalid Arrow payload: {e}")
+
+    X = np.zeros((table.num_rows, len(feature_names)), dtype=np.float64)
+    for j, fname in enumerate(feature_names):
+        if fname not in table.column_names:
+            continue
+        column = table.column(fname)
+        kind = column.type
+        if pa.types.is_null(kind):
+            continue
+        if not (pa.types.is_integer(kind) or pa.types.is_floating(kind) or pa.types.is_boolean(kind)):
+            raise PayloadError(f"Column '{fname}' must be numeric, got {kind}")
+        if column.null_count:
+            column = column.fill_null(False if pa.types.is_boolean(kind) else 0)
+        X[:, j] = column.to_numpy()
+    return _finite(X)
+
+
+def _column_length(columns):
+    if not all(isinstance(values, list) for values in columns.values()):
+        raise PayloadError('Column-oriented JSON needs a list for every column')
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise PayloadError('Column-oriented JSON needs columns of equal length')
+    return lengths.pop() if lengths else 0
+
+
+def columns_to_accounts(columns):
+    """Column-oriented JSON back to account dicts, for columns that need feature derivation"""
+    _column_length(columns)
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def read_columns(columns, feature_names):
+    """
+    (N, F) float matrix from column-oriented JSON holding model features only,
+    or None when other (raw profile) columns need the per-account path
+    """
+    if not set(columns) <= set(feature_names):
+        return None
+    X = np.zeros((_column_length(columns), len(feature_names)), dtype=np.float64)
+    for j, fname in enumerate(feature_names):
+        if fname in columns:
+            # One conversion per column; None and unparseable values become 0
+            X[:, j] = to_float_column(columns[fname])
+    return X
+
+
+# -- writing ------------------------------------------------------------------
+
+def result_columns(probabilities, classes):
+    """Result fields as arrays, one entry per scored row"""
+    # Same rule as clf.predict: the label is the argmax of the probabilities
+    predictions = classes.take(np.argmax(probabilities, axis=1))
+    fake_probability = probabilities[:, 1] * 100
+    return {
+        'is_fake': predictions == 1,
+        'confidence': np.round(probabilities.max(axis=1) * 100, 2),
+        'fake_probability': np.round(fake_probability, 2),
+        'risk_level': np.select(
+            [fake_probability > 70, fake_probability > 40], ['High Risk', 'Medium Risk'], 'Low Risk'
+        ),
+    }
+
+
+def write_columns(columns, meta):
+    """JSON body with one list per result field"""
+    body = dict(meta)
+    body['results'] = {
+        'status': np.where(columns['is_fake'], 'Likely Fake', 'Likely Real').tolist(),
+        **{name: values.tolist() for name, values in columns.items()},
+    }
+    return json.dumps(body), 'application/json'
+
+
+def write_npy(columns):
+    out = np.empty(len(columns['is_fake']), dtype=RESULT_DTYPE)
+    for name in RESULT_DTYPE.names:
+        out[name] = columns[name]
+    buffer = io.BytesIO()
+    np.save(buffer, out, allow_pickle=False)
+    return buffer.getvalue(), NPY_TYPES[0]
+
+
+def write_arrow(columns, meta):
+    pa = _arrow()
+    table = pa.table(
+        {name: pa.array(values) for name, values in columns.items()},
+        metadata={key: str(value) for key, value in meta.items()},
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes(), ARROW_STREAM_TYPE
@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+"""
+Load-test and benchmark suite for the Instagram API
+
+Runs single, batch (several sizes) and mixed workloads at one or more
+concurrency levels, either in-process through Flask's test client or
+against a running server, and reports throughput, p50/p95/p99 latency and
+memory per scenario. Payloads are drawn from OldDataSet.csv with a fixed
+seed, so two runs send exactly the same requests. Accounts differ only
+slightly, so duplicate grouping is pinned to exact matches in-process; run
+a --url server with the default DUPLICATE_TOLERANCE=0 as well.
+
+Results are written as JSON. Given a baseline from an earlier run, the
+suite exits non-zero when any scenario's p99 latency or throughput is worse
+than the baseline by more than the threshold.
+
+Usage:
+    python benchmark_api.py --output bench.json
+    python benchmark_api.py --url http://127.0.0.1:5000 --concurrency 1,8
+    python benchmark_api.py --baseline bench_baseline.json --threshold 0.15
+    python benchmark_api.py --save-baseline bench_baseline.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BATCH_SIZES = (10, 100, 1000)
+# Share of mixed-workload requests per (kind, batch size)
+MIXED_WEIGHTS = ((('single', 1), 0.80), (('batch', 10), 0.15), (('batch', 100), 0.05))
+
+
+class Payloads:
+    """Deterministic request bodies built from the training data"""
+
+    def __init__(self, csv_path, seed=42, unique=True):
+        df = pd.read_csv(csv_path).drop(columns=['Fake'], errors='ignore').fillna(0)
+        self.columns = df.columns.tolist()
+        self.rows = df.to_numpy(dtype=np.float64)
+        self.rng = np.random.default_rng(seed)
+        self.unique = unique
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def accounts(self, n):
+        with self.lock:
+            picks = self.rows[self.rng.integers(0, len(self.rows), n)].copy()
+            if self.unique:
+                # Nudge #Followers so no two accounts share a feature vector,
+                # otherwise the result cache and duplicate grouping would
+                # answer most requests
+                picks[:, self.columns.index('#Followers')] += self.counter + np.arange(n) * 1e-3
+                self.counter += 1
+        return [dict(zip(self.columns, row)) for row in picks.tolist()]
+
+    def request(self, kind, size):
+        if kind == 'single':
+            return '/api/analyze', json.dumps(self.accounts(1)[0])
+        return '/api/batch-analyze', json.dumps(self.accounts(size))
+
+
+class InProcessClient:
+    """Flask test client; one per worker thread"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, path, body):
+        response = self.client.post(path, data=body, content_type='application/json')
+        response.get_data()
+        return response.status_code
+
+
+class HttpClient:
+    """Keep-alive HTTP connection to a running server; one per worker thread"""
+
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.conn = None
+
+    def post(self, path, body):
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+                response = self.conn.getresponse()
+                response.read()
+                return response.status
+            except (ConnectionError, http.client.HTTPException):
+                # Server closed the idle connection; reconnect once
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+
+def memory_mb(target_url):
+    """RSS of the process serving the requests"""
+    if target_url is None:
+        # The app is already imported in-process; measure it as /api/health does
+        from backend_api import process_rss_mb
+        return process_rss_mb()
+    parsed = urlparse(target_url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=10)
+    conn.request('GET', '/api/health')
+    health = json.loads(conn.getresponse().read())
+    conn.close()
+    return health.get('memory_rss_mb')
+
+
+def run_scenario(name, plan, payloads, make_client, concurrency, n_requests, warmup, target_url):
+    """
+    Send n_requests drawn from plan (a list of (kind, size)) over
+    `concurrency` threads; returns the scenario's summary dict
+    """
+    bodies = [plan[i % len(plan)] for i in range(n_requests + warmup)]
+    requests_ = [payloads.request(kind, size) for kind, size in bodies]
+    sizes = [size for _, size in bodies]
+    latencies = np.zeros(n_requests)
+    statuses = np.zeros(n_requests, dtype=np.int64)
+    next_index = iter(range(n_requests))
+    index_lock = threading.Lock()
+
+    def worker():
+        client = make_client()
+        while True:
+            with index_lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            path, body = requests_[warmup + i]
+            start = time.perf_counter()
+            try:
+                statuses[i] = client.post(path, body)
+            except Exception:
+                statuses[i] = -1
+            latencies[i] = time.perf_counter() - start
+
+    warm_client = make_client()
+    for path, body in requests_[:warmup]:
+        warm_client.post(path, body)
+
+    memory_before = memory_mb(target_url)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+    memory_after = memory_mb(target_url)
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    rows = sum(sizes[warmup:])
+    return {
+        'scenario': name,
+        'concurrency': concurrency,
+        'requests': n_requests,
+        'errors': int((statuses != 200).sum()),
+        'seconds': round(elapsed, 4),
+        'requests_per_s': round(n_requests / elapsed, 2),
+        'rows_per_s': round(rows / elapsed, 2),
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+        'memory_mb_before': memory_before and round(memory_before, 1),
+        'memory_mb_after': memory_after and round(memory_after, 1),
+    }
+
+
+def median_of(runs):
+    """Combine repeated runs of one scenario: medians for timings, totals for errors"""
+    combined = dict(runs[0])
+    for key, value in runs[0].items():
+        if key in ('scenario', 'concurrency', 'requests'):
+            continue
+        values = [run[key] for run in runs if run[key] is not None]
+        if key == 'errors':
+            combined[key] = int(sum(values))
+        elif values:
+            combined[key] = round(float(np.median(values)), 3)
+    combined['repeats'] = len(runs)
+    return combined
+
+
+def build_scenarios(batch_sizes, n_requests, seed):
+    """(name, plan, request count) per workload; batch counts shrink with size"""
+    scenarios = [('single', [('single', 1)], n_requests)]
+    for size in batch_sizes:
+        scenarios.append((f'batch_{size}', [('batch', size)], max(20, n_requests * 10 // size)))
+    rng = np.random.default_rng(seed)
+    kinds = [kind for kind, _ in MIXED_WEIGHTS]
+    picks = rng.choice(len(kinds), size=n_requests, p=[w for _, w in MIXED_WEIGHTS])
+    scenarios.append(('mixed', [kinds[i] for i in picks], n_requests))
+    return scenarios
+
+
+def environment(target_url):
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    import sklearn
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': commit,
+        'target': target_url or 'in-process',
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scikit_learn': sklearn.__version__,
+        'cpu_count': os.cpu_count(),
+        'platform': platform.platform(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Scenario-by-scenario regressions beyond threshold (fractional)"""
+    previous = {(r['scenario'], r['concurrency']): r for r in baseline['results']}
+    regressions = []
+    for current in results:
+        before = previous.get((current['scenario'], current['concurrency']))
+        if before is None:
+            continue
+        if current['p99_ms'] > before['p99_ms'] * (1 + threshold):
+            regressions.append(
+                f"{current['scenario']} x{current['concurrency']}: p99 {before['p99_ms']:.2f} -> "
+                f"{current['p99_ms']:.2f} ms (+{(current['p99_ms'] / before['p99_ms'] - 1) * 100:.0f}%)"
+            )
+        if current['requests_per_s'] < before['requests_per_s'] * (1 - threshold):
+            regressions.append(
+                f"{current['scenario']} x{current['concurrency']}: throughput {before['requests_per_s']:.1f} -> "
+                f"{current['requests_per_s']:.1f} req/s ({(current['requests_per_s'] / before['requests_per_s'] - 1) * 100:.0f}%)"
+            )
+        if current['errors'] > before['errors']:
+            regressions.append(
+                f"{current['scenario']} x{current['concurrency']}: errors {before['errors']} -> {current['errors']}"
+            )
+    return regressions
+
+
+def print_table(results):
+    print(f"{'scenario':12s} {'conc':>5s} {'req/s':>10s} {'rows/s':>12s} {'p50 ms':>9s} "
+          f"{'p95 ms':>9s} {'p99 ms':>9s} {'errors':>7s} {'RSS MB':>8s}")
+    for r in results:
+        print(f"{r['scenario']:12s} {r['concurrency']:5d} {r['requests_per_s']:10.1f} {r['rows_per_s']:12.1f} "
+              f"{r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f} {r['errors']:7d} "
+              f"{r['memory_mb_after'] or 0:8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Instagram API')
+    parser.add_argument('--url', default=None,
+                        help='Benchmark a running server (default: the app in-process)')
+    parser.add_argument('--concurrency', default='1,4',
+                        help='Comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=300,
+                        help='Requests per single/mixed scenario (batch scenarios scale down)')
+    parser.add_argument('--batch-sizes', default=','.join(map(str, DEFAULT_BATCH_SIZES)))
+    parser.add_argument('--scenarios', default=None,
+                        help='Comma-separated subset, e.g. single,batch_100,mixed')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='Runs per scenario; the median of each metric is reported')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat-payloads', action='store_true',
+                        help='Allow identical accounts across requests (exercises the result cache)')
+    parser.add_argument('--data', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'OldDataSet.csv'))
+    parser.add_argument('--output', default=None, help='Write results JSON here')
+    parser.add_argument('--baseline', default=None, help='Fail on regressions against this results JSON')
+    parser.add_argument('--save-baseline', default=None, help='Also write the results as a new baseline')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Allowed fractional regression in p99 latency and throughput')
+    args = parser.parse_args(argv)
+
+    payloads = Payloads(args.data, seed=args.seed, unique=not args.repeat_payloads)
+    if args.url:
+        make_client = lambda: HttpClient(args.url)
+    else:
+        # Approximate grouping would merge the nudged accounts back together
+        os.environ['DUPLICATE_TOLERANCE'] = '0'
+        from backend_api import app
+        make_client = lambda: InProcessClient(app)
+
+    concurrency_levels = [int(c) for c in args.concurrency.split(',')]
+    batch_sizes = [int(s) for s in args.batch_sizes.split(',') if s]
+    scenarios = build_scenarios(batch_sizes, args.requests, args.seed)
+    if args.scenarios:
+        wanted = set(args.scenarios.split(','))
+        scenarios = [s for s in scenarios if s[0] in wanted]
+
+    print(f"Benchmarking {args.url or 'in-process app'}: {len(scenarios)} scenarios x "
+          f"concurrency {concurrency_levels}")
+    print("=" * 60)
+    results = []
+    for concurrency in concurrency_levels:
+        for name, plan, n_requests in scenarios:
+            result = median_of([
+                run_scenario(name, plan, payloads, make_client, concurrency, n_requests, args.warmup, args.url)
+                for _ in range(args.repeats)
+            ])
+            results.append(result)
+            print(f"  {name} x{concurrency}: {result['requests_per_s']:.1f} req/s, p99 {result['p99_ms']:.2f} ms")
+
+    print()
+    print_table(results)
+    report = {'environment': environment(args.url), 'settings': vars(args), 'results': results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\n✓ Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) beyond {args.threshold:.0%} vs {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n✓ No regressions beyond {args.threshold:.0%} vs {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Request coalescing (micro-batching) for single-account scoring
+
+Concurrent /api/analyze calls each hand their feature row to a shared
+coalescer. A background thread collects rows for a short window (or until
+the batch is full), scores them with one vectorized call and resolves each
+caller's future with its own row of probabilities. Each row can carry a
+context (e.g. the model snapshot it must be scored with); rows are only
+batched with others that share the same context.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class RequestCoalescer:
+    """Collects concurrent single-row requests into one scoring call"""
+
+    def __init__(self, score_fn, window_ms=2.0, max_batch=64):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.batches_scored = 0
+        self.rows_scored = 0
+        self._start()
+        # A forked worker (prefork.py) inherits this object but not its thread
+        if hasattr(os, 'register_at_fork'):  # not on Windows
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='request-coalescer', daemon=True)
+        self._thread.start()
+
+    def submit(self, row, context=None):
+        """Queue one feature row; the returned future resolves to its probabilities"""
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=np.float64), context, future))
+        return future
+
+    def score(self, row, context=None, timeout=None):
+        return self.submit(row, context).result(timeout=timeout)
+
+    def _collect(self):
+        """Block for the first row, then gather more until the window closes"""
+        pending = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(pending) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self):
+        while True:
+            groups = {}
+            for row, context, future in self._collect():
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault(id(context), (context, []))[1].append((row, future))
+            for context, live in groups.values():
+                self._score_group(context, live)
+
+    def _score_group(self, context, live):
+        futures = [future for _, future in live]
+        try:
+            probabilities = self.score_fn(np.vstack([row for row, _ in live]), context)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        self.batches_scored += 1
+        self.rows_scored += len(futures)
+        for future, probs in zip(futures, probabilities):
+            future.set_result(probs)
+
+    def stats(self):
+        return {
+            'window_ms': self.window * 1000.0,
+            'max_batch': self.max_batch,
+            'batches_scored': self.batches_scored,
+            'rows_scored': self.rows_scored,
+            'avg_batch_size': round(self.rows_scored / self.batches_scored, 2) if self.batches_scored else 0.0,
+        }
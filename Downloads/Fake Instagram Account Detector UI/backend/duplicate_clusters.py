@@ -0,0 +1,68 @@
+"""
+Near-duplicate grouping of feature vectors
+
+Bot farms submit many accounts with the same, or almost the same, feature
+vector. This module hashes each row to a grid cell and treats every cell
+as one cluster, so a batch can be scored once per cluster. The grid is
+logarithmic: a feature is bucketed on log1p(|x|) in steps of
+log1p(tolerance). Large counts (#Followers 10000 vs 10050) then share a
+cell at a relative tolerance, while small integers and the 0/1 flags
+(Bio Length 10 vs 11, Private 0 vs 1) always land in different cells. A
+tolerance of 0 groups exact duplicates only.
+
+Two rows close to a cell boundary can still fall on different sides.
+Grouping is a cheap filter, not a true nearest-neighbour search.
+"""
+
+import numpy as np
+
+
+class Clusters:
+    """Cluster assignment for the rows of one batch"""
+
+    def __init__(self, labels, representatives, sizes):
+        self.labels = labels                    # (N,) cluster id per row, in order of first appearance
+        self.representatives = representatives  # (K,) row index scored for each cluster
+        self.sizes = sizes                      # (K,) rows per cluster
+
+    @property
+    def count(self):
+        return len(self.representatives)
+
+    @property
+    def duplicates(self):
+        """Rows that were not scored themselves"""
+        return len(self.labels) - self.count
+
+    def row_sizes(self):
+        """(N,) size of the cluster each row belongs to"""
+        return self.sizes[self.labels]
+
+
+def grid_keys(X, tolerance):
+    """Integer grid cell per value; equal rows give equal keys"""
+    X = np.asarray(X, dtype=np.float64)
+    if tolerance <= 0:
+        return X + 0.0  # fold -0.0 into 0.0
+    step = np.log1p(tolerance)
+    return (np.sign(X) * np.floor(np.log1p(np.abs(X)) / step)).astype(np.int64)
+
+
+def find_clusters(X, tolerance=0.0):
+    """Group the rows of X that share a grid cell (see module docstring)"""
+    n = len(X)
+    if n < 2:
+        return Clusters(np.zeros(n, dtype=np.int64), np.arange(n), np.ones(n, dtype=np.int64))
+
+    keys = grid_keys(X, tolerance)
+    _, first, inverse, counts = np.unique(
+        keys, axis=0, return_index=True, return_inverse=True, return_counts=True
+    )
+    inverse = inverse.reshape(-1)
+    # np.unique orders cells by key; renumber them by first appearance so
+    # ids follow the input order, and use each cell's first row as its
+    # representative
+    order = np.argsort(first, kind='stable')
+    renumber = np.empty_like(order)
+    renumber[order] = np.arange(len(order))
+    return Clusters(renumber[inverse], first[order], counts[order])
@@ -0,0 +1,175 @@
+"""
+Feature extraction for the Instagram classifier
+
+Builds the model's (N, F) feature matrix from a batch of account dicts in
+columnar form. Each account may send the model features directly
+('Bio Length', '#Followers', ...) or raw profile fields ('username', 'bio',
+'followers', ...) as test_api.py and most upstream services do. Explicit
+model features win; anything missing is derived from the raw fields, and
+only then defaults to 0.
+
+Text features are computed over the whole batch at once: strings are
+concatenated, decoded to a code point array and reduced per row with
+bincount, so there is no per-character Python loop.
+"""
+
+import numpy as np
+
+# Raw profile fields (first present alias wins) for the numeric/flag features
+NUMERIC_ALIASES = {
+    '#Posts': ('posts', 'posts_count', 'media_count'),
+    '#Followers': ('followers', 'followers_count'),
+    '#Following': ('following', 'following_count'),
+}
+FLAG_ALIASES = {
+    'Profile Pic': ('has_profile_pic', 'profile_pic', 'profile_pic_url'),
+    'External Url': ('external_url', 'has_external_url'),
+    'Private': ('is_private', 'private'),
+    'Verified': ('is_verified', 'verified'),
+    'Business': ('is_business', 'is_business_account', 'business'),
+}
+TEXT_ALIASES = {
+    'username': ('username',),
+    'name': ('name', 'full_name'),
+    'bio': ('bio', 'biography'),
+}
+FALSE_STRINGS = frozenset(('', '0', 'false', 'no', 'off', 'none', 'null'))
+WHITESPACE = np.array([9, 10, 11, 12, 13, 32, 0xA0, 0x2028, 0x2029, 0x3000], dtype=np.uint32)
+
+
+def _to_float(value):
+    try:
+        return float(str(value).replace(',', '')) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def to_float_column(values):
+    """Coerce a list of values to float64; unparseable values become 0"""
+    try:
+        column = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        column = np.fromiter((_to_float(v) for v in values), dtype=np.float64, count=len(values))
+    column[~np.isfinite(column)] = 0.0
+    return column
+
+
+def to_flag_column(values):
+    """Coerce booleans, numbers and strings (URLs, 'true'/'false') to 0/1"""
+    return np.fromiter(
+        (
+            0.0 if v is None
+            else float(v.strip().lower() not in FALSE_STRINGS) if isinstance(v, str)
+            else float(bool(v))
+            for v in values
+        ),
+        dtype=np.float64,
+        count=len(values),
+    )
+
+
+def text_stats(texts):
+    """
+    Per-string (length, digit count, word count) for a list of strings,
+    computed over one concatenated code point array
+    """
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    n = len(texts)
+    if lengths.sum() == 0:
+        zeros = np.zeros(n)
+        return lengths.astype(np.float64), zeros, zeros
+
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32)
+    row_ids = np.repeat(np.arange(n), lengths)
+
+    is_digit = (codes >= 48) & (codes <= 57)
+    is_space = np.isin(codes, WHITESPACE)
+    offsets = np.cumsum(lengths) - lengths
+    starts = np.zeros(len(codes), dtype=bool)
+    starts[offsets[lengths > 0]] = True
+    prev_space = np.empty(len(codes), dtype=bool)
+    prev_space[0] = True
+    prev_space[1:] = is_space[:-1]
+    word_starts = ~is_space & (prev_space | starts)
+
+    digits = np.bincount(row_ids, weights=is_digit, minlength=n)
+    words = np.bincount(row_ids, weights=word_starts, minlength=n)
+    return lengths.astype(np.float64), digits, words
+
+
+def _first_present(account, aliases):
+    for alias in aliases:
+        if alias in account:
+            return account[alias]
+    return None
+
+
+def _text(value):
+    return value if isinstance(value, str) else '' if value is None else str(value)
+
+
+def derive_features(accounts):
+    """
+    Model features derived from raw profile fields. Returns
+    ({feature: column}, {feature: mask of rows that sent the raw field})
+    """
+    columns = {}
+    sources = {}
+    for feature, aliases in NUMERIC_ALIASES.items():
+        values = [_first_present(a, aliases) for a in accounts]
+        columns[feature] = to_float_column(values)
+        sources[feature] = np.array([v is not None for v in values], dtype=bool)
+    for feature, aliases in FLAG_ALIASES.items():
+        values = [_first_present(a, aliases) for a in accounts]
+        columns[feature] = to_flag_column(values)
+        sources[feature] = np.array([v is not None for v in values], dtype=bool)
+
+    texts = {}
+    for field, aliases in TEXT_ALIASES.items():
+        values = [_first_present(a, aliases) for a in accounts]
+        texts[field] = [_text(v) for v in values]
+        sources[field] = np.array([v is not None for v in values], dtype=bool)
+
+    username_len, username_digits, _ = text_stats(texts['username'])
+    _, _, name_words = text_stats(texts['name'])
+    bio_len, _, _ = text_stats(texts['bio'])
+
+    columns['Nums/Length Username'] = np.where(
+        username_len > 0, username_digits / np.maximum(username_len, 1), 0.0
+    )
+    columns['Full Name Words'] = name_words
+    columns['Bio Length'] = bio_len
+    sources['Nums/Length Username'] = sources.pop('username')
+    sources['Full Name Words'] = sources.pop('name')
+    sources['Bio Length'] = sources.pop('bio')
+    return columns, sources
+
+
+def extract_features(accounts, feature_names):
+    """
+    Build the (N, F) model matrix for a batch of account dicts.
+    Returns (X, derived) where derived[i, j] is True when feature j of
+    account i came from raw profile fields rather than the request itself.
+    """
+    n = len(accounts)
+    X = np.zeros((n, len(feature_names)), dtype=np.float64)
+    derived = np.zeros((n, len(feature_names)), dtype=bool)
+    if n == 0:
+        return X, derived
+
+    raw = None
+    for j, fname in enumerate(feature_names):
+        values = [account.get(fname) for account in accounts]
+        present = np.fromiter((v is not None for v in values), dtype=bool, count=n)
+        if present.all():
+            X[:, j] = to_float_column(values)
+            continue
+        if raw is None:
+            raw = derive_features(accounts)
+        columns, sources = raw
+        if fname in columns:
+            X[:, j] = columns[fname]
+            derived[:, j] = sources[fname] & ~present
+        if present.any():
+            X[present, j] = to_float_column([v for v in values if v is not None])
+    return X, derived
@@ -0,0 +1,148 @@
+"""
+Append-only store of moderator-labelled accounts
+
+Each confirmed label is one CSV row in the OldDataSet.csv schema (the model
+features in model order, then Fake), plus the time it was received.
+Appends hold an exclusive lock on a sidecar <path>.lock file, so several
+API worker processes can write to the same file. Readers address rows by
+byte offset. The incremental trainer only reads what was appended since
+its last run, and its cost does not grow with the size of the file.
+stats() likewise only counts the bytes appended since its previous call
+on the same store object.
+"""
+
+import csv
+import io
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+LABEL_COLUMN = 'Fake'
+TIME_COLUMN = 'received_at'
+LABEL_STRINGS = {'1': 1, 'fake': 1, 'true': 1, '0': 0, 'real': 0, 'false': 0}
+
+
+def parse_label(value):
+    """0/1 from a bool, number or 'fake'/'real' string; None if unrecognised"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return int(value)
+    if isinstance(value, str):
+        return LABEL_STRINGS.get(value.strip().lower())
+    return None
+
+
+@contextmanager
+def _exclusive_lock(path):
+    """Exclusive lock on `path` for the with-block: flock on POSIX, msvcrt on Windows"""
+    with open(path, 'w') as f:
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+            yield
+            return
+
+        import msvcrt
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                pass  # LK_LOCK gives up after about 10 seconds; keep waiting like flock
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FeedbackStore:
+    """CSV file of labelled feature rows, appended under a file lock"""
+
+    def __init__(self, path, feature_names):
+        self.path = path
+        self.feature_names = list(feature_names)
+        self.columns = self.feature_names + [LABEL_COLUMN, TIME_COLUMN]
+        # Line counts already known: (position, rows before it) for the end
+        # of the file and for the trainer's offset
+        self._counted = {'end': (0, 0), 'offset': (0, 0)}
+        self._inode = None
+        self._lock = threading.Lock()
+
+    def append(self, X, labels):
+        """Append rows of raw features with their 0/1 labels; returns the end offset"""
+        received_at = datetime.now().isoformat(timespec='seconds')
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row, label in zip(np.asarray(X, dtype=np.float64).tolist(), labels):
+            writer.writerow(row + [int(label), received_at])
+
+        with _exclusive_lock(self.path + '.lock'), open(self.path, 'a+', newline='') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                csv.writer(f).writerow(self.columns)
+            f.write(buffer.getvalue())
+            f.flush()
+            return f.tell()
+
+    def size(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def read(self, start=0, stop=None):
+        """
+        (frame, end_offset) for the rows between two byte offsets. Offset 0
+        means the start of the data; offsets always fall on row boundaries.
+        """
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=self.columns), 0
+        with open(self.path, 'rb') as f:
+            header = f.readline()
+            start = max(start, len(header))
+            stop = self.size() if stop is None else stop
+            f.seek(start)
+            data = f.read(max(0, stop - start))
+        # A writer may be mid-append; stop at the last complete line
+        data = data[:data.rfind(b'\n') + 1]
+        if not data:
+            return pd.DataFrame(columns=self.columns), start
+        frame = pd.read_csv(io.BytesIO(data), header=None, names=self.columns)
+        return frame, start + len(data)
+
+    def _rows_before(self, f, key, position):
+        """Rows between the header and `position`, scanning only past the last count"""
+        start, rows = self._counted[key]
+        if position < start:
+            start, rows = 0, 0  # offset moved back: count again
+        f.seek(start)
+        if start == 0:
+            start = len(f.readline())
+        while start < position:
+            chunk = f.read(min(1 << 20, position - start))
+            if not chunk:
+                break
+            rows += chunk.count(b'\n')
+            start += len(chunk)
+        self._counted[key] = (start, rows)
+        return rows
+
+    def stats(self, offset=0):
+        """Row counts, total and after the trainer's `offset`"""
+        if not os.path.exists(self.path):
+            return {'rows': 0, 'pending': 0, 'bytes': 0}
+        with self._lock, open(self.path, 'rb') as f:
+            status = os.fstat(f.fileno())
+            if status.st_ino != self._inode:
+                # A new or replaced file: nothing counted so far applies
+                self._inode = status.st_ino
+                self._counted = {'end': (0, 0), 'offset': (0, 0)}
+            total = self._rows_before(f, 'end', status.st_size)
+            done = self._rows_before(f, 'offset', min(offset, status.st_size))
+        return {'rows': total, 'pending': total - done, 'bytes': status.st_size}
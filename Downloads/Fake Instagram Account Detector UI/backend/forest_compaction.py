@@ -0,0 +1,233 @@
+"""
+Post-training compaction for the compiled Instagram forest
+
+Shrinks a CompiledForest in three ways:
+  - depth capping: nodes below max_depth become leaves carrying the class
+    distribution already stored at that node
+  - leaf merging: sibling leaves whose distributions differ by at most
+    merge_tolerance collapse into their parent (bottom-up, so merges cascade)
+  - tree selection: trees are added greedily, each time picking the one that
+    brings the ensemble's probabilities closest to the full forest's
+
+compact_forest() tries each depth cap and keeps the smallest forest (by
+node count) whose precision and recall on the evaluation split are within
+the given tolerance of the full model. The API also returns probabilities
+and derives risk levels from them, so the mean absolute probability error
+against the full forest is bounded too.
+
+The result is written to its own bundle, COMPACT_BUNDLE_PATH, so that
+model_bundle.bin always matches the full forest in classifier_model.pkl.
+Serve it with MODEL_BUNDLE_PATH=model_bundle_compact.bin;
+incremental_trainer.py recompacts it whenever it publishes.
+"""
+
+import time
+
+import numpy as np
+from sklearn.metrics import precision_score, recall_score
+
+from forest_compiler import CompiledForest
+from model_bundle import FOREST_ARRAYS
+
+COMPACT_BUNDLE_PATH = 'model_bundle_compact.bin'
+DEFAULT_DEPTH_CAPS = (None, 12, 10, 8, 6, 4)
+NODE_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value')
+
+
+def _tree_ranges(forest):
+    ends = np.append(forest.roots[1:], forest.node_count)
+    return list(zip(forest.roots.tolist(), ends.tolist()))
+
+
+def _rebuild_tree(forest, start, max_depth, merge_tolerance, out):
+    """Append one compacted tree to the `out` node lists"""
+    feature, threshold, left, right, value = (
+        forest.feature, forest.threshold, forest.left, forest.right, forest.value
+    )
+    base = len(out['feature'])
+
+    def emit_leaf(node, index=None):
+        if index is None:
+            index = len(out['feature'])
+            for name in NODE_ARRAYS:
+                out[name].append(None)
+        out['feature'][index] = 0
+        out['threshold'][index] = np.inf
+        out['left'][index] = index
+        out['right'][index] = index
+        out['value'][index] = value[node]
+        return index
+
+    def build(node, depth):
+        is_leaf = left[node] == node
+        if is_leaf or (max_depth is not None and depth >= max_depth):
+            return emit_leaf(node)
+
+        index = len(out['feature'])
+        for name in NODE_ARRAYS:
+            out[name].append(None)
+        new_left = build(left[node], depth + 1)
+        new_right = build(right[node], depth + 1)
+        if (out['left'][new_left] == new_left and out['left'][new_right] == new_right
+                and np.abs(out['value'][new_left] - out['value'][new_right]).max() <= merge_tolerance):
+            # Both children are leaves with (nearly) the same distribution:
+            # drop them and let this node answer with its own distribution
+            for name in NODE_ARRAYS:
+                del out[name][index + 1:]
+            return emit_leaf(node, index)
+
+        out['feature'][index] = feature[node]
+        out['threshold'][index] = threshold[node]
+        out['left'][index] = new_left
+        out['right'][index] = new_right
+        out['value'][index] = value[node]
+        return index
+
+    build(start, 0)
+    out['roots'].append(base)
+
+
+def _depth(left, right):
+    """Longest root-to-leaf path; nodes are in preorder, so parents come before children"""
+    depth = np.zeros(len(left), dtype=np.intp)
+    for node in range(len(left)):
+        if left[node] != node:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return int(depth.max()) if len(depth) else 0
+
+
+def rebuild_forest(forest, trees=None, max_depth=None, merge_tolerance=0.0):
+    """Copy the selected trees (default all) with depth capping and leaf merging applied"""
+    out = {name: [] for name in FOREST_ARRAYS}
+    ranges = _tree_ranges(forest)
+    for t in (range(forest.n_trees) if trees is None else trees):
+        _rebuild_tree(forest, ranges[t][0], max_depth, merge_tolerance, out)
+
+    left = np.asarray(out['left'], dtype=np.intp)
+    right = np.asarray(out['right'], dtype=np.intp)
+    return CompiledForest(
+        feature=np.asarray(out['feature'], dtype=np.intp),
+        threshold=np.asarray(out['threshold'], dtype=np.float64),
+        left=left,
+        right=right,
+        value=np.asarray(out['value'], dtype=np.float64).reshape(-1, forest.value.shape[1]),
+        roots=np.asarray(out['roots'], dtype=np.intp),
+        depth=_depth(left, right),
+        classes=forest.classes_,
+        n_features=forest.n_features,
+    )
+
+
+def greedy_tree_order(tree_probs, target):
+    """
+    Order trees so each prefix approximates target as closely as possible.
+    tree_probs is (N, T, C) per-tree probabilities, target the (N, C) full-forest output.
+    """
+    n_trees = tree_probs.shape[1]
+    remaining = list(range(n_trees))
+    order = []
+    total = np.zeros_like(target)
+    for k in range(1, n_trees + 1):
+        candidates = tree_probs[:, remaining, :]
+        # (N, R, C) mean of the current prefix plus each remaining tree
+        means = (total[:, None, :] + candidates) / k
+        errors = ((means - target[:, None, :]) ** 2).sum(axis=(0, 2))
+        best = remaining.pop(int(np.argmin(errors)))
+        order.append(best)
+        total += tree_probs[:, best, :]
+    return order
+
+
+def _classification_scores(forest, probabilities, y):
+    y_pred = forest.classes_.take(np.argmax(probabilities, axis=1))
+    return (precision_score(y, y_pred, zero_division=0),
+            recall_score(y, y_pred, zero_division=0))
+
+
+def compact_forest(forest, X_eval, y_eval, tolerance=0.01, merge_tolerance=0.05,
+                   max_prob_error=0.05, depth_caps=DEFAULT_DEPTH_CAPS):
+    """
+    Smallest compacted forest whose precision and recall on (X_eval, y_eval)
+    are each at most `tolerance` below the full forest's, and whose
+    probabilities are on average within `max_prob_error` of the full forest's.
+    Returns (compacted forest, search log of one dict per depth cap).
+    """
+    full_probs = forest.predict_proba(X_eval)
+    full_precision, full_recall = _classification_scores(forest, full_probs, y_eval)
+
+    best = None
+    log = []
+    for max_depth in depth_caps:
+        if max_depth is not None and max_depth >= forest.depth:
+            continue
+        capped = rebuild_forest(forest, max_depth=max_depth, merge_tolerance=merge_tolerance)
+        tree_probs = capped.value[capped.apply(X_eval)]
+        order = greedy_tree_order(tree_probs, full_probs)
+
+        # Prefix means for every k at once, then the first k within tolerance
+        prefix = np.cumsum(tree_probs[:, order, :], axis=1) / np.arange(1, len(order) + 1)[None, :, None]
+        chosen = None
+        prob_errors = np.abs(prefix - full_probs[:, None, :]).max(axis=2).mean(axis=0)
+        for k in range(1, len(order) + 1):
+            if prob_errors[k - 1] > max_prob_error:
+                continue
+            precision, recall = _classification_scores(capped, prefix[:, k - 1, :], y_eval)
+            if precision >= full_precision - tolerance and recall >= full_recall - tolerance:
+                chosen = (k, precision, recall, float(prob_errors[k - 1]))
+                break
+        if chosen is None:
+            log.append({'max_depth': max_depth, 'fits': False})
+            continue
+
+        k, precision, recall, prob_error = chosen
+        candidate = rebuild_forest(capped, trees=sorted(order[:k]))
+        log.append({'max_depth': max_depth, 'fits': True, 'n_trees': k,
+                    'node_count': candidate.node_count, 'precision': precision, 'recall': recall,
+                    'prob_error': prob_error})
+        if best is None or candidate.node_count < best.node_count:
+            best = candidate
+
+    if best is None:
+        best = forest
+    return best, log
+
+
+def forest_bytes(forest):
+    return sum(getattr(forest, name).nbytes for name in FOREST_ARRAYS)
+
+
+def _predict_times(forest, X, single_rows=200, batch_rows=1000, repeats=5):
+    rows = [X[i:i + 1] for i in range(min(single_rows, len(X)))]
+    batch = np.resize(X, (batch_rows, X.shape[1]))
+    forest.predict_proba(batch[:64])
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        forest.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    batch_timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        forest.predict_proba(batch)
+        batch_timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 99) * 1000, float(np.median(batch_timings)) * 1000
+
+
+def compaction_report(full, compact, X_eval, y_eval):
+    """Side-by-side size, node count, predict time and quality of both forests"""
+    rows = []
+    for label, forest in (('full', full), ('compact', compact)):
+        precision, recall = _classification_scores(forest, forest.predict_proba(X_eval), y_eval)
+        p99_ms, batch_ms = _predict_times(forest, X_eval)
+        rows.append({
+            'model': label,
+            'trees': forest.n_trees,
+            'nodes': forest.node_count,
+            'depth': forest.depth,
+            'size_kb': forest_bytes(forest) / 1024,
+            'single_p99_ms': p99_ms,
+            'batch_1k_ms': batch_ms,
+            'precision': precision,
+            'recall': recall,
+        })
+    return rows
@@ -0,0 +1,180 @@
+"""
+Flattened forest evaluator for the Instagram classifier
+
+Compiles a fitted RandomForestClassifier (plus the StandardScaler applied
+in front of it) into contiguous NumPy node arrays. The scaler's mean and
+scale are folded into the split thresholds, so raw feature matrices can be
+scored directly without sklearn's per-call validation overhead.
+
+explain() attributes each prediction to the features along its decision
+paths (Saabas-style). Every split moves the class probability from the
+parent node's value to the child's value, and that change is credited to
+the split feature. The base value (the mean root value) plus the
+per-feature contributions adds up exactly to the forest's probability. The
+per-node changes are precomputed once, so an explanation costs one extra
+bincount per traversal step.
+"""
+
+import numpy as np
+
+
+def _float32_split_bound(threshold):
+    """
+    sklearn compares float32(x_scaled) <= threshold. Return the float64 bound
+    b such that x_scaled <= b gives the same decision before the cast, i.e.
+    the midpoint between the largest float32 <= threshold and its successor.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    below = threshold.astype(np.float32)
+    below = np.where(below > threshold, np.nextafter(below, np.float32(-np.inf)), below)
+    above = np.nextafter(below, np.float32(np.inf))
+    return (below.astype(np.float64) + above.astype(np.float64)) / 2
+
+
+class CompiledForest:
+    """Array-backed random forest that scores raw (unscaled) feature rows"""
+
+    def __init__(self, feature, threshold, left, right, value, roots, depth, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.classes_ = classes
+        self.n_features = n_features
+        self._gains = None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def node_count(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, clf, scaler=None):
+        """Flatten every tree of a fitted forest into shared node arrays"""
+        n_features = clf.n_features_in_
+        mean = np.zeros(n_features)
+        scale = np.ones(n_features)
+        if scaler is not None:
+            if getattr(scaler, 'mean_', None) is not None:
+                mean = np.asarray(scaler.mean_, dtype=np.float64)
+            if getattr(scaler, 'scale_', None) is not None:
+                scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in clf.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n) + offset
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+            # x_scaled <= t  <=>  x <= t * scale + mean  (scale is always > 0)
+            bound = _float32_split_bound(tree.threshold)
+            threshold = np.where(is_leaf, np.inf, bound * scale[feature] + mean[feature])
+            # Leaves point at themselves so traversal can run a fixed number of steps
+            left = np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.intp)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.intp)
+
+            counts = tree.value[:, 0, :].astype(np.float64)
+            totals = counts.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(counts / totals)
+            roots.append(offset)
+            depth = max(depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features)),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds)),
+            left=np.ascontiguousarray(np.concatenate(lefts)),
+            right=np.ascontiguousarray(np.concatenate(rights)),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.intp),
+            depth=int(depth),
+            classes=np.asarray(clf.classes_),
+            n_features=n_features,
+        )
+
+    def _check_input(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the forest expects {self.n_features}"
+            )
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+        return X
+
+    def apply(self, X):
+        """Return the (N, n_trees) leaf index reached by each row in each tree"""
+        X = self._check_input(X)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        """Class probabilities averaged over trees, as RandomForestClassifier does"""
+        return self.value[self.apply(X)].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def path_gains(self, class_index=1):
+        """
+        Per-node change in one class's probability when a row goes left or right
+        (zero at leaves, which loop to themselves). Computed on first use.
+        """
+        if self._gains is None or self._gains[0] != class_index:
+            value = self.value[:, class_index]
+            self._gains = (class_index, value[self.left] - value, value[self.right] - value)
+        return self._gains[1], self._gains[2]
+
+    def base_value(self, class_index=1):
+        """Mean root probability of one class: the prediction before any split"""
+        return float(self.value[self.roots, class_index].mean())
+
+    def explain(self, X, class_index=1):
+        """
+        Return (probabilities, contributions). contributions is (N, n_features):
+        each feature's share of the move from base_value() to the row's
+        probability of classes_[class_index]
+        """
+        X = self._check_input(X)
+        n_rows = X.shape[0]
+        left_gain, right_gain = self.path_gains(class_index)
+        rows = np.arange(n_rows)[:, None]
+        # Flat (row, feature) slot per visit, so one bincount sums all trees
+        slots = rows * self.n_features
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        totals = np.zeros(n_rows * self.n_features)
+        for _ in range(self.depth):
+            feature = self.feature[nodes]
+            go_left = X[rows, feature] <= self.threshold[nodes]
+            gain = np.where(go_left, left_gain[nodes], right_gain[nodes])
+            totals += np.bincount((slots + feature).ravel(), gain.ravel(), minlength=totals.size)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        contributions = totals.reshape(n_rows, self.n_features) / self.n_trees
+        return self.value[nodes].mean(axis=1), contributions
+
+
+def compile_forest(clf, scaler=None):
+    """Compile a fitted RandomForestClassifier (and optional scaler)"""
+    return CompiledForest.from_sklearn(clf, scaler)
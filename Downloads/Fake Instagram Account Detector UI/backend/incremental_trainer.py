@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+"""
+Incremental retraining from moderator feedback
+
+Instead of rebuilding the whole forest, each round reads only the feedback
+rows appended since the previous round (see feedback_store.py). It fits a
+few new trees on those rows plus an equal-sized replay sample of older
+data, adds them to the current forest and retires the same number of the
+oldest trees, so the forest stays the same size. The scaler stays fixed
+because every existing tree's thresholds were learned in its space.
+
+Older data is replayed from a fixed-size reservoir sample of OldDataSet.csv
+and all earlier feedback, kept next to the state file
+(feedback_state.json.replay.npz). It is built from the full history once,
+then each published round adds its slice by reservoir sampling. No round
+re-reads the dataset or the older feedback, so a round's cost follows the
+new rows, not the size of the history.
+
+A candidate is published only when it passes validation:
+  - accuracy on the evenly spaced OldDataSet.csv sample used by the API is
+    at least --min-accuracy and no more than --tolerance below the current
+    model's
+  - accuracy on the held-out share of the new feedback is at least the
+    current model's
+Published artifacts replace classifier_model.pkl (and model_bundle.bin, if
+the deployment uses one) atomically. A compacted bundle from
+train_model.py --compact is rebuilt from the new forest with the same
+search, evaluated on the validation sample. The API then picks them up through
+MODEL_WATCH_INTERVAL, POST /api/reload-model or a prefork SIGHUP;
+--reload-url sends the POST. Rounds that fail validation leave the feedback
+pending, so it is retried with more data next time.
+
+Usage:
+    python incremental_trainer.py                    # one round
+    python incremental_trainer.py --watch 300 --min-rows 200 \
+        --reload-url http://127.0.0.1:5000/api/reload-model?wait=true
+"""
+
+import argparse
+import copy
+import json
+import os
+import pickle
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from feedback_store import FeedbackStore, LABEL_COLUMN
+from forest_compaction import COMPACT_BUNDLE_PATH, compact_forest
+from forest_compiler import compile_forest
+from model_bundle import write_bundle
+
+DEFAULT_STATE_PATH = 'feedback_state.json'
+HISTORY_LIMIT = 50
+RESERVOIR_SIZE = 5000
+
+
+def load_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'offset': 0, 'generation': 0, 'history': []}
+
+
+def save_state(path, state):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def dump_atomic(obj, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def validation_sample(df, feature_names, n_rows=200):
+    """The same evenly spaced rows backend_api.validation_sample checks"""
+    df = df.iloc[::max(1, len(df) // n_rows)]
+    return df[feature_names].fillna(0).to_numpy(dtype=np.float64), df[LABEL_COLUMN].to_numpy()
+
+
+class ReplayReservoir:
+    """
+    Uniform sample of every labelled row seen so far (Vitter's algorithm R),
+    saved with the fixed validation sample so rounds need neither CSV again
+    """
+
+    def __init__(self, X, y, seen, size, X_val, y_val):
+        self.X = X
+        self.y = y
+        self.seen = seen
+        self.size = size
+        self.X_val = X_val
+        self.y_val = y_val
+
+    @classmethod
+    def load(cls, path, size):
+        try:
+            with np.load(path) as data:
+                return cls(data['X'], data['y'], int(data['seen']), size, data['X_val'], data['y_val'])
+        except FileNotFoundError:
+            return None
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, X=self.X, y=self.y, seen=self.seen, X_val=self.X_val, y_val=self.y_val)
+        os.replace(tmp_path, path)
+
+    def add(self, X, y, rng):
+        """Fold new rows in; every row seen so far stays equally likely to be kept"""
+        X_kept, y_kept = list(self.X), list(self.y)
+        for row, label in zip(X, y):
+            if len(X_kept) < self.size:
+                X_kept.append(row)
+                y_kept.append(label)
+            else:
+                slot = rng.integers(0, self.seen + 1)
+                if slot < self.size:
+                    X_kept[slot] = row
+                    y_kept[slot] = label
+            self.seen += 1
+        width = X.shape[1] if len(X) else self.X.shape[1]
+        self.X = np.asarray(X_kept, dtype=np.float64).reshape(-1, width)
+        self.y = np.asarray(y_kept, dtype=np.int64)
+
+    def sample(self, n_rows, rng):
+        take = rng.choice(len(self.y), size=min(n_rows, len(self.y)), replace=False)
+        return self.X[take], self.y[take]
+
+
+def bootstrap_reservoir(store, offset, feature_names, data_path, size, rng):
+    """The first round's reservoir, from the base dataset and feedback before `offset`"""
+    base = pd.read_csv(data_path)
+    earlier, _ = store.read(0, offset)
+    X_val, y_val = validation_sample(base, feature_names)
+    reservoir = ReplayReservoir(
+        np.empty((0, len(feature_names))), np.empty(0, dtype=np.int64), 0, size, X_val, y_val
+    )
+    for frame in (base, earlier):
+        reservoir.add(
+            frame[feature_names].fillna(0).to_numpy(dtype=np.float64),
+            frame[LABEL_COLUMN].to_numpy(dtype=np.int64), rng
+        )
+    return reservoir
+
+
+def accuracy(clf, scaler, X, y):
+    if len(X) == 0:
+        return None
+    return float((clf.predict(scaler.transform(X)) == y).mean())
+
+
+def grow_forest(clf, X_scaled, y, n_trees, max_trees, seed):
+    """
+    Copy of clf with n_trees new trees fitted on (X_scaled, y) appended and the
+    oldest trees retired down to max_trees. Existing trees are shared, not refit.
+    """
+    params = clf.get_params()
+    params.update(n_estimators=n_trees, warm_start=False, random_state=seed, verbose=0)
+    new_trees = RandomForestClassifier(**params).fit(X_scaled, y).estimators_
+
+    grown = copy.copy(clf)
+    estimators = (list(clf.estimators_) + list(new_trees))[-max_trees:]
+    grown.estimators_ = estimators
+    grown.n_estimators = len(estimators)
+    return grown, len(clf.estimators_) + len(new_trees) - len(estimators)
+
+
+def reservoir_path(args):
+    return args.state + '.replay.npz'
+
+
+def run_round(args, state):
+    """Train, validate and maybe publish one candidate; returns a result dict for the state file"""
+    with open(os.path.join(args.model_dir, 'classifier_model.pkl'), 'rb') as f:
+        clf = pickle.load(f)
+    clf.verbose = 0
+    with open(os.path.join(args.model_dir, 'scaler_model.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(args.model_dir, 'feature_names.pkl'), 'rb') as f:
+        feature_names = pickle.load(f)
+
+    store = FeedbackStore(args.feedback, feature_names)
+    offset = state['offset']
+    new_rows, end = store.read(offset)
+    result = {'started': datetime.now().isoformat(timespec='seconds'), 'new_rows': len(new_rows)}
+    if len(new_rows) < args.min_rows:
+        result['outcome'] = 'waiting'
+        return result, offset
+
+    rng = np.random.default_rng(state['generation'] + 1)
+    X_new = new_rows[feature_names].fillna(0).to_numpy(dtype=np.float64)
+    y_new = new_rows[LABEL_COLUMN].to_numpy().astype(np.int64)
+
+    # Hold out part of the new feedback to check the candidate against the current model
+    order = rng.permutation(len(X_new))
+    n_holdout = int(len(X_new) * args.holdout)
+    holdout, train = order[:n_holdout], order[n_holdout:]
+
+    reservoir = ReplayReservoir.load(reservoir_path(args), args.reservoir_size)
+    if reservoir is None:
+        reservoir = bootstrap_reservoir(store, offset, feature_names, args.data, args.reservoir_size, rng)
+        reservoir.save(reservoir_path(args))
+    X_replay, y_replay = reservoir.sample(int(len(train) * args.replay_ratio), rng)
+    X_train = np.vstack([X_new[train], X_replay])
+    y_train = np.concatenate([y_new[train], y_replay])
+    if len(np.unique(y_train)) < 2:
+        # New trees must know both classes to vote alongside the old ones
+        result['outcome'] = 'rejected'
+        result['reasons'] = ['training rows contain only one label']
+        return result, offset
+
+    started = time.perf_counter()
+    max_trees = args.max_trees or len(clf.estimators_)
+    candidate, retired = grow_forest(
+        clf, scaler.transform(X_train), y_train, args.trees_per_round, max_trees,
+        seed=state['generation'] + 1
+    )
+    result['fit_s'] = round(time.perf_counter() - started, 3)
+    result['train_rows'] = len(X_train)
+    result['trees_added'] = args.trees_per_round
+    result['trees_retired'] = retired
+
+    X_hist, y_hist = reservoir.X_val, reservoir.y_val
+    scores = {
+        'current_history': accuracy(clf, scaler, X_hist, y_hist),
+        'candidate_history': accuracy(candidate, scaler, X_hist, y_hist),
+        'current_feedback': accuracy(clf, scaler, X_new[holdout], y_new[holdout]),
+        'candidate_feedback': accuracy(candidate, scaler, X_new[holdout], y_new[holdout]),
+    }
+    result['accuracy'] = {name: None if value is None else round(value, 4) for name, value in scores.items()}
+
+    failures = []
+    if scores['candidate_history'] < args.min_accuracy:
+        failures.append(f"history accuracy {scores['candidate_history']:.3f} < {args.min_accuracy:.3f}")
+    if scores['candidate_history'] < scores['current_history'] - args.tolerance:
+        failures.append(f"history accuracy dropped by more than {args.tolerance}")
+    if scores['candidate_feedback'] is not None and scores['candidate_feedback'] < scores['current_feedback']:
+        failures.append('less accurate than the current model on held-out feedback')
+    if failures:
+        result['outcome'] = 'rejected'
+        result['reasons'] = failures
+        return result, offset
+
+    dump_atomic(candidate, os.path.join(args.model_dir, 'classifier_model.pkl'))
+    forest = compile_forest(candidate, scaler)
+    bundle_path = os.path.join(args.model_dir, 'model_bundle.bin')
+    if os.path.exists(bundle_path):
+        result['bundle_version'] = write_bundle(bundle_path, forest, feature_names, scaler)
+    compact_path = os.path.join(args.model_dir, COMPACT_BUNDLE_PATH)
+    if os.path.exists(compact_path):
+        # Keep a compacted deployment compacted instead of letting it go stale
+        compact, _ = compact_forest(
+            forest, X_hist, y_hist, tolerance=args.compact_tolerance,
+            merge_tolerance=args.merge_tolerance, max_prob_error=args.max_prob_error
+        )
+        result['compact_version'] = write_bundle(compact_path, compact, feature_names, scaler)
+        result['compact_trees'] = compact.n_trees
+    # The reservoir only takes the slice once it is consumed; a rejected
+    # round retries the same rows and must not count them twice
+    reservoir.add(X_new, y_new, rng)
+    reservoir.save(reservoir_path(args))
+    result['outcome'] = 'published'
+    return result, end
+
+
+def notify(url):
+    try:
+        request = urllib.request.Request(url, data=b'', method='POST')
+        with urllib.request.urlopen(request, timeout=120) as response:
+            print(f"✓ Reload requested: HTTP {response.status}")
+    except Exception as e:
+        print(f"✗ Reload request to {url} failed: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Grow the forest from moderator feedback')
+    parser.add_argument('--feedback', default=os.environ.get('FEEDBACK_PATH', 'feedback.csv'))
+    parser.add_argument('--state', default=os.environ.get('FEEDBACK_STATE_PATH', DEFAULT_STATE_PATH))
+    parser.add_argument('--model-dir', default='.')
+    parser.add_argument('--data', default='OldDataSet.csv', help='Base dataset for replay and validation')
+    parser.add_argument('--min-rows', type=int, default=100,
+                        help='New feedback rows needed before a round trains')
+    parser.add_argument('--trees-per-round', type=int, default=10)
+    parser.add_argument('--max-trees', type=int, default=None,
+                        help='Forest size after retiring old trees (default: keep the current size)')
+    parser.add_argument('--replay-ratio', type=float, default=1.0,
+                        help='Replayed older rows per new training row')
+    parser.add_argument('--reservoir-size', type=int, default=RESERVOIR_SIZE,
+                        help='Rows kept in the replay sample of older data')
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help='Share of new feedback held out for validation')
+    parser.add_argument('--min-accuracy', type=float, default=float(os.environ.get('MODEL_MIN_ACCURACY', 0.8)))
+    parser.add_argument('--tolerance', type=float, default=0.02,
+                        help='Max accuracy drop on the base validation sample')
+    parser.add_argument('--compact-tolerance', type=float, default=0.01,
+                        help=f'Max precision/recall drop when recompacting {COMPACT_BUNDLE_PATH}')
+    parser.add_argument('--merge-tolerance', type=float, default=0.05,
+                        help='Leaf merge tolerance when recompacting')
+    parser.add_argument('--max-prob-error', type=float, default=0.05,
+                        help='Max mean probability difference when recompacting')
+    parser.add_argument('--watch', type=float, default=0,
+                        help='Run a round every N seconds instead of once')
+    parser.add_argument('--reload-url', default=None,
+                        help='POST here after publishing, e.g. .../api/reload-model?wait=true')
+    args = parser.parse_args(argv)
+
+    while True:
+        state = load_state(args.state)
+        result, offset = run_round(args, state)
+        if result['outcome'] == 'published':
+            state['generation'] += 1
+            state['offset'] = offset
+            result['generation'] = state['generation']
+            print(f"✓ Generation {state['generation']} published: {result['new_rows']} new rows, "
+                  f"+{result['trees_added']}/-{result['trees_retired']} trees in {result['fit_s']}s, "
+                  f"accuracy {result['accuracy']}")
+        elif result['outcome'] == 'rejected':
+            print(f"✗ Candidate rejected ({'; '.join(result['reasons'])}); feedback stays pending")
+        else:
+            print(f"Waiting for feedback: {result['new_rows']}/{args.min_rows} new rows")
+        if result['outcome'] != 'waiting':
+            state['history'] = (state.get('history', []) + [result])[-HISTORY_LIMIT:]
+            save_state(args.state, state)
+        if result['outcome'] == 'published' and args.reload_url:
+            notify(args.reload_url)
+        if args.watch <= 0:
+            return 0 if result['outcome'] != 'rejected' else 1
+        time.sleep(args.watch)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Low-overhead request instrumentation for the Instagram API
+
+Fixed-bucket histograms and counters kept in process memory and rendered
+in the Prometheus text exposition format. Stage timings are labelled with
+the endpoint of the request running on the current thread, so code deep in
+the scoring path can call stage('forest') without knowing who called it.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; roughly x2.5 steps from 50us to 10s
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (counts are stored per bucket, summed on export)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Named histograms and counters, each keyed by a tuple of label values"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._histograms = {}
+        self._counters = {}
+        self._help = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # -- recording ----------------------------------------------------------
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    # -- request context ----------------------------------------------------
+
+    @property
+    def endpoint(self):
+        return getattr(self._local, 'endpoint', None) or 'background'
+
+    @endpoint.setter
+    def endpoint(self, value):
+        self._local.endpoint = value
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block as one stage of the current request"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_latency_seconds', {'endpoint': self.endpoint, 'stage': name},
+                         time.perf_counter() - start)
+
+    def observe_batch_size(self, size, source=None):
+        self.observe('batch_size', {'endpoint': source or self.endpoint}, size, BATCH_SIZE_BUCKETS)
+
+    # -- export ---------------------------------------------------------------
+
+    @staticmethod
+    def _labels(pairs, extra=None):
+        items = list(pairs) + ([extra] if extra else [])
+        if not items:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            histograms = {k: (list(h.counts), h.sum, h.count, h.buckets) for k, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        for kind, items in (('counter', counters), ('histogram', histograms)):
+            for name in sorted({name for name, _ in items}):
+                full = f"{self.prefix}_{name}"
+                if name in self._help:
+                    lines.append(f"# HELP {full} {self._help[name]}")
+                lines.append(f"# TYPE {full} {kind}")
+                for (metric, labels), value in sorted(items.items()):
+                    if metric != name:
+                        continue
+                    if kind == 'counter':
+                        lines.append(f"{full}{self._labels(labels)} {value}")
+                        continue
+                    counts, total, count, buckets = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f"{full}_bucket{self._labels(labels, ('le', repr(float(bound))))} {cumulative}")
+                    lines.append(f"{full}_bucket{self._labels(labels, ('le', '+Inf'))} {count}")
+                    lines.append(f"{full}_sum{self._labels(labels)} {total}")
+                    lines.append(f"{full}_count{self._labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry('instagram_api')
+metrics.describe('stage_latency_seconds', 'Time spent in each stage of a request')
+metrics.describe('request_latency_seconds', 'End-to-end request handling time')
+metrics.describe('requests_total', 'Requests handled, by endpoint and HTTP status')
+metrics.describe('errors_total', 'Requests that failed with an exception')
+metrics.describe('batch_size', 'Accounts scored per call')
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Single-file, memory-mappable model bundle for the Instagram classifier
+
+Layout:
+    8 bytes   magic (b'IGMODEL1')
+    8 bytes   little-endian header length
+    N bytes   JSON header (version, feature names, scaler, array table)
+    ...       raw little-endian arrays, each aligned to 64 bytes
+
+load_bundle() maps the file read-only, so every worker process that loads
+the same bundle shares its pages through the OS page cache, and pages are
+only faulted in when the trees are first evaluated.
+
+Run directly to build model_bundle.bin from the existing pickles:
+    python model_bundle.py [output_path]
+"""
+
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from forest_compiler import CompiledForest, compile_forest
+
+MAGIC = b'IGMODEL1'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+FOREST_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+
+class ModelBundle:
+    """A loaded bundle: compiled forest plus the metadata needed to serve it"""
+
+    def __init__(self, forest, feature_names, scaler_mean, scaler_scale, version, path=None, size=0):
+        self.forest = forest
+        self.feature_names = feature_names
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+        self.version = version
+        self.path = path
+        self.size = size
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_bundle(path, forest, feature_names, scaler=None, version=None):
+    """Write a compiled forest and its metadata to one bundle file"""
+    version = version or datetime.now().strftime('%Y%m%d%H%M%S')
+    arrays = {name: np.ascontiguousarray(getattr(forest, name)) for name in FOREST_ARRAYS}
+    for name in ('feature', 'left', 'right', 'roots'):
+        arrays[name] = arrays[name].astype('<i8')
+    for name in ('threshold', 'value'):
+        arrays[name] = arrays[name].astype('<f8')
+
+    # Offsets depend on the header length, which depends on the offsets;
+    # iterate until the header size settles
+    table = {}
+    header_len = 0
+    while True:
+        offset = _align(16 + header_len)
+        for name, arr in arrays.items():
+            table[name] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+            offset = _align(offset + arr.nbytes)
+        header = json.dumps({
+            'format_version': FORMAT_VERSION,
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            'feature_names': list(feature_names),
+            'classes': np.asarray(forest.classes_).tolist(),
+            'depth': int(forest.depth),
+            'n_features': int(forest.n_features),
+            'scaler_mean': None if scaler is None else np.asarray(scaler.mean_).tolist(),
+            'scaler_scale': None if scaler is None else np.asarray(scaler.scale_).tolist(),
+            'arrays': table,
+        }).encode('utf-8')
+        if len(header) <= header_len:
+            header += b' ' * (header_len - len(header))
+            break
+        header_len = len(header)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, arr in arrays.items():
+            f.seek(table[name]['offset'])
+            f.write(arr.tobytes())
+    # Readers either see the old bundle or the complete new one
+    os.replace(tmp_path, path)
+    return version
+
+
+def read_header(path):
+    """Read only the JSON header of a bundle"""
+    with open(path, 'rb') as f:
+        if f.read(8) != MAGIC:
+            raise ValueError(f"{path} is not a model bundle")
+        (header_len,) = struct.unpack('<Q', f.read(8))
+        return json.loads(f.read(header_len))
+
+
+def load_bundle(path):
+    """Map a bundle read-only and wrap its arrays in a CompiledForest"""
+    header = read_header(path)
+    if header['format_version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format {header['format_version']}")
+
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'])) if spec['shape'] else 1
+        arrays[name] = np.frombuffer(
+            mapped, dtype=dtype, count=count, offset=spec['offset']
+        ).reshape(spec['shape'])
+
+    forest = CompiledForest(
+        feature=arrays['feature'],
+        threshold=arrays['threshold'],
+        left=arrays['left'],
+        right=arrays['right'],
+        value=arrays['value'],
+        roots=arrays['roots'],
+        depth=header['depth'],
+        classes=np.asarray(header['classes']),
+        n_features=header['n_features'],
+    )
+    return ModelBundle(
+        forest=forest,
+        feature_names=header['feature_names'],
+        scaler_mean=header['scaler_mean'],
+        scaler_scale=header['scaler_scale'],
+        version=header['version'],
+        path=path,
+        size=len(mapped),
+    )
+
+
+if __name__ == '__main__':
+    output = sys.argv[1] if len(sys.argv) > 1 else 'model_bundle.bin'
+    with open('classifier_model.pkl', 'rb') as f:
+        clf = pickle.load(f)
+    with open('scaler_model.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    with open('feature_names.pkl', 'rb') as f:
+        feature_names = pickle.load(f)
+    version = write_bundle(output, compile_forest(clf, scaler), feature_names, scaler)
+    print(f"✓ {output} written (version {version}, {os.path.getsize(output) / 1024:.1f} KB)")
@@ -0,0 +1,187 @@
+"""
+Latency-aware hyperparameter sweep for the Instagram classifier
+
+Every (max_depth, min_samples_leaf) pair is trained on its own worker
+process. Inside a worker one warm-started forest grows through the
+ascending tree counts, so the 200-tree candidate reuses the 100 trees that
+were already grown for the 100-tree candidate. Workers only fit and score
+accuracy. Latency is measured afterwards in the parent, one candidate at a
+time, so timings aren't skewed by other fits competing for the same cores.
+
+Latency is taken through ServingModel, the same code path the API uses:
+the compiled forest for single rows, sklearn for the 1k-row batch.
+"""
+
+import multiprocessing as mp
+import os
+import pickle
+import time
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, recall_score
+
+from forest_compiler import compile_forest
+from model_bundle import FOREST_ARRAYS
+from serving_model import ServingModel
+
+DEFAULT_GRID = {
+    'n_estimators': (25, 50, 100, 200),
+    'max_depth': (6, 10, 15, None),
+    'min_samples_leaf': (1, 2, 5),
+}
+
+# Fork workers inherit the training split instead of pickling it per task
+_data = None
+
+
+def _fit_group(task):
+    """Worker: grow one warm-started forest through every tree count"""
+    max_depth, min_samples_leaf, n_estimators_list, random_state = task
+    X_train, y_train, X_test, y_test = _data
+    clf = RandomForestClassifier(
+        max_depth=max_depth,
+        min_samples_split=5,
+        min_samples_leaf=min_samples_leaf,
+        random_state=random_state,
+        warm_start=True,
+        n_jobs=1,
+    )
+    results = []
+    fit_seconds = 0.0
+    for n_estimators in sorted(n_estimators_list):
+        start = time.perf_counter()
+        clf.set_params(n_estimators=n_estimators)
+        clf.fit(X_train, y_train)
+        # Cumulative, so it is what training this candidate from scratch would cost
+        fit_seconds += time.perf_counter() - start
+        y_pred = clf.predict(X_test)
+        results.append({
+            'n_estimators': n_estimators,
+            'max_depth': max_depth,
+            'min_samples_leaf': min_samples_leaf,
+            'accuracy': accuracy_score(y_test, y_pred),
+            'recall': recall_score(y_test, y_pred),
+            'fit_s': fit_seconds,
+            'model': pickle.dumps(clf),
+        })
+    return results
+
+
+def measure_latency(clf, scaler, X_raw, single_rows=200, batch_rows=1000, repeats=5):
+    """
+    Serving cost of one candidate: single-row p50/p99 (ms), median 1k-row
+    batch latency (ms) and the sizes of the pickle and the compiled bundle
+    """
+    model = ServingModel(
+        version='sweep', source='sweep', feature_names=list(range(X_raw.shape[1])),
+        forest=compile_forest(clf, scaler), clf=clf, scaler=scaler,
+    )
+    rows = [X_raw[i:i + 1] for i in range(min(single_rows, len(X_raw)))]
+    batch = np.resize(X_raw, (batch_rows, X_raw.shape[1]))
+    model.warm_up(batch[:64])
+
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    batch_timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        batch_timings.append(time.perf_counter() - start)
+
+    p50, p99 = np.percentile(timings, [50, 99]) * 1000
+    return {
+        'single_p50_ms': p50,
+        'single_p99_ms': p99,
+        'batch_1k_ms': float(np.median(batch_timings)) * 1000,
+        'bundle_kb': sum(getattr(model.forest, name).nbytes for name in FOREST_ARRAYS) / 1024,
+        'nodes': model.forest.node_count,
+    }
+
+
+def pareto_front(table, maximize=('accuracy', 'recall'), minimize=('single_p99_ms', 'batch_1k_ms')):
+    """Mask of rows no other row beats on every objective"""
+    scores = np.column_stack(
+        [table[c].to_numpy() for c in maximize] + [-table[c].to_numpy() for c in minimize]
+    )
+    front = np.ones(len(table), dtype=bool)
+    for i, row in enumerate(scores):
+        dominated = (scores >= row).all(axis=1) & (scores > row).any(axis=1)
+        front[i] = not dominated.any()
+    return front
+
+
+def run_sweep(X_train, y_train, X_test, y_test, scaler, X_test_raw, grid=None,
+              workers=None, random_state=42):
+    """
+    Train every grid point and measure its serving cost.
+    Returns (table sorted by accuracy, {row index: fitted classifier})
+    """
+    global _data
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    workers = workers or os.cpu_count() or 1
+    tasks = [
+        (depth, leaf, grid['n_estimators'], random_state)
+        for depth, leaf in product(grid['max_depth'], grid['min_samples_leaf'])
+    ]
+    print(f"Sweeping {len(tasks) * len(grid['n_estimators'])} candidates on {workers} workers...")
+
+    _data = (X_train, y_train, X_test, y_test)
+    ctx = mp.get_context('fork')
+    with ctx.Pool(min(workers, len(tasks))) as pool:
+        groups = pool.map(_fit_group, tasks)
+    _data = None
+
+    records = []
+    models = {}
+    for result in (r for group in groups for r in group):
+        blob = result.pop('model')
+        clf = pickle.loads(blob)
+        result.update(measure_latency(clf, scaler, X_test_raw))
+        result['pickle_kb'] = len(blob) / 1024
+        models[len(records)] = clf
+        records.append(result)
+
+    table = pd.DataFrame(records)
+    # Keep unlimited depth as None rather than letting pandas turn the column into floats
+    table['max_depth'] = pd.Series([r['max_depth'] for r in records], dtype=object)
+    table['pareto'] = pareto_front(table)
+    table = table.sort_values(['accuracy', 'recall', 'single_p99_ms'],
+                              ascending=[False, False, True])
+    return table, models
+
+
+def select_candidate(table, latency_budget_ms=None, batch_budget_ms=None):
+    """Index of the most accurate candidate that fits the latency budgets"""
+    fits = pd.Series(True, index=table.index)
+    if latency_budget_ms is not None:
+        fits &= table['single_p99_ms'] <= latency_budget_ms
+    if batch_budget_ms is not None:
+        fits &= table['batch_1k_ms'] <= batch_budget_ms
+    if not fits.any():
+        return None
+    # The table is already sorted by accuracy, recall, then p99
+    return table.index[fits.to_numpy()][0]
+
+
+def format_table(table):
+    columns = ['n_estimators', 'max_depth', 'min_samples_leaf', 'accuracy', 'recall',
+               'single_p50_ms', 'single_p99_ms', 'batch_1k_ms', 'bundle_kb', 'pickle_kb', 'fit_s']
+    return table[columns].to_string(
+        index=False,
+        formatters={
+            'accuracy': '{:.4f}'.format,
+            'recall': '{:.4f}'.format,
+            'single_p50_ms': '{:.3f}'.format,
+            'single_p99_ms': '{:.3f}'.format,
+            'batch_1k_ms': '{:.2f}'.format,
+            'bundle_kb': '{:.0f}'.format,
+            'pickle_kb': '{:.0f}'.format,
+            'fit_s': '{:.2f}'.format,
+        },
+    )
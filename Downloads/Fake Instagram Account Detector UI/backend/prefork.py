@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+"""
+Prefork production launcher
+
+Imports the WSGI app (and with it the model) once in a master process,
+binds the listening socket, then forks N waitress workers that share the
+model's memory pages copy-on-write and accept from the same socket. The
+master supervises the workers:
+  - a worker that dies is replaced (with backoff if it keeps crashing)
+  - SIGHUP does a rolling restart: each worker is replaced by a fresh fork
+    that is already serving before the old one is told to drain
+  - SIGTERM / SIGINT drain every worker and exit
+Draining workers stop accepting, finish the requests they have and exit,
+or are killed after --graceful-timeout seconds.
+
+Every worker is its own process, so anything an app keeps in memory
+(metrics, caches, rate limits, a model it hot-reloads) is per worker. A
+reload has to go through the master to reach all of them: with
+--on-reload, the master runs the hook and, if it doesn't return False,
+rolls every worker onto the result. Workers find the master through
+PREFORK_MASTER_PID, and an app's reload endpoint can call
+request_rolling_reload() to fan its reload out the same way.
+
+This is the only copy. The Energy dashboard backend runs it from its own
+directory, and import_object() puts the current directory first on
+sys.path, so the app and its modules come from there.
+
+Usage:
+    python prefork.py backend_api:app --workers 4
+    # from the Energy dashboard's backend directory
+    python "../../Fake Instagram Account Detector UI/backend/prefork.py" app:app \
+        --workers 4 --on-reload app:load_model
+"""
+
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+
+READY = b'r'
+# Set for the workers when the master has a reload hook to fan out
+MASTER_PID_ENV = 'PREFORK_MASTER_PID'
+
+
+def import_object(spec):
+    """Resolve 'module:attribute' relative to the current directory"""
+    module_name, _, attribute = spec.partition(':')
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute or 'app')
+
+
+def request_rolling_reload():
+    """
+    From a worker: SIGHUP the master so it reloads and replaces every
+    worker. False if this process isn't a worker of a master with a
+    reload hook.
+    """
+    master = os.environ.get(MASTER_PID_ENV)
+    if not master or os.getppid() != int(master):
+        return False
+    os.kill(int(master), signal.SIGHUP)
+    return True
+
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, threads, graceful_timeout, ready_fd):
+    """Child process: serve until SIGTERM, then drain and exit"""
+    from waitress.server import create_server
+
+    server = create_server(app, sockets=[sock], threads=threads)
+    # Every dispatcher (listener and client channels) lives in the server's socket map
+    socket_map = getattr(server, 'map', None) or server._map
+
+    def drain():
+        # Stop polling the shared socket so the other workers take new
+        # connections, then wait for our in-flight requests to finish
+        for dispatcher in list(socket_map.values()):
+            if getattr(dispatcher, 'accepting', False):
+                dispatcher.accepting = False
+        deadline = time.monotonic() + graceful_timeout
+        while time.monotonic() < deadline:
+            busy = server.task_dispatcher.active_count or server.task_dispatcher.queue
+            open_requests = any(
+                getattr(channel, 'requests', None) for channel in list(socket_map.values())
+            )
+            if not busy and not open_requests:
+                break
+            time.sleep(0.05)
+        os._exit(0)
+
+    def on_term(signum, frame):
+        threading.Thread(target=drain, name='drain', daemon=True).start()
+
+    signal.signal(signal.SIGTERM, on_term)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    try:
+        os.write(ready_fd, READY)
+    except BrokenPipeError:
+        pass  # the master wasn't waiting for this one
+    os.close(ready_fd)
+    server.run()
+    os._exit(0)
+
+
+class Master:
+    """Forks, supervises and rolls the worker processes"""
+
+    def __init__(self, app, sock, workers, threads, graceful_timeout, on_reload=None):
+        self.app = app
+        self.sock = sock
+        self.n_workers = workers
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+        self.on_reload = on_reload
+        self.workers = {}  # pid -> start time
+        self.crashes = 0
+        self.rolling = False
+        self.stopping = False
+
+    def spawn(self, wait_ready=False, timeout=30.0):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                run_worker(self.app, self.sock, self.threads, self.graceful_timeout, write_fd)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(1)
+        os.close(write_fd)
+        self.workers[pid] = time.monotonic()
+        ready = True
+        if wait_ready:
+            deadline = time.monotonic() + timeout
+            ready = False
+            while not ready and time.monotonic() < deadline:
+                try:
+                    ready = os.read(read_fd, 1) == READY
+                except InterruptedError:
+                    continue
+                if not ready:
+                    break  # EOF: the child died before it was ready
+        os.close(read_fd)
+        return pid, ready
+
+    def stop_worker(self, pid):
+        """SIGTERM one worker and wait for it to drain (SIGKILL if it overruns)"""
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+            return
+        deadline = time.monotonic() + self.graceful_timeout + 1
+        while time.monotonic() < deadline:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            time.sleep(0.05)
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.pop(pid, None)
+
+    def rolling_restart(self):
+        if self.on_reload is not None:
+            print("Reloading in master before restarting workers...")
+            if self.on_reload() is False:
+                print("✗ Reload failed; keeping the current workers")
+                return
+            gc.collect()
+            gc.freeze()
+        for old_pid in list(self.workers):
+            if self.stopping:
+                return
+            new_pid, ready = self.spawn(wait_ready=True)
+            if not ready:
+                print(f"✗ Replacement worker {new_pid} failed to start; keeping worker {old_pid}")
+                continue
+            self.stop_worker(old_pid)
+            print(f"✓ Worker {old_pid} replaced by {new_pid}")
+
+    def reap(self):
+        """Collect dead workers and fork replacements"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            print(f"✗ Worker {pid} exited with {code}; restarting")
+            # Back off if workers die right after starting (e.g. a bad model)
+            self.crashes = self.crashes + 1 if time.monotonic() - started < 5 else 0
+            if self.crashes:
+                time.sleep(min(2 ** self.crashes, 30))
+            self.spawn()
+
+    def run(self):
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, 'rolling', True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, 'stopping', True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, 'stopping', True))
+        if self.on_reload is not None:
+            os.environ[MASTER_PID_ENV] = str(os.getpid())
+
+        for _ in range(self.n_workers):
+            self.spawn()
+        print(f"✓ {self.n_workers} workers started (master pid {os.getpid()})")
+
+        while not self.stopping:
+            if self.rolling:
+                self.rolling = False
+                self.rolling_restart()
+            self.reap()
+            time.sleep(0.2)
+
+        print("Stopping workers...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout + 1
+        while self.workers and time.monotonic() < deadline:
+            for pid in list(self.workers):
+                if os.waitpid(pid, os.WNOHANG)[0]:
+                    self.workers.pop(pid)
+            time.sleep(0.05)
+        for pid in self.workers:
+            os.kill(pid, signal.SIGKILL)
+        print("✓ All workers stopped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prefork WSGI launcher')
+    parser.add_argument('app', help="WSGI app as 'module:attribute'")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WAITRESS_THREADS', 4)),
+                        help='Request threads per worker')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--graceful-timeout', type=float, default=30.0,
+                        help='Seconds a draining worker may take to finish its requests')
+    parser.add_argument('--on-reload', default=None,
+                        help="'module:function' to call in the master before a SIGHUP rolling restart")
+    args = parser.parse_args(argv)
+
+    # Import (and load the model) once; every fork inherits it
+    app = import_object(args.app)
+    on_reload = import_object(args.on_reload) if args.on_reload else None
+    sock = bind_socket(args.host, args.port)
+
+    # Move everything loaded so far out of the collector's reach, so GC
+    # passes in the workers don't write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    print(f"Starting prefork server on {args.host}:{args.port} "
+          f"({args.workers} workers x {args.threads} threads)...")
+    print("=" * 60)
+    Master(app, sock, args.workers, args.threads, args.graceful_timeout, on_reload).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+In-process result cache for account scoring
+
+Keyed by the canonicalized (float64, ordered) feature vector, so any two
+requests that coerce to the same features share one forest evaluation.
+Entries are evicted least-recently-used once the cache is full and expire
+after a TTL. Every call carries a model key, the serving model's version
+string. When a reload changes it, the cache empties itself, and scores
+computed under the old version are not stored.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ResultCache:
+    """Bounded LRU + TTL cache of probability rows"""
+
+    def __init__(self, max_size=10000, ttl_seconds=3600.0):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_key = None
+
+    @staticmethod
+    def keys_for(X):
+        """One hashable key per row; adding 0.0 folds -0.0 into 0.0"""
+        X = np.ascontiguousarray(np.atleast_2d(X), dtype=np.float64) + 0.0
+        return [row.tobytes() for row in X]
+
+    def _check_model(self, model_key):
+        """Drop all entries if they were computed by a different model (lock held)"""
+        if model_key != self._model_key:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self._model_key = model_key
+
+    def lookup(self, X, model_key=None):
+        """Return (probabilities, miss_mask); rows that missed are left as NaN"""
+        keys = self.keys_for(X)
+        probabilities = None
+        misses = np.ones(len(keys), dtype=bool)
+        now = time.monotonic()
+        with self._lock:
+            self._check_model(model_key)
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, probs = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                if probabilities is None:
+                    probabilities = np.full((len(keys), len(probs)), np.nan)
+                probabilities[i] = probs
+                misses[i] = False
+            self.hits += int(len(keys) - misses.sum())
+            self.misses += int(misses.sum())
+        return probabilities, misses
+
+    def store(self, X, probabilities, model_key=None):
+        keys = self.keys_for(X)
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if model_key != self._model_key:
+                # Scored by a model that has since been replaced; don't keep it
+                return
+            for key, probs in zip(keys, np.atleast_2d(probabilities)):
+                self._entries[key] = (expires_at, np.array(probs, dtype=np.float64))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,182 @@
+"""
+Versioned serving model for the Instagram API
+
+A ServingModel is an immutable snapshot of everything needed to score one
+model version (compiled forest, optional sklearn pair, feature names). The
+API holds a single reference to the active snapshot; requests grab it once
+and keep using it, so swapping in a new version never disturbs requests
+that are already running.
+"""
+
+import os
+import pickle
+import time
+from datetime import datetime
+
+import numpy as np
+
+from forest_compiler import compile_forest
+from metrics import metrics
+from model_bundle import load_bundle
+
+
+class ModelValidationError(Exception):
+    """Raised when freshly loaded artifacts fail validation"""
+
+
+class ServingModel:
+    """One loaded model version plus its serving-time scoring logic"""
+
+    def __init__(self, version, source, feature_names, forest=None, clf=None, scaler=None,
+                 load_ms=0.0, bundle_bytes=0, chunk_size=4096, compiled_max_rows=256):
+        self.version = version
+        self.source = source
+        self.feature_names = feature_names
+        self.forest = forest
+        self.clf = clf
+        self.scaler = scaler
+        self.load_ms = load_ms
+        self.bundle_bytes = bundle_bytes
+        self.chunk_size = chunk_size
+        self.compiled_max_rows = compiled_max_rows
+        self.loaded_at = datetime.now().isoformat()
+        self.classes_ = forest.classes_ if forest is not None else getattr(clf, 'classes_', None)
+
+    def predict_proba(self, X):
+        """Score a raw feature matrix with one predict_proba call per chunk"""
+        probabilities = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], self.chunk_size):
+            stop = start + self.chunk_size
+            small = min(stop, X.shape[0]) - start <= self.compiled_max_rows
+            # The compiled forest wins on latency for small inputs; sklearn's C
+            # traversal is faster past a few hundred rows. Bundle-only
+            # deployments have no sklearn model, so everything is compiled.
+            if self.forest is not None and (small or self.clf is None):
+                # Scaling is folded into the compiled thresholds
+                with metrics.stage('forest'):
+                    probabilities[start:stop] = self.forest.predict_proba(X[start:stop])
+            else:
+                with metrics.stage('scale'):
+                    X_scaled = self.scaler.transform(X[start:stop])
+                with metrics.stage('forest'):
+                    probabilities[start:stop] = self.clf.predict_proba(X_scaled)
+        return probabilities
+
+    def explain(self, X):
+        """
+        (probabilities, contributions) for a raw feature matrix, chunked like
+        predict_proba. contributions are per-feature shares of the fake
+        probability relative to base_value(); needs the compiled forest
+        """
+        if self.forest is None:
+            raise ModelValidationError('Explanations need the compiled forest')
+        probabilities = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        contributions = np.empty((X.shape[0], len(self.feature_names)), dtype=np.float64)
+        for start in range(0, X.shape[0], self.chunk_size):
+            stop = start + self.chunk_size
+            with metrics.stage('explain'):
+                probabilities[start:stop], contributions[start:stop] = self.forest.explain(X[start:stop])
+        return probabilities, contributions
+
+    def base_value(self):
+        return self.forest.base_value() if self.forest is not None else None
+
+    def validate(self, X_check=None, y_check=None, min_accuracy=0.0):
+        """Sanity-check the model before it is allowed to serve traffic"""
+        if not self.feature_names:
+            raise ModelValidationError('No feature names')
+        if self.classes_ is None or len(self.classes_) != 2:
+            raise ModelValidationError(f"Expected a binary classifier, got classes {self.classes_}")
+        n_features = self.forest.n_features if self.forest is not None else self.clf.n_features_in_
+        if n_features != len(self.feature_names):
+            raise ModelValidationError(
+                f"Model expects {n_features} features but {len(self.feature_names)} names were loaded"
+            )
+
+        probe = X_check if X_check is not None else np.zeros((1, len(self.feature_names)))
+        probabilities = self.predict_proba(probe)
+        if not np.isfinite(probabilities).all() or not np.allclose(probabilities.sum(axis=1), 1.0):
+            raise ModelValidationError('Model produced invalid probabilities')
+
+        if y_check is not None and min_accuracy > 0:
+            predictions = self.classes_.take(np.argmax(probabilities, axis=1))
+            accuracy = float((predictions == y_check).mean())
+            if accuracy < min_accuracy:
+                raise ModelValidationError(
+                    f"Validation accuracy {accuracy:.3f} is below the {min_accuracy:.3f} minimum"
+                )
+
+    def warm_up(self, X=None, rounds=3):
+        """Run a few predictions so the first real request doesn't pay for page faults"""
+        X = X if X is not None else np.zeros((1, len(self.feature_names)))
+        if self.forest is not None:
+            # Precompute the per-node gains explain() uses
+            self.forest.path_gains()
+        for _ in range(rounds):
+            self.predict_proba(X[:1])
+            self.predict_proba(X)
+
+    def info(self):
+        return {
+            'version': self.version,
+            'source': self.source,
+            'load_ms': round(self.load_ms, 2),
+            'bundle_bytes': self.bundle_bytes,
+            'loaded_at': self.loaded_at
+        }
+
+
+def load_serving_model(bundle_path='model_bundle.bin', model_dir='.', **options):
+    """
+    Load the bundle if present, otherwise the three pickles.
+    Raises on failure so callers can keep serving the previous version.
+    """
+    started = time.perf_counter()
+    if os.path.exists(bundle_path):
+        try:
+            bundle = load_bundle(bundle_path)
+            print(f"✓ Model bundle mapped: {bundle_path} (version {bundle.version})")
+            return ServingModel(
+                version=bundle.version,
+                source='bundle',
+                feature_names=bundle.feature_names,
+                forest=bundle.forest,
+                load_ms=(time.perf_counter() - started) * 1000,
+                bundle_bytes=bundle.size,
+                **options
+            )
+        except Exception as e:
+            print(f"✗ Error loading model bundle, falling back to pickles: {e}")
+
+    classifier_path = os.path.join(model_dir, 'classifier_model.pkl')
+    with open(classifier_path, 'rb') as f:
+        clf = pickle.load(f)
+    print("✓ Classifier model loaded")
+    with open(os.path.join(model_dir, 'scaler_model.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    print("✓ Scaler model loaded")
+    with open(os.path.join(model_dir, 'feature_names.pkl'), 'rb') as f:
+        feature_names = pickle.load(f)
+    print(f"✓ Feature names loaded: {len(feature_names)} features")
+
+    # Compile the forest (with the scaler folded in) for fast serving-time evaluation
+    try:
+        forest = compile_forest(clf, scaler)
+        print(f"✓ Forest compiled: {forest.n_trees} trees, {forest.node_count} nodes")
+    except Exception as e:
+        print(f"✗ Error compiling forest, falling back to sklearn: {e}")
+        forest = None
+
+    version = 'pickle-' + datetime.fromtimestamp(
+        os.path.getmtime(classifier_path)
+    ).strftime('%Y%m%d%H%M%S')
+    return ServingModel(
+        version=version,
+        source='pickle',
+        feature_names=feature_names,
+        forest=forest,
+        clf=clf,
+        scaler=scaler,
+        load_ms=(time.perf_counter() - started) * 1000,
+        **options
+    )
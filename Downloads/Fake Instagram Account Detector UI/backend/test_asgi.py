@@ -0,0 +1,140 @@
+"""
+Behaviour check for the ASGI front end's load shedding
+Drives BackpressureApp directly with a slow stub WSGI app: a full queue
+must be refused with 429, a request that outlives its deadline in the
+queue must get 503 without ever running, and every slot must be released
+"""
+
+import asyncio
+import threading
+import time
+from asgi import BackpressureApp
+
+
+class SlowApp:
+    """WSGI stub that echoes the body length once `gate` is set (or after `delay` seconds)"""
+
+    def __init__(self, delay=None):
+        self.gate = threading.Event()
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, environ, start_response):
+        self.calls += 1
+        body = environ['wsgi.input'].read()
+        if self.delay is None:
+            self.gate.wait()
+        else:
+            time.sleep(float(environ.get('HTTP_X_SLEEP_MS', self.delay * 1000)) / 1000)
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [str(len(body)).encode()]
+
+
+async def request(app, path='/api/analyze', headers=(), body=b'{}'):
+    """One HTTP request through the ASGI callable; returns (status, headers, body)"""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    never = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await never.wait()
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'headers': list(headers)}
+    await app(scope, receive, send)
+    start = sent[0]
+    return (start['status'], dict(start['headers']),
+            b''.join(message.get('body', b'') for message in sent[1:]))
+
+
+async def drained(app, timeout=5.0):
+    """Wait for every worker to hand its slot back"""
+    until = time.monotonic() + timeout
+    while app.pending and time.monotonic() < until:
+        await asyncio.sleep(0.01)
+    return app.pending == 0
+
+
+def test_queue_full():
+    """With workers + queue_depth requests in flight the next one is refused at once"""
+    stub = SlowApp()
+    app = BackpressureApp(stub, workers=2, queue_depth=1, deadline_ms=5000)
+
+    async def scenario():
+        in_flight = [asyncio.create_task(request(app, body=b'x' * 10)) for _ in range(3)]
+        while app.pending < 3:
+            await asyncio.sleep(0.01)
+        started = time.monotonic()
+        status, headers, body = await request(app)
+        assert status == 429 and b'capacity' in body
+        assert int(headers[b'retry-after']) >= 1
+        assert time.monotonic() - started < 0.5
+        stub.gate.set()
+        results = await asyncio.gather(*in_flight)
+        assert [status for status, _, _ in results] == [200, 200, 200]
+        assert [body for _, _, body in results] == [b'10'] * 3
+        assert await drained(app)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        app.executor.shutdown(wait=True)
+
+
+def test_expired_in_queue():
+    """A request whose deadline passes while queued gets 503 and never runs"""
+    stub = SlowApp()
+    app = BackpressureApp(stub, workers=1, queue_depth=4, deadline_ms=200)
+
+    async def scenario():
+        started = time.monotonic()
+        busy = asyncio.create_task(request(app))
+        while stub.calls < 1:
+            await asyncio.sleep(0.01)
+        status, headers, body = await request(app)
+        assert status == 503 and b'deadline' in body and b'retry-after' in headers
+        assert time.monotonic() - started < 1.0
+        # The first request also timed out while scoring, before its first byte
+        assert (await busy)[0] == 503
+
+        stub.gate.set()
+        assert await drained(app)
+        assert stub.calls == 1, 'an expired request was run'
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        app.executor.shutdown(wait=True)
+
+
+def test_deadline_header():
+    """X-Deadline-Ms shortens the deadline but can't extend it"""
+    stub = SlowApp(delay=0.3)
+    app = BackpressureApp(stub, workers=2, queue_depth=2, deadline_ms=600)
+
+    async def scenario():
+        assert (await request(app))[0] == 200
+        assert (await request(app, headers=[(b'x-deadline-ms', b'100')]))[0] == 503
+        assert (await request(app, headers=[(b'x-deadline-ms', b'soon')]))[0] == 200
+        slow = [(b'x-deadline-ms', b'60000'), (b'x-sleep-ms', b'1000')]
+        assert (await request(app, headers=slow))[0] == 503
+        assert await drained(app)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        app.executor.shutdown(wait=True)
+
+
+if __name__ == '__main__':
+    test_queue_full()
+    print("✓ Queue check passed: a full queue is refused with 429 and Retry-After")
+    test_expired_in_queue()
+    print("✓ Deadline check passed: requests that expire in the queue get 503 and never run")
+    test_deadline_header()
+    print("✓ Header check passed: X-Deadline-Ms only ever lowers the deadline")
@@ -0,0 +1,108 @@
+"""
+Behaviour check for the audit log
+Buffered verdicts reach SQLite row by row, overflow drops the oldest
+batches, the query CLI filters them, and the API only creates the database
+once it scores something
+"""
+
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import numpy as np
+from audit_log import AuditLog, main as audit_main
+
+
+def test_flush_writes_every_row():
+    """Each buffered batch becomes one row per verdict with its features and metadata"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'audit.db')
+        log = AuditLog(path, flush_interval=60)
+        log.record('batch_analyze', 'v1', np.array([[1.0, 2.0], [3.0, 4.0]]), [91.5, 12.0], [True, False], 0.004, 'req-1')
+        log.record('analyze', 'v2', np.array([[5.0, 6.0]]), [55.0], [True], 0.001, 'req-2')
+        assert log.stats()['buffered_rows'] == 3
+        assert log.flush() == 3 and log.flush() == 0
+
+        db = sqlite3.connect(path)
+        rows = db.execute(
+            'SELECT request_id, endpoint, row_index, model_version, features, fake_probability, is_fake, latency_ms '
+            'FROM verdicts ORDER BY id'
+        ).fetchall()
+        db.close()
+        assert [row[:4] for row in rows] == [
+            ('req-1', 'batch_analyze', 0, 'v1'), ('req-1', 'batch_analyze', 1, 'v1'), ('req-2', 'analyze', 0, 'v2')
+        ]
+        assert [json.loads(row[4]) for row in rows] == [[1, 2], [3, 4], [5, 6]]
+        assert [row[5:7] for row in rows] == [(91.5, 1), (12.0, 0), (55.0, 1)]
+        assert abs(rows[0][7] - 4.0) < 1e-9
+        assert log.stats()['written'] == 3 and log.stats()['dropped'] == 0
+
+
+def test_overflow_drops_oldest():
+    """Past max_rows the oldest batches are dropped and counted, never the newest"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = AuditLog(os.path.join(tmp, 'audit.db'), max_rows=5, flush_interval=60, flush_rows=1000)
+        for i in range(4):
+            log.record('batch_analyze', 'v1', np.full((2, 1), float(i)), [0.0, 0.0], [False, False], 0.0)
+        assert log.stats()['dropped'] == 4 and log.stats()['buffered_rows'] == 4
+        log.flush()
+        db = sqlite3.connect(log.path)
+        kept = sorted({json.loads(row[0])[0] for row in db.execute('SELECT features FROM verdicts')})
+        db.close()
+        assert kept == [2.0, 3.0]
+
+
+def test_query_cli():
+    """The query command filters by verdict and request id"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'audit.db')
+        log = AuditLog(path, flush_interval=60)
+        log.record('batch_analyze', 'v1', np.zeros((3, 1)), [90.0, 10.0, 75.0], [True, False, True], 0.0, 'req-a')
+        log.record('analyze', 'v1', np.zeros((1, 1)), [20.0], [False], 0.0, 'req-b')
+        log.flush()
+
+        def run(*argv):
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                assert audit_main(['--db', path, 'query', '--format', 'json', *argv]) == 0
+            return [json.loads(line) for line in out.getvalue().splitlines()]
+
+        assert sorted(row['fake_probability'] for row in run('--fake')) == [75.0, 90.0]
+        assert [row['request_id'] for row in run('--request-id', 'req-b')] == ['req-b']
+        assert len(run('--min-probability', '50', '--endpoint', 'batch_analyze')) == 2
+        assert audit_main(['--db', os.path.join(tmp, 'missing.db'), 'stats']) == 1
+
+
+def test_api_creates_log_lazily():
+    """Importing the API creates no database; the first scored request does"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'audit.db')
+        os.environ['AUDIT_LOG_PATH'] = path
+        try:
+            import backend_api
+        finally:
+            del os.environ['AUDIT_LOG_PATH']
+        assert backend_api.AUDIT_LOG_PATH == path, 'backend_api was imported before this check'
+        assert not os.path.exists(path)
+
+        client = backend_api.app.test_client()
+        account = {name: 1 for name in backend_api.model.feature_names}
+        response = client.post('/api/analyze', json=account)
+        assert response.status_code == 200 and os.path.exists(path)
+        backend_api.audit_log().flush()
+        db = sqlite3.connect(path)
+        (request_id,), = db.execute('SELECT request_id FROM verdicts').fetchall()
+        db.close()
+        assert request_id == response.headers['X-Request-Id']
+
+
+if __name__ == '__main__':
+    test_flush_writes_every_row()
+    test_overflow_drops_oldest()
+    print("✓ Writer check passed: every verdict is written, overflow drops the oldest")
+    test_query_cli()
+    print("✓ Query check passed: the CLI filters verdicts")
+    test_api_creates_log_lazily()
+    print("✓ API check passed: audit.db appears with the first scored request, not on import")
@@ -0,0 +1,58 @@
+"""
+Parity check for vectorized batch scoring
+Every account scored through /api/batch-analyze must get exactly what
+/api/analyze returns for it alone, whatever the chunk size
+"""
+
+import pandas as pd
+import backend_api
+
+COMPARED = ('is_fake', 'status', 'confidence', 'fake_probability', 'risk_level')
+
+
+def sample_accounts():
+    """Dataset rows plus rows with missing, numeric-string and garbage values"""
+    accounts = pd.read_csv('OldDataSet.csv').drop(columns=['Fake']).sample(60, random_state=0).to_dict('records')
+    accounts[1] = {name: value for name, value in accounts[1].items() if name != '#Followers'}
+    accounts[2] = dict(accounts[2], **{'#Posts': '12', 'Bio Length': 'abc', 'Private': None})
+    accounts[3] = {}
+    return accounts
+
+
+def test_batch_matches_single():
+    """Batch results, in request order, equal the single-account results"""
+    client = backend_api.app.test_client()
+    accounts = sample_accounts()
+    response = client.post('/api/batch-analyze', json=accounts)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == len(accounts) == len(body['results'])
+    for account, result in zip(accounts, body['results']):
+        # /api/analyze rejects an empty body; an account without features scores as all zeros
+        single = client.post('/api/analyze', json=account or {'#Posts': 0}).get_json()
+        assert {key: result[key] for key in COMPARED} == {key: single[key] for key in COMPARED}, (account, result, single)
+
+
+def test_chunking_and_edges():
+    """Chunk boundaries don't change results; empty lists and non-lists are handled"""
+    client = backend_api.app.test_client()
+    accounts = sample_accounts()
+    whole = client.post('/api/batch-analyze', json=accounts).get_json()['results']
+    chunk_size = backend_api.BATCH_CHUNK_SIZE
+    backend_api.BATCH_CHUNK_SIZE = 7
+    try:
+        chunked = client.post('/api/batch-analyze', json=accounts).get_json()['results']
+    finally:
+        backend_api.BATCH_CHUNK_SIZE = chunk_size
+    assert [r['fake_probability'] for r in chunked] == [r['fake_probability'] for r in whole]
+
+    empty = client.post('/api/batch-analyze', json=[])
+    assert empty.status_code == 200 and empty.get_json()['results'] == []
+    assert client.post('/api/batch-analyze', json='not a list').status_code == 400
+
+
+if __name__ == '__main__':
+    test_batch_matches_single()
+    print("✓ Parity check passed: batch results match single-account results")
+    test_chunking_and_edges()
+    print("✓ Chunk check passed: chunk size doesn't change results")
@@ -0,0 +1,122 @@
+"""
+Behaviour check for the binary and columnar batch formats
+.npy, Arrow and column-oriented JSON must all give the same feature matrix,
+and malformed payloads must fail as PayloadError (HTTP 400), never as a
+crash inside the conversion
+"""
+
+import io
+import numpy as np
+from batch_formats import (
+    PayloadError, RESULT_DTYPE, input_format, read_arrow, read_columns, read_npy, result_columns,
+    write_npy
+)
+
+FEATURE_NAMES = ['#Posts', '#Followers', '#Following']
+X = np.array([[1.0, 200.0, 30.0], [4.0, np.nan, 60.0], [7.0, 800.0, np.inf]])
+EXPECTED = np.array([[1.0, 200.0, 30.0], [4.0, 0.0, 60.0], [7.0, 800.0, 0.0]])
+
+
+def npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def rejected(read, body):
+    try:
+        read(body, FEATURE_NAMES)
+    except PayloadError as e:
+        return e.status_code == 400
+    return False
+
+
+def test_npy():
+    """Plain and structured .npy bodies read the same; float64 needs no copy when finite"""
+    assert np.array_equal(read_npy(npy_bytes(X), FEATURE_NAMES), EXPECTED)
+    assert np.array_equal(read_npy(npy_bytes(np.asfortranarray(X)), FEATURE_NAMES), EXPECTED)
+    assert not read_npy(npy_bytes(EXPECTED), FEATURE_NAMES).flags.owndata
+
+    structured = np.zeros(3, dtype=[('#Following', '<i4'), ('#Posts', '<f4'), ('extra', '<f8')])
+    structured['#Following'] = [30, 60, 90]
+    structured['#Posts'] = [1, 4, 7]
+    X_structured = read_npy(npy_bytes(structured), FEATURE_NAMES)
+    assert X_structured.tolist() == [[1, 0, 30], [4, 0, 60], [7, 0, 90]]
+
+
+def test_npy_rejections():
+    """Wrong shapes, text, objects and truncated bodies are 400s"""
+    assert rejected(read_npy, npy_bytes(np.zeros((3, 4))))
+    assert rejected(read_npy, npy_bytes(np.zeros(3)))
+    assert rejected(read_npy, npy_bytes(np.array([['a', 'b', 'c']])))
+    assert rejected(read_npy, npy_bytes(np.zeros((2, 2), dtype=[('#Posts', '<f8')])))
+    assert rejected(read_npy, npy_bytes(np.zeros(2, dtype=[('#Posts', '<U4')])))
+    assert rejected(read_npy, npy_bytes(np.zeros(2, dtype=[('#Posts', '<f8', (2,))])))
+    assert rejected(read_npy, npy_bytes(X)[:-8])
+    assert rejected(read_npy, b'not a numpy file')
+
+
+def test_arrow():
+    """Arrow columns by name, nulls as 0, text columns rejected (skipped without pyarrow)"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("  (pyarrow not installed, Arrow check skipped)")
+        return
+
+    def arrow_bytes(table):
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    table = pa.table({
+        '#Following': pa.array([30, 60, None]),
+        '#Posts': pa.array([1.0, 4.0, 7.0]),
+        '#Followers': pa.array([True, None, False]),
+    })
+    assert read_arrow(arrow_bytes(table), FEATURE_NAMES).tolist() == [[1, 1, 30], [4, 0, 60], [7, 0, 0]]
+    assert rejected(read_arrow, arrow_bytes(pa.table({'#Posts': ['1', 'x']})))
+    assert rejected(read_arrow, b'\xff\xff\xff\xffgarbage')
+
+
+def test_columns():
+    """Column-oriented JSON of model features becomes the same matrix; raw columns defer"""
+    columns = {'#Posts': [1, 4, 7], '#Followers': [200, None, 800], '#Following': ['30', 60, 'x']}
+    assert read_columns(columns, FEATURE_NAMES).tolist() == [[1, 200, 30], [4, 0, 60], [7, 800, 0]]
+    assert read_columns({'username': ['a']}, FEATURE_NAMES) is None
+    try:
+        read_columns({'#Posts': [1, 2], '#Followers': [1]}, FEATURE_NAMES)
+    except PayloadError:
+        pass
+    else:
+        raise AssertionError('columns of unequal length must be rejected')
+
+
+def test_formats_and_results():
+    """Content types and magic bytes pick the reader; results round-trip through .npy"""
+    assert input_format('application/x-npy', b'') == 'npy'
+    assert input_format('application/octet-stream', npy_bytes(X)) == 'npy'
+    assert input_format('application/octet-stream', b'ARROW1...') == 'arrow'
+    assert input_format('application/json', b'[]') == 'json'
+    assert rejected(lambda body, names: input_format('application/octet-stream', body), b'zip?')
+
+    columns = result_columns(np.array([[0.2, 0.8], [0.9, 0.1], [0.5, 0.5]]), np.array([0, 1]))
+    assert columns['is_fake'].tolist() == [True, False, False]
+    assert columns['risk_level'].tolist() == ['High Risk', 'Low Risk', 'Medium Risk']
+    columns['cluster_id'] = np.arange(3)
+    columns['cluster_size'] = np.ones(3, dtype=np.int64)
+    payload, _ = write_npy(columns)
+    out = np.load(io.BytesIO(payload))
+    assert out.dtype == RESULT_DTYPE and out['fake_probability'].tolist() == [80.0, 10.0, 50.0]
+
+
+if __name__ == '__main__':
+    test_npy()
+    test_npy_rejections()
+    print("✓ .npy check passed: plain and structured arrays read, malformed ones are 400s")
+    test_arrow()
+    test_columns()
+    print("✓ Columnar check passed: Arrow and column JSON give the same matrix")
+    test_formats_and_results()
+    print("✓ Format check passed: detection and .npy results round-trip")
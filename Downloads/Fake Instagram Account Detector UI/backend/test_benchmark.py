@@ -0,0 +1,71 @@
+"""
+Behaviour check for the benchmark's regression gate
+compare() must flag p99 latency and throughput that move past the
+threshold and any new errors, and --baseline must turn that into a
+failing exit code
+"""
+
+import contextlib
+import copy
+import io
+import json
+import os
+import tempfile
+import benchmark_api
+from benchmark_api import compare
+
+
+def result(scenario, concurrency=1, p99_ms=10.0, requests_per_s=100.0, errors=0):
+    return {'scenario': scenario, 'concurrency': concurrency, 'p99_ms': p99_ms,
+            'requests_per_s': requests_per_s, 'errors': errors}
+
+
+def test_compare():
+    """Only changes beyond the threshold, in the bad direction, are regressions"""
+    baseline = {'results': [result('single'), result('single', 4), result('batch_100')]}
+    assert compare([result('single', p99_ms=10.9, requests_per_s=91)], baseline, 0.10) == []
+    # Faster and higher throughput is never a regression
+    assert compare([result('single', p99_ms=1, requests_per_s=1000)], baseline, 0.10) == []
+
+    slower = compare([result('single', 4, p99_ms=12.0)], baseline, 0.10)
+    assert len(slower) == 1 and slower[0].startswith('single x4: p99') and '+20%' in slower[0]
+    assert compare([result('single', 4, p99_ms=12.0)], baseline, 0.25) == []
+
+    fewer = compare([result('batch_100', requests_per_s=80)], baseline, 0.10)
+    assert len(fewer) == 1 and 'throughput' in fewer[0] and '-20%' in fewer[0]
+
+    failing = compare([result('single', errors=2, p99_ms=20)], baseline, 0.10)
+    assert len(failing) == 2 and failing[1] == 'single x1: errors 0 -> 2'
+
+    # Scenarios the baseline doesn't have are skipped, not flagged
+    assert compare([result('mixed', p99_ms=1e6)], baseline, 0.10) == []
+
+
+def test_baseline_exit_code():
+    """main() exits 1 against a faster baseline and 0 against a slower one"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'baseline.json')
+        options = ['--scenarios', 'single', '--concurrency', '1', '--requests', '20',
+                   '--repeats', '1', '--warmup', '2']
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert benchmark_api.main(options + ['--save-baseline', path]) == 0
+        with open(path) as f:
+            report = json.load(f)
+        assert [(r['scenario'], r['concurrency'], r['requests']) for r in report['results']] == [('single', 1, 20)]
+
+        for scale, expected in ((0.01, 1), (100, 0)):
+            doctored = copy.deepcopy(report)
+            for r in doctored['results']:
+                r['p99_ms'] *= scale
+                r['requests_per_s'] /= scale
+            with open(path, 'w') as f:
+                json.dump(doctored, f)
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert benchmark_api.main(options + ['--baseline', path]) == expected
+
+
+if __name__ == '__main__':
+    test_compare()
+    print("✓ Compare check passed: regressions beyond the threshold are flagged")
+    test_baseline_exit_code()
+    print("✓ Gate check passed: --baseline fails the run on a regression")
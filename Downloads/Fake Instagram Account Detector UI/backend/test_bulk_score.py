@@ -0,0 +1,75 @@
+"""
+Behaviour check for the offline bulk scorer
+Rows must come out in input order with the model's own probabilities,
+whatever the chunk size and worker count, and --include-features must copy
+the values that were actually scored
+"""
+
+import contextlib
+import io
+import os
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+import bulk_score
+
+ACCOUNTS = pd.read_csv('OldDataSet.csv').drop(columns=['Fake'])
+
+
+def run(frame, *options):
+    """Score a DataFrame through main() and return the output CSV"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source, target = os.path.join(tmp, 'in.csv'), os.path.join(tmp, 'out.csv')
+        frame.to_csv(source, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert bulk_score.main([source, target, *options]) == 0
+        return pd.read_csv(target)
+
+
+def expected_probabilities(X):
+    with open('classifier_model.pkl', 'rb') as f:
+        clf = pickle.load(f)
+    with open('scaler_model.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    clf.verbose = 0
+    return clf.predict_proba(scaler.transform(X))[:, 1] * 100
+
+
+def test_order_and_scores():
+    """Many small chunks on several workers still come back in input order"""
+    frame = ACCOUNTS.sample(500, random_state=0).reset_index(drop=True)
+    out = run(frame, '--workers', '3', '--chunk-size', '37')
+    assert out['row'].tolist() == list(range(500))
+    assert np.allclose(out['fake_probability'], expected_probabilities(frame.to_numpy(dtype=np.float64)).round(2))
+    assert (out['is_fake'] == (out['fake_probability'] > 50)).all()
+    assert list(out.columns) == ['row', 'is_fake', 'fake_probability', 'confidence', 'risk_level']
+
+    single = run(frame, '--workers', '1', '--chunk-size', '500')
+    assert out.equals(single)
+
+
+def test_include_features():
+    """--include-features puts the feature columns before the scores"""
+    frame = ACCOUNTS.head(50)
+    out = run(frame, '--include-features', '--workers', '2', '--chunk-size', '16')
+    assert list(out.columns[1:12]) == list(frame.columns)
+    assert np.allclose(out[frame.columns].to_numpy(), frame.to_numpy())
+
+
+def test_include_features_missing_columns():
+    """Missing columns and unparseable cells are copied as the 0 they were scored as"""
+    frame = ACCOUNTS.head(20).drop(columns=['#Following']).astype({'Bio Length': object})
+    frame.loc[3, 'Bio Length'] = 'n/a'
+    out = run(frame, '--include-features', '--workers', '1')
+    assert (out['#Following'] == 0).all() and out.loc[3, 'Bio Length'] == 0
+    X = out[list(ACCOUNTS.columns)].to_numpy(dtype=np.float64)
+    assert np.allclose(out['fake_probability'], expected_probabilities(X).round(2))
+
+
+if __name__ == '__main__':
+    test_order_and_scores()
+    print("✓ Order check passed: results come back in input order with the model's scores")
+    test_include_features()
+    test_include_features_missing_columns()
+    print("✓ Feature check passed: --include-features copies the scored values")
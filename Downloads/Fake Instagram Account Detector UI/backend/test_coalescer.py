@@ -0,0 +1,104 @@
+"""
+Behaviour check for the request coalescer
+Concurrent rows must be batched, answered with their own results and kept
+apart by context
+"""
+
+import threading
+import time
+import numpy as np
+from coalescer import RequestCoalescer
+
+
+def recording_score_fn(calls):
+    """Probabilities that encode the row itself, so mix-ups are visible"""
+    def score(X, context):
+        calls.append((len(X), context))
+        return np.column_stack([X[:, 0], X[:, 0] + (context or 0)])
+    return score
+
+
+def test_batching():
+    """Rows submitted within one window are scored together, each getting its own row"""
+    calls = []
+    coalescer = RequestCoalescer(recording_score_fn(calls), window_ms=50, max_batch=64)
+    futures = [coalescer.submit([float(i), 0.0]) for i in range(20)]
+    results = [future.result(timeout=5) for future in futures]
+
+    for i, probs in enumerate(results):
+        assert probs[0] == i and probs[1] == i, (i, probs)
+    assert sum(n for n, _ in calls) == 20
+    assert len(calls) < 20, f"no batching happened: {calls}"
+    assert coalescer.stats()['rows_scored'] == 20
+
+
+def test_max_batch():
+    """No scoring call gets more than max_batch rows"""
+    calls = []
+    coalescer = RequestCoalescer(recording_score_fn(calls), window_ms=50, max_batch=8)
+    futures = [coalescer.submit([float(i), 0.0]) for i in range(30)]
+    for future in futures:
+        future.result(timeout=5)
+    assert max(n for n, _ in calls) <= 8, calls
+
+
+def test_contexts_stay_apart():
+    """Rows with different contexts (model snapshots) are never scored together"""
+    calls = []
+    coalescer = RequestCoalescer(recording_score_fn(calls), window_ms=50, max_batch=64)
+    futures = [(i % 2 * 100, coalescer.submit([float(i), 0.0], context=i % 2 * 100)) for i in range(10)]
+    for context, future in futures:
+        probs = future.result(timeout=5)
+        assert probs[1] - probs[0] == context
+    assert {context for _, context in calls} == {0, 100}
+
+
+def test_concurrent_callers():
+    """Blocking score() calls from many threads each get their own answer"""
+    coalescer = RequestCoalescer(recording_score_fn([]), window_ms=2, max_batch=16)
+    results = {}
+
+    def call(i):
+        results[i] = coalescer.score([float(i), 0.0], timeout=5)[0]
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {i: float(i) for i in range(40)}
+
+
+def test_errors_reach_callers():
+    """A failing score_fn fails every future in the batch and the coalescer keeps running"""
+    failing = [True]
+
+    def score(X, context):
+        if failing[0]:
+            raise RuntimeError('model exploded')
+        return np.zeros((len(X), 2))
+
+    coalescer = RequestCoalescer(score, window_ms=20)
+    futures = [coalescer.submit([1.0]) for _ in range(3)]
+    for future in futures:
+        try:
+            future.result(timeout=5)
+        except RuntimeError as e:
+            assert 'exploded' in str(e)
+        else:
+            raise AssertionError('expected the scoring error')
+
+    failing[0] = False
+    time.sleep(0.05)
+    assert coalescer.score([1.0], timeout=5).tolist() == [0.0, 0.0]
+
+
+if __name__ == '__main__':
+    test_batching()
+    test_max_batch()
+    print("✓ Batching check passed: rows are grouped and answered in order")
+    test_contexts_stay_apart()
+    test_concurrent_callers()
+    print("✓ Isolation check passed: contexts and concurrent callers never mix")
+    test_errors_reach_callers()
+    print("✓ Error check passed: scoring failures reach every caller")
@@ -0,0 +1,75 @@
+"""
+Behaviour check for duplicate grouping
+Exact grouping by default, opt-in approximate grouping on the log grid,
+and cluster ids in order of first appearance
+"""
+
+import numpy as np
+from duplicate_clusters import find_clusters
+
+
+def brute_force_exact(X):
+    """Cluster labels by first appearance, comparing rows one by one"""
+    seen, labels = [], []
+    for row in X:
+        for label, other in enumerate(seen):
+            if np.array_equal(row, other):
+                labels.append(label)
+                break
+        else:
+            labels.append(len(seen))
+            seen.append(row)
+    return labels
+
+
+def test_exact_default():
+    """With the default tolerance only identical rows (0.0 == -0.0) share a cluster"""
+    X = np.array([[5.0, 1.0], [5.0, 1.0], [5.0, 1.0000001], [0.0, 2.0], [-0.0, 2.0], [5.0, 1.0]])
+    clusters = find_clusters(X)
+    assert clusters.labels.tolist() == [0, 0, 1, 2, 2, 0]
+    assert clusters.representatives.tolist() == [0, 2, 3]
+    assert clusters.sizes.tolist() == [3, 1, 2]
+    assert clusters.row_sizes().tolist() == [3, 3, 1, 2, 2, 3]
+    assert clusters.count == 3 and clusters.duplicates == 3
+
+
+def test_matches_brute_force():
+    """Random batches with repeats group exactly like a row-by-row comparison"""
+    rng = np.random.default_rng(0)
+    pool = rng.integers(0, 5, size=(12, 4)).astype(np.float64)
+    X = pool[rng.integers(0, len(pool), size=300)]
+    clusters = find_clusters(X)
+    assert clusters.labels.tolist() == brute_force_exact(X)
+    for label, representative in enumerate(clusters.representatives):
+        assert clusters.labels[representative] == label
+        assert (clusters.labels[:representative] != label).all()
+
+
+def test_approximate_opt_in():
+    """A positive tolerance merges large nearby counts but never small integers or flags"""
+    X = np.array([
+        [10000.0, 0.0, 10.0],
+        [9950.0, 0.0, 10.0],  # same log-grid cell; rows near a cell edge may still split
+        [10000.0, 1.0, 10.0],
+        [10000.0, 0.0, 11.0],
+        [20000.0, 0.0, 10.0],
+    ])
+    assert find_clusters(X).count == 5
+    clusters = find_clusters(X, tolerance=0.01)
+    assert clusters.labels.tolist() == [0, 0, 1, 2, 3]
+
+
+def test_small_batches():
+    """Empty and single-row batches need no grouping"""
+    assert find_clusters(np.zeros((0, 3))).count == 0
+    one = find_clusters(np.ones((1, 3)))
+    assert one.labels.tolist() == [0] and one.duplicates == 0
+
+
+if __name__ == '__main__':
+    test_exact_default()
+    test_matches_brute_force()
+    print("✓ Exact check passed: only identical rows share a cluster by default")
+    test_approximate_opt_in()
+    test_small_batches()
+    print("✓ Tolerance check passed: approximate grouping only when asked for")
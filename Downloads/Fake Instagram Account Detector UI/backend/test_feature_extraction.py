@@ -0,0 +1,84 @@
+"""
+Behaviour check for batch feature extraction
+Compares the vectorized text statistics with a per-string reference and
+checks how explicit and raw profile fields combine
+"""
+
+import numpy as np
+from feature_extraction import extract_features, text_stats, to_flag_column, to_float_column
+
+FEATURE_NAMES = ['Profile Pic', 'Nums/Length Username', 'Full Name Words', 'Bio Length',
+                 'External Url', 'Private', 'Verified', 'Business', '#Posts', '#Followers', '#Following']
+TEXTS = ['', 'john_doe99', '  two  words ', 'tab\tand\nnewline', 'ünïcödé 123 ✓', '2024', 'a　b', ' ']
+
+
+def reference_stats(text):
+    digits = sum('0' <= c <= '9' for c in text)
+    return len(text), digits, len(text.split())
+
+
+def test_text_stats():
+    """Lengths, ASCII digit counts and word counts match a per-string loop"""
+    lengths, digits, words = text_stats(TEXTS)
+    for i, text in enumerate(TEXTS):
+        assert (lengths[i], digits[i], words[i]) == reference_stats(text), (text, lengths[i], digits[i], words[i])
+
+    lengths, digits, words = text_stats(['', ''])
+    assert lengths.tolist() == [0, 0] and words.tolist() == [0, 0]
+
+
+def test_coercion():
+    """Unparseable and non-finite numbers become 0; flags accept bools, numbers and strings"""
+    assert to_float_column(['1,200', None, 'abc', float('inf'), 3]).tolist() == [1200, 0, 0, 0, 3]
+    flags = to_flag_column([True, 0, 'false', 'https://x.y', None, ' No ', 2])
+    assert flags.tolist() == [1, 0, 0, 1, 0, 0, 1]
+
+
+def test_raw_profile_fields():
+    """Raw fields are turned into the model's features"""
+    X, derived = extract_features([{
+        'username': 'ab12', 'full_name': 'Jane Q Public', 'bio': 'hello',
+        'followers_count': '1,000', 'following': 50, 'posts': 3,
+        'is_private': 'true', 'external_url': '', 'profile_pic_url': 'http://pic',
+    }], FEATURE_NAMES)
+    row = dict(zip(FEATURE_NAMES, X[0]))
+    assert row['Nums/Length Username'] == 0.5
+    assert row['Full Name Words'] == 3 and row['Bio Length'] == 5
+    assert row['#Followers'] == 1000 and row['#Following'] == 50 and row['#Posts'] == 3
+    assert row['Private'] == 1 and row['External Url'] == 0 and row['Profile Pic'] == 1
+    assert row['Verified'] == 0
+    assert derived[0, FEATURE_NAMES.index('#Followers')]
+    assert not derived[0, FEATURE_NAMES.index('Verified')]
+
+
+def test_explicit_features_win():
+    """A model feature sent by the client overrides the one derived from raw fields"""
+    accounts = [
+        {'#Followers': 7, 'followers': 1000, 'bio': 'abc'},
+        {'followers': 1000, 'Bio Length': 40},
+    ]
+    X, derived = extract_features(accounts, FEATURE_NAMES)
+    followers, bio = FEATURE_NAMES.index('#Followers'), FEATURE_NAMES.index('Bio Length')
+    assert X[:, followers].tolist() == [7, 1000]
+    assert X[:, bio].tolist() == [3, 40]
+    assert derived[:, followers].tolist() == [False, True]
+    assert derived[:, bio].tolist() == [True, False]
+
+
+def test_model_features_only():
+    """Accounts that already carry every feature are copied as-is"""
+    accounts = [{name: float(i + j) for j, name in enumerate(FEATURE_NAMES)} for i in range(3)]
+    X, derived = extract_features(accounts, FEATURE_NAMES)
+    assert np.array_equal(X, np.array([[i + j for j in range(len(FEATURE_NAMES))] for i in range(3)]))
+    assert not derived.any()
+    assert extract_features([], FEATURE_NAMES)[0].shape == (0, len(FEATURE_NAMES))
+
+
+if __name__ == '__main__':
+    test_text_stats()
+    test_coercion()
+    print("✓ Text check passed: vectorized stats match a per-string loop")
+    test_raw_profile_fields()
+    test_explicit_features_win()
+    test_model_features_only()
+    print("✓ Extraction check passed: raw fields derive features, explicit ones win")
@@ -0,0 +1,97 @@
+"""
+Behaviour check for forest compaction
+Rebuilt forests must still be well-formed preorder trees, an uncapped
+rebuild must score like the original, and the compacted forest
+must stay within the requested quality and probability tolerances
+"""
+
+import pickle
+import numpy as np
+import pandas as pd
+from forest_compaction import _classification_scores, compact_forest, rebuild_forest
+from forest_compiler import compile_forest
+
+
+def load_forest():
+    with open('classifier_model.pkl', 'rb') as f:
+        clf = pickle.load(f)
+    with open('scaler_model.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    with open('feature_names.pkl', 'rb') as f:
+        feature_names = pickle.load(f)
+    data = pd.read_csv('OldDataSet.csv').sample(300, random_state=0)
+    X = data[feature_names].fillna(0).to_numpy(dtype=np.float64)
+    return compile_forest(clf, scaler), X, data['Fake'].to_numpy()
+
+
+def check_preorder(forest, max_depth=None):
+    """Every tree is a contiguous preorder block in which each node is reached exactly once"""
+    ends = np.append(forest.roots[1:], forest.node_count)
+    assert forest.roots[0] == 0 and (np.diff(forest.roots) > 0).all()
+    for root, end in zip(forest.roots, ends):
+        seen = np.zeros(end - root, dtype=int)
+        stack = [(root, 0)]
+        deepest = 0
+        while stack:
+            node, depth = stack.pop()
+            assert root <= node < end, (root, node, end)
+            seen[node - root] += 1
+            deepest = max(deepest, depth)
+            if forest.left[node] == node:
+                assert forest.right[node] == node and np.isinf(forest.threshold[node])
+                continue
+            # Preorder: the left child follows its parent, the right one its left subtree
+            assert forest.left[node] == node + 1 and forest.right[node] > node + 1
+            stack += [(forest.right[node], depth + 1), (forest.left[node], depth + 1)]
+        assert (seen == 1).all(), 'unreachable or shared nodes'
+        assert deepest <= forest.depth
+        if max_depth is not None:
+            assert deepest <= max_depth
+    assert np.allclose(forest.value.sum(axis=1), 1.0)
+
+
+def test_rebuild_forest():
+    """Rebuilding keeps trees valid; without caps or merges it scores like the original"""
+    forest, X, _ = load_forest()
+    check_preorder(forest)
+
+    copy = rebuild_forest(forest)
+    check_preorder(copy)
+    # Tolerance 0 still folds sibling leaves with identical distributions
+    assert copy.node_count <= forest.node_count and copy.depth == forest.depth
+    assert np.allclose(copy.predict_proba(X), forest.predict_proba(X))
+
+    for max_depth, merge_tolerance in ((6, 0.0), (4, 0.05), (None, 0.2)):
+        rebuilt = rebuild_forest(forest, max_depth=max_depth, merge_tolerance=merge_tolerance)
+        check_preorder(rebuilt, max_depth)
+        assert rebuilt.n_trees == forest.n_trees and rebuilt.node_count < forest.node_count
+
+    subset = rebuild_forest(forest, trees=[3, 0, 7])
+    check_preorder(subset)
+    assert subset.n_trees == 3
+
+
+def test_compact_forest():
+    """The smallest candidate found still meets every tolerance it was searched with"""
+    forest, X, y = load_forest()
+    full_precision, full_recall = _classification_scores(forest, forest.predict_proba(X), y)
+    tolerance, max_prob_error = 0.01, 0.05
+    compact, log = compact_forest(forest, X, y, tolerance=tolerance,
+                                  max_prob_error=max_prob_error, depth_caps=(None, 10, 6))
+    check_preorder(compact)
+    assert compact.node_count < forest.node_count
+
+    probabilities = compact.predict_proba(X)
+    precision, recall = _classification_scores(compact, probabilities, y)
+    assert precision >= full_precision - tolerance and recall >= full_recall - tolerance
+    assert np.abs(probabilities - forest.predict_proba(X)).max(axis=1).mean() <= max_prob_error
+
+    fitting = [entry for entry in log if entry['fits']]
+    assert compact.node_count == min(entry['node_count'] for entry in fitting)
+
+
+if __name__ == '__main__':
+    test_rebuild_forest()
+    print("✓ Rebuild check passed: rebuilt forests are valid preorder trees")
+    test_compact_forest()
+    print("✓ Compaction check passed: the compacted forest stays within tolerance")
@@ -0,0 +1,109 @@
+"""
+Parity and latency check for the compiled forest
+Compares forest_compiler against sklearn on OldDataSet.csv
+"""
+
+import pickle
+import time
+import numpy as np
+import pandas as pd
+from forest_compiler import compile_forest
+
+
+def load_artifacts():
+    with open('classifier_model.pkl', 'rb') as f:
+        clf = pickle.load(f)
+    with open('scaler_model.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    with open('feature_names.pkl', 'rb') as f:
+        feature_names = pickle.load(f)
+    clf.verbose = 0
+    df = pd.read_csv('OldDataSet.csv')
+    X = df[feature_names].fillna(0).to_numpy(dtype=np.float64)
+    return clf, scaler, X
+
+
+def test_parity():
+    """Compiled probabilities and labels must match sklearn on the full dataset"""
+    clf, scaler, X = load_artifacts()
+    forest = compile_forest(clf, scaler)
+
+    expected = clf.predict_proba(scaler.transform(X))
+    actual = forest.predict_proba(X)
+    assert np.allclose(actual, expected, rtol=0, atol=1e-12), np.abs(actual - expected).max()
+    assert (forest.predict(X) == clf.predict(scaler.transform(X))).all()
+
+    # Single rows go through the same path as batches
+    for row, probs in zip(X[:50], expected[:50]):
+        assert np.allclose(forest.predict_proba(row)[0], probs, rtol=0, atol=1e-12)
+
+
+def reference_contributions(clf, x_scaled):
+    """Path contributions for one scaled row, walked tree by tree through sklearn"""
+    contributions = np.zeros(clf.n_features_in_)
+    for estimator in clf.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, 1] / tree.value[:, 0, :].sum(axis=1)
+        path = estimator.decision_path(x_scaled.reshape(1, -1)).indices
+        for parent, child in zip(path[:-1], path[1:]):
+            contributions[tree.feature[parent]] += value[child] - value[parent]
+    return contributions / len(clf.estimators_)
+
+
+def test_explanations():
+    """Contributions must add up to the probability and match a per-tree walk"""
+    clf, scaler, X = load_artifacts()
+    forest = compile_forest(clf, scaler)
+
+    probabilities, contributions = forest.explain(X)
+    assert np.allclose(probabilities, forest.predict_proba(X), rtol=0, atol=1e-12)
+    total = forest.base_value() + contributions.sum(axis=1)
+    assert np.allclose(total, probabilities[:, 1], rtol=0, atol=1e-9), np.abs(total - probabilities[:, 1]).max()
+
+    X_scaled = scaler.transform(X[:20]).astype(np.float32)
+    for i, x in enumerate(X_scaled):
+        expected = reference_contributions(clf, x)
+        assert np.allclose(contributions[i], expected, rtol=0, atol=1e-9), np.abs(contributions[i] - expected).max()
+
+
+def percentile_us(fn, rows, repeats=1):
+    timings = []
+    for _ in range(repeats):
+        for row in rows:
+            start = time.perf_counter()
+            fn(row)
+            timings.append((time.perf_counter() - start) * 1e6)
+    return np.percentile(timings, [50, 99])
+
+
+def compare_latency(n_rows=200):
+    """Print single-row p50/p99 and full-batch latency for both evaluators"""
+    clf, scaler, X = load_artifacts()
+    forest = compile_forest(clf, scaler)
+    rows = [X[i:i + 1] for i in range(min(n_rows, len(X)))]
+
+    sk_p50, sk_p99 = percentile_us(lambda r: clf.predict_proba(scaler.transform(r)), rows)
+    cf_p50, cf_p99 = percentile_us(forest.predict_proba, rows, repeats=5)
+
+    start = time.perf_counter()
+    clf.predict_proba(scaler.transform(X))
+    sk_batch = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    forest.predict_proba(X)
+    cf_batch = (time.perf_counter() - start) * 1e3
+
+    print("=" * 60)
+    print(f"Forest: {forest.n_trees} trees, {forest.node_count} nodes, depth {forest.depth}")
+    print("=" * 60)
+    print(f"{'':12s} {'p50 (us)':>12s} {'p99 (us)':>12s} {f'batch {len(X)} (ms)':>18s}")
+    print(f"{'sklearn':12s} {sk_p50:12.1f} {sk_p99:12.1f} {sk_batch:18.2f}")
+    print(f"{'compiled':12s} {cf_p50:12.1f} {cf_p99:12.1f} {cf_batch:18.2f}")
+    print(f"\nSingle-row p99 speedup: {sk_p99 / cf_p99:.1f}x")
+
+
+if __name__ == '__main__':
+    test_parity()
+    print("✓ Parity check passed: compiled forest matches sklearn on OldDataSet.csv")
+    test_explanations()
+    print("✓ Explanation check passed: contributions add up and match sklearn's decision paths\n")
+    compare_latency()
@@ -0,0 +1,77 @@
+"""
+Behaviour check for the hot model swap
+A candidate that fails validation must leave the serving model in place
+and be reported; a good one must be swapped in, and only one reload may
+run at a time
+"""
+
+import copy
+import os
+import pickle
+import tempfile
+import backend_api
+from forest_compiler import compile_forest
+from model_bundle import write_bundle
+
+
+def write_candidate(path, version, inverted=False):
+    """Bundle the committed model; inverted swaps the class probabilities"""
+    with open('classifier_model.pkl', 'rb') as f:
+        clf = pickle.load(f)
+    with open('scaler_model.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    with open('feature_names.pkl', 'rb') as f:
+        feature_names = pickle.load(f)
+    forest = compile_forest(clf, scaler)
+    if inverted:
+        forest = copy.copy(forest)
+        forest.value = forest.value[:, ::-1].copy()
+    write_bundle(path, forest, feature_names, scaler, version=version)
+
+
+def test_failed_validation_keeps_model():
+    """A model below MODEL_MIN_ACCURACY is rejected and the current one keeps serving"""
+    client = backend_api.app.test_client()
+    bundle_path = backend_api.MODEL_BUNDLE_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        backend_api.MODEL_BUNDLE_PATH = os.path.join(tmp, 'model_bundle.bin')
+        try:
+            current = backend_api.model
+            failures = backend_api.reload_status['failures']
+            write_candidate(backend_api.MODEL_BUNDLE_PATH, 'inverted', inverted=True)
+            assert backend_api.reload_model() is False
+            assert backend_api.model is current
+            assert backend_api.reload_status['failures'] == failures + 1
+            assert 'accuracy' in backend_api.reload_status['last_error']
+
+            response = client.post('/api/reload-model?wait=true')
+            assert response.status_code == 500 and backend_api.model is current
+
+            write_candidate(backend_api.MODEL_BUNDLE_PATH, 'good')
+            response = client.post('/api/reload-model?wait=true')
+            assert response.status_code == 200 and backend_api.model.version == 'good'
+            assert backend_api.reload_status['last_error'] is None
+            assert client.get('/api/reload-model').get_json()['model']['version'] == 'good'
+        finally:
+            backend_api.MODEL_BUNDLE_PATH = bundle_path
+
+
+def test_one_reload_at_a_time():
+    """While a reload holds the lock another one is refused, not queued"""
+    client = backend_api.app.test_client()
+    current = backend_api.model
+    with backend_api.reload_lock:
+        backend_api.reload_status['state'] = 'loading'
+        try:
+            assert backend_api.reload_model() is False
+            assert client.post('/api/reload-model?wait=true').status_code == 409
+        finally:
+            backend_api.reload_status['state'] = 'idle'
+    assert backend_api.model is current
+
+
+if __name__ == '__main__':
+    test_failed_validation_keeps_model()
+    print("✓ Validation check passed: rejected candidates leave the serving model in place")
+    test_one_reload_at_a_time()
+    print("✓ Lock check passed: concurrent reloads are refused")
@@ -0,0 +1,160 @@
+"""
+Behaviour check for the feedback store and incremental retraining
+Offsets, incremental row counts, the replay reservoir, and that a round
+after the first reads neither OldDataSet.csv nor older feedback
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import incremental_trainer
+from feedback_store import FeedbackStore, parse_label
+from incremental_trainer import ReplayReservoir, grow_forest
+
+FEATURE_NAMES = ['a', 'b', 'c']
+
+
+def count_rows(path, offset=0):
+    """Brute-force (rows, rows after offset) by reading the whole file"""
+    with open(path, 'rb') as f:
+        header = len(f.readline())
+        data = f.read()
+    return data.count(b'\n'), data[max(offset, header) - header:].count(b'\n')
+
+
+def test_store_offsets():
+    """read() returns exactly the rows appended after an offset, ignoring a half-written line"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeedbackStore(os.path.join(tmp, 'feedback.csv'), FEATURE_NAMES)
+        assert store.read()[0].empty and store.stats() == {'rows': 0, 'pending': 0, 'bytes': 0}
+
+        first = store.append([[1, 2, 3], [4, 5, 6]], [1, 0])
+        store.append([[7, 8, 9]], [1])
+        frame, end = store.read(first)
+        assert frame[FEATURE_NAMES].to_numpy().tolist() == [[7, 8, 9]] and frame['Fake'].tolist() == [1]
+
+        with open(store.path, 'a') as f:
+            f.write('10,11')  # a writer caught mid-append
+        frame, partial_end = store.read(first)
+        assert len(frame) == 1 and partial_end == end
+        assert len(store.read(0)[0]) == 3
+
+
+def test_incremental_stats():
+    """stats() counts only new bytes yet always agrees with a full recount"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'feedback.csv')
+        store = FeedbackStore(path, FEATURE_NAMES)
+        rng = np.random.default_rng(0)
+        offsets = [0]
+        for n in (5, 1, 12, 3):
+            offsets.append(store.append(rng.random((n, 3)), rng.integers(0, 2, n)))
+            for offset in (offsets[-2], offsets[1], 0, offsets[-1]):
+                total, pending = count_rows(path, offset)
+                stats = store.stats(offset)
+                assert (stats['rows'], stats['pending']) == (total, pending), (offset, stats)
+
+        # A replaced file (new inode) is counted from scratch
+        os.replace(path, path + '.old')
+        store.append([[1, 2, 3]], [0])
+        assert store.stats(0)['rows'] == 1
+
+
+def test_parse_label():
+    assert [parse_label(v) for v in (True, 0, 1.0, ' Fake ', 'real', 'yes', 2, None)] == [1, 0, 1, 1, 0, None, None, None]
+
+
+def test_reservoir():
+    """Bounded, counts every row, keeps each row with equal probability and round-trips to disk"""
+    rng = np.random.default_rng(1)
+    kept = np.zeros(100)
+    for _ in range(2000):
+        reservoir = ReplayReservoir(np.empty((0, 1)), np.empty(0, dtype=np.int64), 0, 10, None, None)
+        reservoir.add(np.arange(60, dtype=np.float64).reshape(-1, 1), np.zeros(60, dtype=np.int64), rng)
+        reservoir.add(np.arange(60, 100, dtype=np.float64).reshape(-1, 1), np.zeros(40, dtype=np.int64), rng)
+        assert len(reservoir.y) == 10 and reservoir.seen == 100
+        kept[reservoir.X[:, 0].astype(int)] += 1
+    # Each row is kept 10/100 of the time; allow generous sampling noise
+    assert np.abs(kept / 2000 - 0.1).max() < 0.05, kept / 2000
+    assert abs(kept[:60].mean() - kept[60:].mean()) < 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reservoir.X_val, reservoir.y_val = np.ones((2, 1)), np.array([0, 1])
+        path = os.path.join(tmp, 'replay.npz')
+        reservoir.save(path)
+        loaded = ReplayReservoir.load(path, 10)
+        assert np.array_equal(loaded.X, reservoir.X) and loaded.seen == 100
+        assert loaded.y_val.tolist() == [0, 1]
+        assert ReplayReservoir.load(os.path.join(tmp, 'missing.npz'), 10) is None
+
+
+def test_grow_forest():
+    """New trees are appended, the oldest retired, and surviving trees are shared, not refit"""
+    with open('classifier_model.pkl', 'rb') as f:
+        clf = pickle.load(f)
+    clf.verbose = 0
+    rng = np.random.default_rng(2)
+    X = rng.random((60, clf.n_features_in_))
+    y = np.arange(60) % 2
+    grown, retired = grow_forest(clf, X, y, 5, len(clf.estimators_), seed=1)
+    assert len(grown.estimators_) == len(clf.estimators_) and retired == 5
+    assert all(a is b for a, b in zip(grown.estimators_[:-5], clf.estimators_[5:]))
+    assert len(clf.estimators_) == clf.n_estimators  # the current model is untouched
+
+
+def test_rounds_read_only_new_rows():
+    """After the reservoir exists, a round must not read the base dataset or older feedback"""
+    base = pd.read_csv('OldDataSet.csv')
+    with open('feature_names.pkl', 'rb') as f:
+        feature_names = pickle.load(f)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('classifier_model.pkl', 'scaler_model.pkl', 'feature_names.pkl'):
+            shutil.copy(name, tmp)
+        feedback = os.path.join(tmp, 'feedback.csv')
+        state = os.path.join(tmp, 'state.json')
+        argv = ['--model-dir', tmp, '--feedback', feedback, '--state', state,
+                '--data', 'OldDataSet.csv', '--min-rows', '50']
+        store = FeedbackStore(feedback, feature_names)
+
+        rows = base.sample(120, random_state=0)
+        store.append(rows[feature_names].fillna(0).to_numpy(dtype=np.float64), rows['Fake'])
+        incremental_trainer.main(argv)
+        assert os.path.exists(state + '.replay.npz')
+
+        rows = base.sample(120, random_state=1)
+        store.append(rows[feature_names].fillna(0).to_numpy(dtype=np.float64), rows['Fake'])
+        reads = []
+        read_csv, read = incremental_trainer.pd.read_csv, FeedbackStore.read
+
+        def forbidden_read_csv(source, *args, **kwargs):
+            # FeedbackStore parses the new bytes from memory; files are off limits
+            if isinstance(source, (str, os.PathLike)):
+                raise AssertionError(f"round re-read {source}")
+            return read_csv(source, *args, **kwargs)
+
+        def recording_read(self, start=0, stop=None):
+            reads.append(start)
+            return read(self, start, stop)
+
+        incremental_trainer.pd.read_csv = forbidden_read_csv
+        FeedbackStore.read = recording_read
+        try:
+            incremental_trainer.main(argv)
+        finally:
+            incremental_trainer.pd.read_csv, FeedbackStore.read = read_csv, read
+        assert reads and min(reads) > 0, reads
+
+
+if __name__ == '__main__':
+    test_store_offsets()
+    test_incremental_stats()
+    test_parse_label()
+    print("✓ Store check passed: offsets, partial lines and incremental counts")
+    test_reservoir()
+    test_grow_forest()
+    print("✓ Replay check passed: the reservoir samples uniformly and trees are only appended")
+    test_rounds_read_only_new_rows()
+    print("✓ Round check passed: later rounds read only the new feedback")
@@ -0,0 +1,95 @@
+"""
+Behaviour check for the request metrics
+Histograms must render as cumulative Prometheus buckets that agree with
+the observed values, stage timings must carry the endpoint of their own
+thread, and /metrics must serve the text format
+"""
+
+import threading
+from metrics import LATENCY_BUCKETS, MetricsRegistry
+
+
+def parse(text):
+    """{(name, labels): value} for every sample line; labels as a sorted tuple"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        series, value = line.rsplit(' ', 1)
+        name, _, labels = series.partition('{')
+        pairs = tuple(sorted(
+            tuple(pair.split('=', 1)) for pair in labels.rstrip('}').split(',') if pair
+        ))
+        samples[(name, tuple((k, v.strip('"')) for k, v in pairs))] = float(value)
+    return samples
+
+
+def test_histogram_render():
+    """Bucket counts are cumulative, end at +Inf == count, and sum the observations"""
+    registry = MetricsRegistry('test')
+    registry.describe('latency_seconds', 'How long it took')
+    values = [0.00001, 0.0005, 0.0005, 0.003, 0.2, 42.0]
+    for value in values:
+        registry.observe('latency_seconds', {'endpoint': 'analyze'}, value)
+    registry.inc('requests_total', {'endpoint': 'analyze', 'status': '200'}, 3)
+
+    text = registry.render()
+    assert '# HELP test_latency_seconds How long it took' in text
+    assert '# TYPE test_latency_seconds histogram' in text and '# TYPE test_requests_total counter' in text
+    samples = parse(text)
+    label = (('endpoint', 'analyze'),)
+    assert samples[('test_requests_total', (('endpoint', 'analyze'), ('status', '200')))] == 3
+
+    previous = 0
+    for bound in LATENCY_BUCKETS:
+        count = samples[('test_latency_seconds_bucket', label + (('le', repr(float(bound))),))]
+        # A value equal to a bound belongs to that bucket (le = less or equal)
+        assert count == sum(value <= bound for value in values), (bound, count)
+        assert count >= previous
+        previous = count
+    assert samples[('test_latency_seconds_bucket', label + (('le', '+Inf'),))] == len(values)
+    assert samples[('test_latency_seconds_count', label)] == len(values)
+    assert abs(samples[('test_latency_seconds_sum', label)] - sum(values)) < 1e-9
+
+
+def test_stage_labels_follow_thread():
+    """Each thread's stages are labelled with that thread's endpoint"""
+    registry = MetricsRegistry('test')
+
+    def request(endpoint, n):
+        registry.endpoint = endpoint
+        for _ in range(n):
+            with registry.stage('forest'):
+                pass
+
+    threads = [threading.Thread(target=request, args=(name, n)) for name, n in (('analyze', 5), ('batch', 3))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with registry.stage('forest'):
+        pass  # no request on this thread
+
+    samples = parse(registry.render())
+    counts = {labels[0][1]: value for (name, labels), value in samples.items() if name == 'test_stage_latency_seconds_count'}
+    assert counts == {'analyze': 5, 'batch': 3, 'background': 1}, counts
+
+
+def test_endpoint():
+    """/metrics serves the app's metrics in the Prometheus text format"""
+    import backend_api
+    client = backend_api.app.test_client()
+    client.get('/api/health')
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    samples = parse(response.get_data(as_text=True))
+    assert any(name == 'instagram_api_requests_total' for name, _ in samples)
+
+
+if __name__ == '__main__':
+    test_histogram_render()
+    print("✓ Render check passed: buckets are cumulative and agree with the observations")
+    test_stage_labels_follow_thread()
+    print("✓ Label check passed: stage timings carry their own thread's endpoint")
+    test_endpoint()
+    print("✓ Endpoint check passed: /metrics serves the text format")
@@ -0,0 +1,87 @@
+"""
+Round-trip check for the model bundle
+A written bundle must map back to a forest that scores exactly like the
+one it was built from, with its metadata intact, and files that aren't
+bundles of this format must be refused
+"""
+
+import os
+import pickle
+import struct
+import tempfile
+import numpy as np
+import pandas as pd
+import model_bundle
+from forest_compiler import compile_forest
+from model_bundle import ALIGNMENT, load_bundle, read_header, write_bundle
+
+
+def load_artifacts():
+    with open('classifier_model.pkl', 'rb') as f:
+        clf = pickle.load(f)
+    with open('scaler_model.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    with open('feature_names.pkl', 'rb') as f:
+        feature_names = pickle.load(f)
+    X = pd.read_csv('OldDataSet.csv')[feature_names].fillna(0).to_numpy(dtype=np.float64)
+    return compile_forest(clf, scaler), scaler, feature_names, X
+
+
+def test_round_trip():
+    """The mapped forest scores like the compiled one; metadata survives"""
+    forest, scaler, feature_names, X = load_artifacts()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model_bundle.bin')
+        version = write_bundle(path, forest, feature_names, scaler, version='test-1')
+        assert version == 'test-1' and os.listdir(tmp) == ['model_bundle.bin']
+
+        bundle = load_bundle(path)
+        assert bundle.version == 'test-1' and bundle.feature_names == list(feature_names)
+        assert bundle.size == os.path.getsize(path)
+        assert np.allclose(bundle.scaler_mean, scaler.mean_) and np.allclose(bundle.scaler_scale, scaler.scale_)
+        assert np.array_equal(bundle.forest.predict_proba(X), forest.predict_proba(X))
+        assert np.array_equal(bundle.forest.classes_, forest.classes_)
+
+        # Arrays are read-only views of the aligned file, not copies
+        for name, spec in read_header(path)['arrays'].items():
+            assert spec['offset'] % ALIGNMENT == 0, name
+            assert not getattr(bundle.forest, name).flags.writeable, name
+
+        # Without an explicit version one is generated from the time
+        assert write_bundle(path, forest, feature_names, scaler).isdigit()
+
+
+def test_refuses_other_files():
+    """Wrong magic or an unknown format version is a ValueError"""
+    forest, scaler, feature_names, _ = load_artifacts()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model_bundle.bin')
+        with open(path, 'wb') as f:
+            f.write(b'NOTMODEL' + struct.pack('<Q', 2) + b'{}')
+        for read in (read_header, load_bundle):
+            try:
+                read(path)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f'{read.__name__} accepted a non-bundle')
+
+        current = model_bundle.FORMAT_VERSION
+        model_bundle.FORMAT_VERSION = current + 1
+        try:
+            write_bundle(path, forest, feature_names, scaler)
+        finally:
+            model_bundle.FORMAT_VERSION = current
+        try:
+            load_bundle(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('a newer bundle format was loaded')
+
+
+if __name__ == '__main__':
+    test_round_trip()
+    print("✓ Round-trip check passed: the mapped forest scores like the original")
+    test_refuses_other_files()
+    print("✓ Format check passed: other files and formats are refused")
@@ -0,0 +1,72 @@
+"""
+Behaviour check for the sweep's candidate selection
+The Pareto front must hold exactly the candidates nothing else beats on
+every objective, and selection must pick the most accurate candidate that
+fits the latency budgets
+"""
+
+import numpy as np
+import pandas as pd
+from model_sweep import pareto_front, select_candidate
+
+
+def candidates():
+    """A hand-built sweep table, already sorted by accuracy, recall, then p99"""
+    table = pd.DataFrame([
+        # accuracy, recall, single_p99_ms, batch_1k_ms
+        (0.95, 0.93, 0.40, 30.0),   # most accurate, slowest
+        (0.95, 0.93, 0.45, 30.0),   # ties the first but slower: dominated
+        (0.94, 0.94, 0.20, 20.0),   # better recall and faster
+        (0.93, 0.90, 0.10, 25.0),   # fastest single row
+        (0.92, 0.89, 0.15, 26.0),   # beaten on everything by the row above
+        (0.90, 0.88, 0.30, 10.0),   # fastest batch
+    ], columns=['accuracy', 'recall', 'single_p99_ms', 'batch_1k_ms'], index=[7, 3, 0, 5, 1, 2])
+    return table
+
+
+def brute_force_front(table):
+    rows = table[['accuracy', 'recall', 'single_p99_ms', 'batch_1k_ms']].to_numpy()
+    front = []
+    for a in rows:
+        beaten = any(
+            b[0] >= a[0] and b[1] >= a[1] and b[2] <= a[2] and b[3] <= a[3] and tuple(b) != tuple(a)
+            for b in rows
+        )
+        front.append(not beaten)
+    return np.array(front)
+
+
+def test_pareto_front():
+    """Only undominated candidates are on the front; exact ties both stay"""
+    table = candidates()
+    front = pareto_front(table)
+    assert front.tolist() == [True, False, True, True, False, True], front
+    assert np.array_equal(front, brute_force_front(table))
+
+    tied = pd.concat([table.iloc[[0]], table.iloc[[0]]])
+    assert pareto_front(tied).tolist() == [True, True]
+
+    # Random tables agree with the definition as well
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        sample = pd.DataFrame(rng.integers(0, 4, size=(15, 4)).astype(float),
+                              columns=['accuracy', 'recall', 'single_p99_ms', 'batch_1k_ms'])
+        assert np.array_equal(pareto_front(sample), brute_force_front(sample))
+
+
+def test_select_candidate():
+    """The first (most accurate) row within every budget given; None if nothing fits"""
+    table = candidates()
+    assert select_candidate(table) == 7
+    assert select_candidate(table, latency_budget_ms=0.25) == 0
+    assert select_candidate(table, latency_budget_ms=0.40) == 7   # budgets are inclusive
+    assert select_candidate(table, batch_budget_ms=15) == 2
+    assert select_candidate(table, latency_budget_ms=0.12, batch_budget_ms=25) == 5
+    assert select_candidate(table, latency_budget_ms=0.12, batch_budget_ms=20) is None
+
+
+if __name__ == '__main__':
+    test_pareto_front()
+    print("✓ Pareto check passed: the front holds exactly the undominated candidates")
+    test_select_candidate()
+    print("✓ Selection check passed: the most accurate candidate within budget is picked")
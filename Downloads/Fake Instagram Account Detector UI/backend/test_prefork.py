@@ -0,0 +1,128 @@
+"""
+Behaviour check for the prefork launcher
+Workers forked by the master must report ready and serve from the shared
+socket, a dead worker must be replaced, a rolling restart must swap every
+worker for a fresh one, and only a real worker may ask its master to reload
+"""
+
+import os
+import signal
+import time
+import urllib.request
+from prefork import MASTER_PID_ENV, Master, bind_socket, request_rolling_reload
+
+
+def whoami(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(os.getpid()).encode()]
+
+
+def ask(sock):
+    port = sock.getsockname()[1]
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5) as response:
+        return int(response.read())
+
+
+def start_master(n_workers=2, on_reload=None):
+    sock = bind_socket('127.0.0.1', 0)
+    master = Master(whoami, sock, n_workers, threads=1, graceful_timeout=2, on_reload=on_reload)
+    for _ in range(n_workers):
+        pid, ready = master.spawn(wait_ready=True)
+        assert ready, f'worker {pid} never reported ready'
+    return master
+
+
+def stop_master(master):
+    for pid in list(master.workers):
+        master.stop_worker(pid)
+    master.sock.close()
+
+
+def test_spawn_and_respawn():
+    """Ready workers serve the socket; a killed one is reaped and replaced"""
+    master = start_master()
+    try:
+        assert len(master.workers) == 2
+        served = {ask(master.sock) for _ in range(10)}
+        assert served <= set(master.workers)
+
+        victim = next(iter(master.workers))
+        # Started long enough ago that the replacement isn't treated as a crash loop
+        master.workers[victim] -= 60
+        os.kill(victim, signal.SIGKILL)
+        until = time.monotonic() + 5
+        while victim in master.workers and time.monotonic() < until:
+            master.reap()
+            time.sleep(0.05)
+        assert victim not in master.workers and len(master.workers) == 2
+        assert master.crashes == 0
+        time.sleep(0.5)  # the replacement was forked without waiting for ready
+        assert {ask(master.sock) for _ in range(10)} <= set(master.workers)
+    finally:
+        stop_master(master)
+
+
+def test_rolling_restart():
+    """Every worker is replaced by a new one that is serving before the old one stops"""
+    master = start_master()
+    try:
+        before = set(master.workers)
+        master.rolling_restart()
+        after = set(master.workers)
+        assert len(after) == 2 and not before & after
+        assert {ask(master.sock) for _ in range(10)} <= after
+        for pid in before:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                continue
+            raise AssertionError(f'old worker {pid} is still running')
+    finally:
+        stop_master(master)
+
+
+def test_failed_reload_keeps_workers():
+    """A reload hook returning False leaves the current workers in place"""
+    master = start_master(on_reload=lambda: False)
+    try:
+        before = set(master.workers)
+        master.rolling_restart()
+        assert set(master.workers) == before
+    finally:
+        stop_master(master)
+
+
+def test_request_rolling_reload():
+    """Only a child of PREFORK_MASTER_PID signals it"""
+    previous = os.environ.pop(MASTER_PID_ENV, None)
+    hups = []
+    handler = signal.signal(signal.SIGHUP, lambda *_: hups.append(1))
+    try:
+        assert request_rolling_reload() is False
+        os.environ[MASTER_PID_ENV] = str(os.getpid())  # we aren't our own child
+        assert request_rolling_reload() is False
+
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if request_rolling_reload() else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        until = time.monotonic() + 2
+        while not hups and time.monotonic() < until:
+            time.sleep(0.01)
+        assert hups == [1]
+    finally:
+        signal.signal(signal.SIGHUP, handler)
+        os.environ.pop(MASTER_PID_ENV, None)
+        if previous is not None:
+            os.environ[MASTER_PID_ENV] = previous
+
+
+if __name__ == '__main__':
+    test_spawn_and_respawn()
+    print("✓ Respawn check passed: ready workers serve and a dead one is replaced")
+    test_rolling_restart()
+    print("✓ Rolling restart check passed: every worker is swapped for a fresh one")
+    test_failed_reload_keeps_workers()
+    test_request_rolling_reload()
+    print("✓ Reload check passed: only a real worker can ask its master to reload")
@@ -0,0 +1,90 @@
+"""
+Behaviour check for the result cache
+Keys, LRU eviction, TTL expiry and model-version invalidation
+"""
+
+import time
+import numpy as np
+from result_cache import ResultCache
+
+
+def score_through(cache, X, probabilities, version='v1'):
+    """Look rows up, then store them, in the order the API does"""
+    cache.lookup(X, version)
+    cache.store(X, probabilities, version)
+
+
+def test_hits_and_misses():
+    """Stored rows hit, unseen rows miss and come back as NaN"""
+    cache = ResultCache(max_size=10)
+    X = np.array([[1.0, 2.0], [3.0, 4.0]])
+    score_through(cache, X, np.array([[0.2, 0.8], [0.6, 0.4]]))
+
+    probabilities, misses = cache.lookup(np.array([[3.0, 4.0], [5.0, 6.0], [1.0, 2.0]]), 'v1')
+    assert misses.tolist() == [False, True, False]
+    assert probabilities[0].tolist() == [0.6, 0.4]
+    assert probabilities[2].tolist() == [0.2, 0.8]
+    assert np.isnan(probabilities[1]).all()
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 3
+
+
+def test_canonical_keys():
+    """-0.0 and 0.0, and ints and floats, share an entry"""
+    cache = ResultCache()
+    score_through(cache, np.array([[0.0, 1.0]]), np.array([[0.1, 0.9]]))
+    _, misses = cache.lookup(np.array([[-0.0, 1]]), 'v1')
+    assert not misses.any()
+
+
+def test_lru_eviction():
+    """Beyond max_size the least recently used entry goes first"""
+    cache = ResultCache(max_size=2)
+    for value in (1.0, 2.0):
+        score_through(cache, np.array([[value]]), np.array([[value, 0.0]]))
+    cache.lookup(np.array([[1.0]]), 'v1')  # 1.0 is now the most recent
+    cache.store(np.array([[3.0]]), np.array([[3.0, 0.0]]), 'v1')
+
+    _, misses = cache.lookup(np.array([[1.0], [2.0], [3.0]]), 'v1')
+    assert misses.tolist() == [False, True, False]
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL miss and are counted as expired"""
+    cache = ResultCache(ttl_seconds=0.05)
+    score_through(cache, np.array([[1.0]]), np.array([[0.5, 0.5]]))
+    time.sleep(0.1)
+    _, misses = cache.lookup(np.array([[1.0]]), 'v1')
+    assert misses.all()
+    assert cache.stats()['expirations'] == 1 and cache.stats()['size'] == 0
+
+
+def test_model_version_change():
+    """A new model version empties the cache, and late stores from the old one are ignored"""
+    cache = ResultCache()
+    X = np.array([[1.0]])
+    score_through(cache, X, np.array([[0.5, 0.5]]))
+    assert not cache.lookup(X, 'v1')[1].any()
+
+    _, misses = cache.lookup(X, 'v2')
+    assert misses.all()
+    assert cache.stats()['invalidations'] == 1
+
+    cache.store(X, np.array([[0.9, 0.1]]), 'v1')  # a request that started before the swap
+    _, misses = cache.lookup(X, 'v2')
+    assert misses.all()
+
+    cache.store(X, np.array([[0.3, 0.7]]), 'v2')
+    probabilities, misses = cache.lookup(X, 'v2')
+    assert not misses.any() and probabilities[0].tolist() == [0.3, 0.7]
+
+
+if __name__ == '__main__':
+    test_hits_and_misses()
+    test_canonical_keys()
+    print("✓ Lookup check passed: hits, misses and canonical keys")
+    test_lru_eviction()
+    test_ttl_expiry()
+    print("✓ Eviction check passed: LRU order and TTL expiry")
+    test_model_version_change()
+    print("✓ Invalidation check passed: a new model version never sees old scores")
@@ -0,0 +1,72 @@
+"""
+Behaviour check for streaming bulk scoring
+NDJSON and CSV bodies must come back as one NDJSON line per input row, in
+order, with the same scores as /api/batch-analyze and an indexed error
+line for each malformed row
+"""
+
+import json
+import pandas as pd
+import backend_api
+
+ACCOUNTS = pd.read_csv('OldDataSet.csv').drop(columns=['Fake']).sample(25, random_state=1)
+
+
+def stream(body, content_type):
+    client = backend_api.app.test_client()
+    response = client.post('/api/batch-analyze/stream', data=body, content_type=content_type)
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def batch_probabilities(accounts):
+    client = backend_api.app.test_client()
+    results = client.post('/api/batch-analyze', json=accounts).get_json()['results']
+    return [result['fake_probability'] for result in results]
+
+
+def test_ndjson():
+    """Valid lines are scored like the batch endpoint; bad lines become indexed errors"""
+    accounts = ACCOUNTS.to_dict('records')
+    lines = [json.dumps(account) for account in accounts]
+    lines[3] = '{"#Posts": 5,'       # truncated JSON
+    lines[10] = '[1, 2, 3]'          # not an object
+    lines.insert(6, '')              # blank lines are skipped, not counted
+    chunk_size = backend_api.STREAM_CHUNK_SIZE
+    backend_api.STREAM_CHUNK_SIZE = 4
+    try:
+        records = stream('\n'.join(lines) + '\n', 'application/x-ndjson')
+    finally:
+        backend_api.STREAM_CHUNK_SIZE = chunk_size
+
+    assert [record['index'] for record in records] == list(range(len(accounts)))
+    errors = [record['index'] for record in records if 'error' in record]
+    assert errors == [3, 10], errors
+    valid = [i for i in range(len(accounts)) if i not in errors]
+    expected = batch_probabilities([accounts[i] for i in valid])
+    assert [records[i]['fake_probability'] for i in valid] == expected
+
+
+def test_csv():
+    """CSV rows in the OldDataSet.csv layout score like JSON; short rows are errors"""
+    body = ACCOUNTS.to_csv(index=False).splitlines()
+    body[5] = body[5].rsplit(',', 2)[0]  # row 4 loses two columns
+    records = stream('\n'.join(body) + '\n', 'text/csv')
+    assert len(records) == len(ACCOUNTS)
+    assert [record['index'] for record in records if 'error' in record] == [4]
+    accounts = ACCOUNTS.to_dict('records')
+    expected = batch_probabilities(accounts[:4] + accounts[5:])
+    assert [record['fake_probability'] for record in records if 'error' not in record] == expected
+
+
+def test_empty_body():
+    assert stream('', 'application/x-ndjson') == []
+    assert stream('', 'text/csv') == []
+
+
+if __name__ == '__main__':
+    test_ndjson()
+    print("✓ NDJSON check passed: one ordered line per row, bad lines reported by index")
+    test_csv()
+    test_empty_body()
+    print("✓ CSV check passed: CSV rows score like JSON, short rows are errors")
@@ -6,6 +6,33 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, precision_score, recall_score, confusion_matrix, classification_report
 import pickle
 import os
+import sys
+import argparse
+from forest_compiler import compile_forest
+from model_bundle import write_bundle
+from model_sweep import run_sweep, select_candidate, format_table
+from forest_compaction import COMPACT_BUNDLE_PATH, compact_forest, compaction_report
+
+parser = argparse.ArgumentParser(description='Train the fake account classifier')
+parser.add_argument('--sweep', action='store_true',
+                    help='Sweep tree count/depth/leaf size and keep the best model within the latency budget')
+parser.add_argument('--latency-budget-ms', type=float, default=None,
+                    help='Max single-row p99 predict latency for --sweep')
+parser.add_argument('--batch-budget-ms', type=float, default=None,
+                    help='Max 1k-row predict latency for --sweep')
+parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                    help='Parallel training processes for --sweep')
+parser.add_argument('--sweep-output', default='sweep_results.csv',
+                    help='Where --sweep writes the full results table')
+parser.add_argument('--compact', action='store_true',
+                    help=f'Also write a pruned, depth-capped, leaf-merged forest to {COMPACT_BUNDLE_PATH}')
+parser.add_argument('--compact-tolerance', type=float, default=0.01,
+                    help='Max precision/recall drop allowed by --compact')
+parser.add_argument('--merge-tolerance', type=float, default=0.05,
+                    help='Merge sibling leaves whose class probabilities differ by at most this')
+parser.add_argument('--max-prob-error', type=float, default=0.05,
+                    help='Max mean probability difference from the full forest allowed by --compact')
+args = parser.parse_args()
 
 # Load dataset
 print("Loading dataset...")
@@ -48,18 +75,43 @@ scaler = StandardScaler()
 X_train_scaled = scaler.fit_transform(X_train)
 X_test_scaled = scaler.transform(X_test)
 
-# Train Random Forest Classifier
-print("\nTraining Random Forest Classifier...")
-clf = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=15,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    random_state=42,
-    n_jobs=-1,
-    verbose=1
-)
-clf.fit(X_train_scaled, y_train)
+if args.sweep:
+    # Pick the serving model by accuracy *and* what it costs to run
+    table, candidates = run_sweep(
+        X_train_scaled, y_train.to_numpy(), X_test_scaled, y_test.to_numpy(),
+        scaler, X_test.to_numpy(dtype=np.float64), workers=args.workers
+    )
+    table.to_csv(args.sweep_output, index=False)
+    print(f"\n{'='*60}")
+    print(f"PARETO FRONT (accuracy, recall vs. single-row p99, 1k-row latency)")
+    print(f"{'='*60}")
+    print(format_table(table[table['pareto']]))
+    print(f"\n✓ Full sweep table ({len(table)} candidates) saved to {args.sweep_output}")
+
+    best = select_candidate(table, args.latency_budget_ms, args.batch_budget_ms)
+    if best is None:
+        print(f"✗ No candidate fits the latency budget "
+              f"(p99 <= {args.latency_budget_ms} ms, 1k rows <= {args.batch_budget_ms} ms)")
+        sys.exit(1)
+    chosen = table.loc[best]
+    print(f"\nSelected: n_estimators={chosen['n_estimators']}, max_depth={chosen['max_depth']}, "
+          f"min_samples_leaf={chosen['min_samples_leaf']} "
+          f"(p99 {chosen['single_p99_ms']:.3f} ms, 1k rows {chosen['batch_1k_ms']:.2f} ms)")
+    clf = candidates[best]
+    clf.set_params(warm_start=False, n_jobs=-1)
+else:
+    # Train Random Forest Classifier
+    print("\nTraining Random Forest Classifier...")
+    clf = RandomForestClassifier(
+        n_estimators=100,
+        max_depth=15,
+        min_samples_split=5,
+        min_samples_leaf=2,
+        random_state=42,
+        n_jobs=-1,
+        verbose=1
+    )
+    clf.fit(X_train_scaled, y_train)
 
 # Make predictions
 y_pred = clf.predict(X_test_scaled)
@@ -107,6 +159,45 @@ with open('feature_names.pkl', 'wb') as f:
     pickle.dump(X.columns.tolist(), f)
 print("✓ feature_names.pkl saved")
 
+forest = compile_forest(clf, scaler)
+
+# Save the memory-mappable bundle the API prefers (one versioned file)
+bundle_version = write_bundle('model_bundle.bin', forest, X.columns.tolist(), scaler)
+print(f"✓ model_bundle.bin saved (version {bundle_version})")
+
+if args.compact:
+    # Search for the smallest forest that still scores like the full one
+    print(f"\nCompacting forest (tolerance {args.compact_tolerance}, merge {args.merge_tolerance})...")
+    X_test_raw = X_test.to_numpy(dtype=np.float64)
+    compact, search_log = compact_forest(
+        forest, X_test_raw, y_test.to_numpy(),
+        tolerance=args.compact_tolerance,
+        merge_tolerance=args.merge_tolerance,
+        max_prob_error=args.max_prob_error,
+    )
+    for entry in search_log:
+        if entry['fits']:
+            print(f"  max_depth={entry['max_depth']}: {entry['n_trees']} trees, {entry['node_count']} nodes")
+        else:
+            print(f"  max_depth={entry['max_depth']}: no subset within tolerance")
+
+    full_stats, compact_stats = compaction_report(forest, compact, X_test_raw, y_test.to_numpy())
+    print(f"\n{'='*60}")
+    print(f"COMPACTION REPORT")
+    print(f"{'='*60}")
+    print(f"{'':16s} {'full':>12s} {'compact':>12s} {'reduction':>10s}")
+    for key, label in (('trees', 'Trees'), ('nodes', 'Nodes'), ('size_kb', 'Size (KB)'),
+                       ('single_p99_ms', 'p99 1 row (ms)'), ('batch_1k_ms', '1k rows (ms)')):
+        before, after = full_stats[key], compact_stats[key]
+        print(f"{label:16s} {before:12.2f} {after:12.2f} {(1 - after / before) * 100:9.1f}%")
+    print(f"{'Precision':16s} {full_stats['precision']*100:11.2f}% {compact_stats['precision']*100:11.2f}%")
+    print(f"{'Recall':16s} {full_stats['recall']*100:11.2f}% {compact_stats['recall']*100:11.2f}%")
+
+    # A separate file, so model_bundle.bin keeps matching classifier_model.pkl
+    compact_version = write_bundle(COMPACT_BUNDLE_PATH, compact, X.columns.tolist(), scaler)
+    print(f"✓ {COMPACT_BUNDLE_PATH} saved (version {compact_version}); "
+          f"serve it with MODEL_BUNDLE_PATH={COMPACT_BUNDLE_PATH}")
+
 print(f"\n{'='*60}")
 print(f"Training complete! Models saved successfully.")
 print(f"{'='*60}")
@@ -8,10 +8,12 @@ from backend_api import app
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
+    # Raise this together with COALESCE_WINDOW_MS so concurrent requests can share a batch
+    threads = int(os.environ.get('WAITRESS_THREADS', 4))
     from waitress import serve
     
     print(f"Starting Waitress WSGI server on port {port}...")
     print("=" * 60)
     
     # Serve the app with Waitress (production-ready)
-    serve(app, host='0.0.0.0', port=port, threads=4)
+    serve(app, host='0.0.0.0', port=port, threads=threads)